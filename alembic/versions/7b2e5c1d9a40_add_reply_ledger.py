@@ -0,0 +1,41 @@
+"""add reply_ledger for idempotent AI replies
+
+Revision ID: 7b2e5c1d9a40
+Revises: 4d8c7f2a9b1e
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "7b2e5c1d9a40"
+down_revision = "4d8c7f2a9b1e"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "reply_ledger",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("gmail_message_id", sa.String(), nullable=False),
+        sa.Column("thread_id", sa.String(), nullable=True),
+        sa.Column("state", sa.String(length=20), nullable=False, server_default="claimed"),
+        sa.Column("owner", sa.String(), nullable=True),
+        sa.Column("reply_text", sa.Text(), nullable=True),
+        sa.Column("sent_message_id", sa.String(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="1"),
+        sa.Column("claimed_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_reply_ledger_id", "reply_ledger", ["id"])
+    op.create_index("ix_reply_ledger_gmail_message_id", "reply_ledger", ["gmail_message_id"], unique=True)
+    op.create_index("ix_reply_ledger_thread_id", "reply_ledger", ["thread_id"])
+
+
+def downgrade():
+    op.drop_index("ix_reply_ledger_thread_id", table_name="reply_ledger")
+    op.drop_index("ix_reply_ledger_gmail_message_id", table_name="reply_ledger")
+    op.drop_index("ix_reply_ledger_id", table_name="reply_ledger")
+    op.drop_table("reply_ledger")
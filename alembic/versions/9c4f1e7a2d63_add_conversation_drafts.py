@@ -0,0 +1,29 @@
+"""add draft reply columns to conversations
+
+Revision ID: 9c4f1e7a2d63
+Revises: 7b2e5c1d9a40
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9c4f1e7a2d63"
+down_revision = "7b2e5c1d9a40"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column("conversations", sa.Column("draft_reply", sa.Text(), nullable=True))
+    op.add_column("conversations", sa.Column("draft_message_id", sa.String(), nullable=True))
+    op.add_column("conversations", sa.Column("draft_source", sa.String(length=20), nullable=True))
+    op.add_column("conversations", sa.Column("draft_created_at", sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    op.drop_column("conversations", "draft_created_at")
+    op.drop_column("conversations", "draft_source")
+    op.drop_column("conversations", "draft_message_id")
+    op.drop_column("conversations", "draft_reply")
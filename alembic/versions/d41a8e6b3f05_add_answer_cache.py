@@ -0,0 +1,41 @@
+"""add answer_cache table
+
+Revision ID: d41a8e6b3f05
+Revises: 9c4f1e7a2d63
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "d41a8e6b3f05"
+down_revision = "9c4f1e7a2d63"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "answer_cache",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("question", sa.Text(), nullable=False),
+        sa.Column("reply", sa.Text(), nullable=False),
+        sa.Column("sender_name", sa.String(), nullable=True),
+        sa.Column("source", sa.String(length=20), nullable=False, server_default="staff"),
+        sa.Column("thread_id", sa.String(), nullable=True),
+        sa.Column("hits", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_hit_at", sa.DateTime(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("expires_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_answer_cache_id", "answer_cache", ["id"])
+    op.create_index("ix_answer_cache_expires_at", "answer_cache", ["expires_at"])
+
+
+def downgrade():
+    op.drop_index("ix_answer_cache_expires_at", table_name="answer_cache")
+    op.drop_index("ix_answer_cache_id", table_name="answer_cache")
+    op.drop_table("answer_cache")
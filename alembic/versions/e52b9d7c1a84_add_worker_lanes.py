@@ -0,0 +1,39 @@
+"""add worker_lanes and worker_heartbeats tables
+
+Revision ID: e52b9d7c1a84
+Revises: d41a8e6b3f05
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e52b9d7c1a84"
+down_revision = "d41a8e6b3f05"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "worker_lanes",
+        sa.Column("lane", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("owner", sa.String(), nullable=True),
+        sa.Column("lease_until", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("lane"),
+    )
+    op.create_table(
+        "worker_heartbeats",
+        sa.Column("owner", sa.String(), nullable=False),
+        sa.Column("seen_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("owner"),
+    )
+    op.create_index("ix_worker_heartbeats_seen_at", "worker_heartbeats", ["seen_at"])
+
+
+def downgrade():
+    op.drop_index("ix_worker_heartbeats_seen_at", table_name="worker_heartbeats")
+    op.drop_table("worker_heartbeats")
+    op.drop_table("worker_lanes")
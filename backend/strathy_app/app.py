@@ -2,19 +2,27 @@ import os
 os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 import logging
+import time
+import json
+import math
+from datetime import datetime, timezone
 
 from fastapi import FastAPI, Request, Body
-from fastapi.responses import RedirectResponse, JSONResponse
+from fastapi.responses import RedirectResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.sessions import SessionMiddleware
 from dotenv import load_dotenv
-from backend.strathy_app.models.models import Student, Conversation, SessionLocal  # ✅ Make sure this import is present
+from backend.strathy_app.models.models import Student, Conversation, SessionLocal, engine  # ✅ Make sure this import is present
+from backend.strathy_app.models.async_db import get_async_db, get_async_engine
 from backend.strathy_app.services.student_service import create_or_update_student
 
 from backend.strathy_app.services.model_extraction_service import extract_student_details  # create this
 from fastapi.responses import JSONResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import Depends
 
@@ -23,20 +31,54 @@ from google_auth_oauthlib.flow import Flow
 
 from apscheduler.schedulers.background import BackgroundScheduler
 
-from .config import SCOPES, CREDENTIALS_FILE, TOKEN_FILE
+from .config import SCOPES, CREDENTIALS_FILE, TOKEN_FILE, RUN_SCHEDULER_IN_API, WORKER_POLL_MINUTES
 from .services.gmail_service import (
     build_gmail_service,
     list_unread_messages,
     get_message,
+    get_messages,
     send_mime,
     process_incoming_email,
     get_ai_reply_for_thread,
     is_sender_allowed,
     extract_thread_messages,
-
+    load_credentials,
+    remember_message,
+    save_credentials,
+    sender_display_name,
+)
+from .services.ai_reply_service import CachedReply, stream_ai_reply
+from .services.answer_cache import get_answer_cache, question_text
+from .services.draft_service import CACHED_SOURCE, draft_payload, is_fresh, save_draft
+from .services.enrichment_service import get_enricher, needs_enrichment
+from .services.rate_limiter import limiter_stats
+from .services.resilience import CircuitOpenError, UpstreamError, breaker_stats
+from .services.cache_service import (
+    CachedResponse,
+    LocalResponseCache,
+    etag_matches,
+    get_response_cache,
+    invalidate_ingestion,
+    make_etag,
+    student_cache_key,
+    student_tag,
+    thread_cache_key,
+    thread_tag,
 )
 from .utils.email_parser import parse_message
+from .utils.metrics import (
+    DB_QUERIES_PER_REQUEST,
+    REQUEST_SECONDS,
+    instrument_engine,
+    render_metrics,
+    start_query_count,
+    stop_query_count,
+    timed,
+)
 from .utils.mime_helpers import build_reply_mime
+from .utils.responses import FastJSONResponse, add_compression, dumps
+from .utils.tracing import set_span_attributes, setup_tracing
+from .worker import auto_reply_job, run_worker_tick
 
 # Import the synchronous extraction helper at the top
 from backend.strathy_app.services.model_extraction_service import extract_student_details
@@ -49,12 +91,13 @@ from fastapi import Depends
 # ====== Setup ======
 load_dotenv()
 logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 # ====== FastAPI App ======
 SECRET_KEY = os.getenv("SECRET_KEY", "change-this-to-a-long-random-string")
 BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
 
-app = FastAPI()
+app = FastAPI(default_response_class=FastJSONResponse)
 app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
 
 # ====== CORS ======
@@ -67,18 +110,62 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ====== Response cache ======
+# Resolved now so a cache that can't see the worker's invalidations is reported at startup
+get_response_cache()
+
+# ====== Compression ======
+add_compression(app, stream_paths=["/gmail/reply/stream"])
+
+# ====== Metrics & Tracing ======
+# The async engine (request path) and the sync one (worker, services) share one database
+instrument_engine(engine)
+instrument_engine(get_async_engine().sync_engine)
+setup_tracing(app=app, engine=engine, engines=[get_async_engine().sync_engine])
+
+
+@app.middleware("http")
+async def request_metrics(request: Request, call_next):
+    token, counter = start_query_count()
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = getattr(request.scope.get("route"), "path", "unmatched")
+        REQUEST_SECONDS.labels(route=route, method=request.method, status=str(status)).observe(
+            time.perf_counter() - started
+        )
+        DB_QUERIES_PER_REQUEST.labels(route=route).observe(counter[0])
+        stop_query_count(token)
+
+
+@app.exception_handler(UpstreamError)
+def upstream_error(request: Request, exc: UpstreamError):
+    """Gmail or the model API is down, slow or circuit-broken: 503 (with Retry-After if known), not a 500."""
+    headers = {}
+    if isinstance(exc, CircuitOpenError):
+        headers["Retry-After"] = str(max(1, math.ceil(exc.retry_after)))
+    return FastJSONResponse(
+        {"ok": False, "error": str(exc), "upstream": exc.upstream}, status_code=503, headers=headers,
+    )
+
+
+@app.get("/metrics")
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
+
 # ====== Token Management ======
 def _save_creds(creds: Credentials):
-    Path(TOKEN_FILE).write_text(creds.to_json(), encoding="utf-8")
+    save_credentials(creds)
 
 
 def _load_creds() -> Optional[Credentials]:
-    if not Path(TOKEN_FILE).exists():
-        return None
-    try:
-        return Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
-    except Exception:
-        return None
+    return load_credentials()
 
 
 # ====== Routes ======
@@ -110,7 +197,7 @@ def auth_callback(request: Request):
     returned_state = request.query_params.get("state")
 
     if not expected_state or expected_state != returned_state:
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=400,
             content={"ok": False, "error": "State mismatch. Please retry login."},
         )
@@ -138,117 +225,193 @@ def get_db():
     finally:
         db.close()
 
-# ====== Main Inbox Route ======
-@app.get("/gmail/unread")
-def gmail_unread(db: Session = Depends(get_db)):
-    creds = _load_creds()
-    if not creds:
-        return JSONResponse({"ok": False, "message": "Not logged in"}, status_code=401)
 
-    service = build_gmail_service(creds)
-    msgs = list_unread_messages(service, max_results=100)
+# ====== Cached Views (ETag / If-None-Match) ======
+def _serve_cached(request: Request, key: str, build):
+    """
+    Serve a JSON view from the response cache.
+    `build()` returns (status_code, payload, tags); only 200 responses with tags are cached.
+    A matching If-None-Match yields a 304 with no DB query or serialization.
+    """
+    cache = get_response_cache()
+    cached = cache.get(key)
+    if cached is None:
+        status_code, payload, tags = build()
+        body = dumps(payload)
+        if status_code != 200 or tags is None:
+            return Response(content=body, status_code=status_code, media_type="application/json")
+        cached = CachedResponse(body=body, etag=make_etag(body))
+        cache.set(key, cached, tags)
+    return _cached_view(request, cached)
+
+
+async def _serve_cached_async(request: Request, key: str, build):
+    """_serve_cached() for async handlers: `build` is awaited, and a Redis cache is queried off the event loop."""
+    cache = get_response_cache()
+
+    async def cache_call(fn, *args):
+        if isinstance(cache, LocalResponseCache):
+            return fn(*args)
+        return await run_in_threadpool(fn, *args)
+
+    cached = await cache_call(cache.get, key)
+    if cached is None:
+        status_code, payload, tags = await build()
+        body = dumps(payload)
+        if status_code != 200 or tags is None:
+            return Response(content=body, status_code=status_code, media_type="application/json")
+        cached = CachedResponse(body=body, etag=make_etag(body))
+        await cache_call(cache.set, key, cached, tags)
+    return _cached_view(request, cached)
+
+
+def _cached_view(request: Request, cached: CachedResponse) -> Response:
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+
+# ====== Main Inbox Route ======
+def _fetch_unread(service):
+    """Blocking Gmail part of the inbox: unread messages grouped by thread (latest one kept as the preview)."""
+    with timed("inbox.list"):
+        msgs = list_unread_messages(service, max_results=100)
+    set_span_attributes(**{"inbox.unread_count": len(msgs)})
 
     # ✅ NEW: group unread messages by Gmail threadId
     latest_by_thread = {}  # threadId -> {"full": msg_json, "parsed": parsed, "ts": int}
+    unread_by_thread = {}  # threadId -> unread messages in this listing
 
-    for m in msgs:
-        full = get_message(service, m["id"])
+    # Fetched in parallel over the pooled Gmail transport
+    with timed("inbox.fetch"):
+        fetched = get_messages(service, [m["id"] for m in msgs])
+    for full in fetched:
         if not full:
             continue
 
         parsed = parse_message(full)
+        # Already downloaded: the thread history below won't fetch this message again
+        remember_message(full, parsed)
         thread_id = full.get("threadId") or parsed.get("thread_id")
         if not thread_id:
             continue
 
         ts = int(full.get("internalDate", "0") or 0)
+        unread_by_thread[thread_id] = unread_by_thread.get(thread_id, 0) + 1
 
         # Keep the latest unread message per thread as the preview
         if thread_id not in latest_by_thread or ts > latest_by_thread[thread_id]["ts"]:
             latest_by_thread[thread_id] = {"full": full, "parsed": parsed, "ts": ts}
+    return latest_by_thread, unread_by_thread
+
+
+def _add_thread_history(service, previews):
+    """Blocking Gmail part of view=full: the whole thread for every preview."""
+    for row in previews:
+        # ✅ the continuous back-and-forth, inline
+        row["thread_messages"] = extract_thread_messages(service, row["threadId"])
+        row["message_count"] = len(row["thread_messages"])
+
+
+@app.get("/gmail/unread")
+async def gmail_unread(db: AsyncSession = Depends(get_async_db), view: str = "slim"):
+    """
+    One preview row per thread with unread mail: the latest unread message,
+    stored student details, the precomputed draft and the unread count.
+    The conversation itself is loaded on demand from /threads/{id} (the
+    dashboard reloads it when the latest message id isn't in it yet), so the
+    slim view makes no per-thread Gmail call; `view=full` embeds it as
+    `thread_messages` with a `message_count` (the old, much larger payload).
+
+    Gmail calls run in the threadpool; the DB reads are async, two queries for
+    the whole page rather than two per thread.
+    """
+    creds = await run_in_threadpool(_load_creds)
+    if not creds:
+        return FastJSONResponse({"ok": False, "message": "Not logged in"}, status_code=401)
+
+    service = await run_in_threadpool(build_gmail_service, creds)
+    latest_by_thread, unread_by_thread = await run_in_threadpool(_fetch_unread, service)
+
+    conversations = {}
+    if latest_by_thread:
+        rows = await db.scalars(select(Conversation).where(Conversation.thread_id.in_(list(latest_by_thread))))
+        conversations = {c.thread_id: c for c in rows}
+    student_ids = {c.student_id for c in conversations.values() if c.student_id}
+    students = {}
+    if student_ids:
+        rows = await db.scalars(select(Student).where(Student.id.in_(student_ids)))
+        students = {s.id: s for s in rows}
 
     previews = []
+    enricher = get_enricher()
 
     for thread_id, item in latest_by_thread.items():
-        full = item["full"]
         parsed = item["parsed"]
 
         sender_email = (parsed.get("sender") or "").split("<")[-1].strip(">").lower()
 
-        conversation = db.query(Conversation).filter(Conversation.thread_id == thread_id).first()
-        student = (
-            db.query(Student).filter(Student.id == conversation.student_id).first()
-            if conversation and conversation.student_id
-            else None
-        )
+        conversation = conversations.get(thread_id)
+        student = students.get(conversation.student_id) if conversation and conversation.student_id else None
 
-        # ✅ Save/update conversation preview (latest body/subject)
-        if not conversation:
-            conversation = Conversation(
-                student_id=student.id if student else None,
-                thread_id=thread_id,
+        # ✅ Reads stay read-only: preview upserts, extraction and reply drafts are queued for the background enricher
+        message_id = parsed.get("message_id")
+        enrichment_pending = enricher.is_pending(thread_id)
+        preview_changed = (
+            not conversation
+            or conversation.subject != (parsed.get("subject") or conversation.subject)
+            or conversation.message_body != (parsed.get("body") or conversation.message_body)
+        )
+        draft_wanted = (
+            enricher.precompute_drafts
+            and not is_fresh(conversation, message_id)
+            and is_sender_allowed(sender_email)
+        )
+        if preview_changed or draft_wanted or (
+            needs_enrichment(conversation) and not enricher.already_attempted(thread_id, conversation.message_body)
+        ):
+            enrichment_pending = enricher.enqueue(
+                thread_id,
+                sender_email=sender_email,
                 subject=parsed.get("subject"),
-                message_body=parsed.get("body") or "",
+                body=parsed.get("body"),
+                message_id=message_id,
+                sender_name=sender_display_name(parsed.get("sender") or "", sender_email),
             )
-            db.add(conversation)
-        else:
-            conversation.subject = parsed.get("subject") or conversation.subject
-            conversation.message_body = parsed.get("body") or conversation.message_body
-        db.commit()
-
-        extracted = None
-        if conversation and conversation.message_body and conversation.details_status in [None, "", "empty"]:
-            try:
-                extracted = extract_student_details(conversation.message_body)
-                conversation.full_thread_summary = extracted.get("full_thread_summary", "")
-                conversation.details_status = extracted.get("details_status", "empty")
-                conversation.missing_fields = extracted.get("missing_fields", [])
-                conversation.follow_up_message = extracted.get("follow_up_message", "")
-
-                if not student and extracted.get("admission_number"):
-                    student_payload = {
-                        "full_name": extracted.get("full_name"),
-                        "admission_number": extracted.get("admission_number"),
-                        "course": extracted.get("course"),
-                        "year": extracted.get("year"),
-                        "semester": extracted.get("semester"),
-                        "group": extracted.get("group"),
-                        "email": sender_email,
-                    }
-                    student = create_or_update_student(db, student_payload)
-                    conversation.student_id = student.id
-
-                db.commit()
-            except Exception as e:
-                print(f"⚠️ Extraction failed for conversation {conversation.id}: {e}")
-
-        # ✅ OPTIONAL but helpful: include full thread history for chat UI
-        thread_messages = extract_thread_messages(service, thread_id)
-
-        previews.append({
+
+        row = {
             "id": parsed.get("message_id"),
             "threadId": thread_id,
             "from": parsed.get("sender"),
             "student_email": student.email if student else sender_email,
-            "student_name": student.full_name if student else (extracted.get("full_name") if extracted else ""),
-            "admission_number": student.admission_number if student else (extracted.get("admission_number") if extracted else ""),
-            "course": student.course if student else (extracted.get("course") if extracted else ""),
-            "year": student.year if student else (extracted.get("year") if extracted else ""),
-            "semester": student.semester if student else (extracted.get("semester") if extracted else ""),
-            "group": student.group if student else (extracted.get("group") if extracted else ""),
+            "student_name": student.full_name if student else "",
+            "admission_number": student.admission_number if student else "",
+            "course": student.course if student else "",
+            "year": student.year if student else "",
+            "semester": student.semester if student else "",
+            "group": student.group if student else "",
             "subject": parsed.get("subject"),
             "student_query": parsed.get("body") or "",
+            "received_at": datetime.fromtimestamp(item["ts"] / 1000, tz=timezone.utc).isoformat()
+            if item["ts"] else None,
+            "unread_count": unread_by_thread.get(thread_id, 1),
             "full_thread_summary": conversation.full_thread_summary if conversation else "",
             "details_status": conversation.details_status if conversation else "empty",
             "missing_fields": conversation.missing_fields if conversation else [],
             "follow_up_message": conversation.follow_up_message if conversation else "",
-            "thread_messages": thread_messages,  # ✅ the continuous back-and-forth
-        })
+            "enrichment_pending": enrichment_pending,
+            **draft_payload(conversation, message_id),  # only a draft answering this message
+        }
+        previews.append(row)
+
+    if view == "full":
+        await run_in_threadpool(_add_thread_history, service, previews)
 
     # Sort previews by latest timestamp (newest first)
     previews.sort(key=lambda x: latest_by_thread.get(x["threadId"], {}).get("ts", 0), reverse=True)
 
-    return JSONResponse(previews)
+    return FastJSONResponse(previews)
 
 
 
@@ -257,7 +420,7 @@ def gmail_unread(db: Session = Depends(get_db)):
 def gmail_last_reply():
     creds = _load_creds()
     if not creds:
-        return JSONResponse({"ok": False, "message": "Not logged in"}, status_code=401)
+        return FastJSONResponse({"ok": False, "message": "Not logged in"}, status_code=401)
 
     service = build_gmail_service(creds)
     unread = list_unread_messages(service, max_results=1)
@@ -298,21 +461,28 @@ def gmail_last_reply():
     }
 
 @app.post("/gmail/reply")
-def gmail_reply(message_id: str = Body(..., embed=True), body_text: str = Body(..., embed=True)):
+def gmail_reply(message_id: str = Body(..., embed=True), body_text: str = Body(..., embed=True),
+                reusable: bool = Body(False, embed=True)):
+    """
+    Send staff's reply to a message. With `reusable`, staff vouch that the
+    reply answers anyone asking the same question, and it is stored in the
+    answer cache as the draft for near-identical questions.
+    """
     creds = _load_creds()
     if not creds:
-        return JSONResponse({"ok": False, "error": "Not logged in"}, status_code=401)
+        return FastJSONResponse({"ok": False, "error": "Not logged in"}, status_code=401)
 
+    set_span_attributes(message_id=message_id)
     service = build_gmail_service(creds)
     original = get_message(service, message_id)
     if not original:
-        return JSONResponse({"ok": False, "error": "Original message not found"}, status_code=404)
+        return FastJSONResponse({"ok": False, "error": "Original message not found"}, status_code=404)
 
     parsed = parse_message(original)
     to_email = (parsed.get("sender") or "").split("<")[-1].strip(">").lower()
 
     if not is_sender_allowed(to_email):
-        return JSONResponse(
+        return FastJSONResponse(
             status_code=403,
             content={"ok": False, "error": f"Sending to {to_email} is not allowed."},
         )
@@ -330,7 +500,21 @@ def gmail_reply(message_id: str = Body(..., embed=True), body_text: str = Body(.
     )
 
     sent = send_mime(service, raw_mime, thread_id=parsed["thread_id"])
-    return JSONResponse({
+    if not sent:
+        return FastJSONResponse({"ok": False, "error": "Gmail did not send the reply"}, status_code=502)
+
+    invalidate_ingestion(thread_id=parsed["thread_id"], email=to_email)
+    if reusable:
+        # 🧠 Staff marked this a general answer: offer it as the draft next time the same question comes in
+        get_answer_cache().remember(
+            question_text(parsed.get("subject"), parsed.get("body")),
+            body_text,
+            sender_name=sender_display_name(parsed.get("sender") or "", to_email),
+            source="staff",
+            thread_id=parsed["thread_id"],
+            sender_email=to_email,
+        )
+    return FastJSONResponse({
         "ok": True,
         "sent_id": sent.get("id"),
         "threadId": sent.get("threadId"),
@@ -338,50 +522,135 @@ def gmail_reply(message_id: str = Body(..., embed=True), body_text: str = Body(.
     })
 
 
-# ===== Auto Reply Job =====
-def auto_reply_job():
+@app.get("/threads/{thread_id}/draft")
+async def thread_draft(thread_id: str, message_id: Optional[str] = None, db: AsyncSession = Depends(get_async_db)):
+    """
+    The stored AI draft for a thread (no Gmail or model call). With `message_id`
+    (the message being replied to) a draft written for an older message is
+    reported as stale instead of returned.
+    """
+    conversation = (await db.scalars(select(Conversation).where(Conversation.thread_id == thread_id).limit(1))).first()
+    return _draft_response(thread_id, conversation, message_id)
+
+
+def _draft_response(thread_id: str, conversation: Optional[Conversation], message_id: Optional[str]):
+    if not conversation:
+        return FastJSONResponse({"ok": False, "error": "Unknown thread"}, status_code=404)
+
+    payload = draft_payload(conversation, message_id)
+    return FastJSONResponse({
+        "ok": True,
+        "threadId": thread_id,
+        **payload,
+        "stale": bool(conversation.draft_reply) and not payload["draft_reply"],
+        "pending": get_enricher().is_pending(thread_id),
+    })
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.get("/gmail/reply/stream")
+def gmail_reply_stream(message_id: str):
+    """
+    Server-Sent Events: `token` events carry reply text as the model writes it,
+    then `done` carries the full text (also saved as the thread's draft), or
+    `error` if generation failed. Nothing is sent to the student here; staff
+    review the draft and send it through POST /gmail/reply.
+    """
     creds = _load_creds()
     if not creds:
-        logging.info("No creds available yet. Skipping auto-reply job.")
-        return
+        return FastJSONResponse({"ok": False, "error": "Not logged in"}, status_code=401)
 
-    try:
-        service = build_gmail_service(creds)
-        unread = list_unread_messages(service, max_results=1)
-        if not unread:
-            logging.info("No unread messages found.")
-            return
+    set_span_attributes(message_id=message_id)
+    service = build_gmail_service(creds)
+    original = get_message(service, message_id)
+    if not original:
+        return FastJSONResponse({"ok": False, "error": "Original message not found"}, status_code=404)
 
-        first_msg = unread[0]
-        full = get_message(service, first_msg["id"])
-        parsed = parse_message(full)
-        sender = parsed.get("sender") or ""
-        sender_email = sender.split("<")[-1].strip(">").lower()
+    parsed = parse_message(original)
+    sender_header = parsed.get("sender") or ""
+    to_email = sender_header.split("<")[-1].strip(">").lower()
+    if not is_sender_allowed(to_email):
+        return FastJSONResponse(
+            status_code=403,
+            content={"ok": False, "error": f"Replying to {to_email} is not allowed."},
+        )
 
-        if not is_sender_allowed(sender_email):
-            logging.info(f"⛔ Skipping auto-reply for blocked/disallowed sender: {sender_email}")
+    thread_id = original.get("threadId") or parsed.get("thread_id")
+    subject = parsed.get("subject") or "(no subject)"
+    body = parsed.get("body") or ""
+
+    def events():
+        chunks = []
+        try:
+            for text in stream_ai_reply(sender_display_name(sender_header, to_email), to_email, subject, body):
+                chunks.append(text)
+                yield _sse("token", {"text": text})
+        except Exception as e:
+            logger.exception("Streaming reply for %s failed: %s", message_id, e)
+            yield _sse("error", {"error": f"Error generating AI reply: {e}"})
             return
 
-        result = process_incoming_email(service, first_msg)
-        if result:
-            logging.info(f"✅ Auto-replied to {result.get('from')} | Subject: {result.get('subject')}")
+        final = "".join(chunks).strip()
+        source = CACHED_SOURCE if any(isinstance(c, CachedReply) for c in chunks) else "streamed"
+        save_draft(thread_id, message_id, final, source=source, subject=subject, body=body)
+        yield _sse("done", {"text": final, "threadId": thread_id, "message_id": message_id})
 
-    except Exception as e:
-        logging.error(f"Auto-reply job failed: {e}")
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
-# ====== Scheduler ======
-scheduler = BackgroundScheduler()
-scheduler.add_job(auto_reply_job, "interval", minutes=3)
-scheduler.start()
+@app.get("/ops/rate-limits")
+def rate_limits():
+    """Current bucket levels, 429 back-off and wait-time stats per API and lane."""
+    return limiter_stats()
+
+
+@app.get("/ops/circuit-breakers")
+def circuit_breakers():
+    """State of each upstream's circuit breaker (gmail, and one per model route)."""
+    return breaker_stats()
+
 
-# ====== Student Details Extraction (Claude) ======
+@app.get("/ops/answer-cache")
+def answer_cache_stats():
+    """Entries, threshold and this process's hit rate for the answer cache."""
+    return get_answer_cache().stats()
+
+
+@app.delete("/ops/answer-cache")
+def answer_cache_invalidate(entry_id: Optional[int] = None, contains: Optional[str] = None,
+                            expired_only: bool = False):
+    """
+    Drop cached answers that are wrong or out of date: one entry, those
+    mentioning `contains` (e.g. an old fee amount or deadline), the expired
+    ones, or with no parameters the whole cache.
+    """
+    if not _load_creds():
+        return FastJSONResponse({"ok": False, "error": "Not logged in"}, status_code=401)
+    deleted = get_answer_cache().invalidate(entry_id=entry_id, contains=contains, expired_only=expired_only)
+    return {"ok": True, "deleted": deleted}
+
+
+# ====== Scheduler ======
+# Polling normally runs in the dedicated worker (python -m backend.strathy_app.worker) so
+# scaling API workers doesn't multiply it. RUN_SCHEDULER_IN_API=1 keeps the old single-process setup.
+scheduler = None
+if RUN_SCHEDULER_IN_API:
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(run_worker_tick, "interval", minutes=WORKER_POLL_MINUTES, max_instances=1, coalesce=True)
+    scheduler.start()
+
+# ====== Student Details Extraction ======
+# Model calls go through services/llm_provider.py (routing, timeouts, fallback)
 from pydantic import BaseModel
-from anthropic import Anthropic
 import json
 
-anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-
 
 class EmailBody(BaseModel):
     body_text: str
@@ -406,33 +675,15 @@ def get_db():
 
 
 # ===== Get Student by Email =====
-@app.get("/students/{email}")
-def get_student_by_email(email: str, db: Session = Depends(get_db)):
-    normalized_email = email.strip().lower()
-    student = db.query(Student).filter(func.lower(Student.email) == normalized_email).first()
-    if not student:
-        return JSONResponse({"ok": False, "error": "Student not found", "email": normalized_email}, status_code=404)
-
-    conversations = (
-        db.query(Conversation)
-        .filter(Conversation.student_id == student.id)
-        .order_by(Conversation.last_updated.desc())
-        .all()
-    )
-
+def _student_view(normalized_email: str, student: Student, conversations: List[Conversation]):
+    """(status, payload, cache tags) of the student view, shared by the sync and async query paths."""
+    enricher = get_enricher()
     convo_data = []
     for c in conversations:
-        # Extract details if message_body exists and details are empty
-        if c.message_body and c.details_status in [None, "", "empty"]:
-            try:
-                extracted = extract_student_details(c.message_body)  # ✅ synchronous helper
-                c.full_thread_summary = extracted.get("full_thread_summary", "")
-                c.details_status = extracted.get("details_status", "empty")
-                c.missing_fields = extracted.get("missing_fields", [])
-                c.follow_up_message = extracted.get("follow_up_message", "")
-                db.commit()
-            except Exception as e:
-                print(f"⚠️ Extraction failed for conversation {c.id}: {e}")
+        # Queue extraction in the background instead of calling the model inside the request
+        enrichment_pending = enricher.is_pending(c.thread_id)
+        if needs_enrichment(c) and not enricher.already_attempted(c.thread_id, c.message_body):
+            enrichment_pending = enricher.enqueue(c.thread_id, sender_email=student.email)
 
         convo_data.append({
             "id": c.id,
@@ -443,9 +694,10 @@ def get_student_by_email(email: str, db: Session = Depends(get_db)):
             "missing_fields": c.missing_fields,
             "follow_up_message": c.follow_up_message,
             "last_updated": c.last_updated,
+            "enrichment_pending": enrichment_pending,
         })
 
-    return {
+    payload = {
         "ok": True,
         "student": {
             "id": student.id,
@@ -460,14 +712,47 @@ def get_student_by_email(email: str, db: Session = Depends(get_db)):
         },
         "conversations": convo_data,
     }
+    # Tagged by student and by every thread, so ingestion into any of them invalidates this view
+    tags = [student_tag(normalized_email)] + [thread_tag(c.thread_id) for c in conversations if c.thread_id]
+    return 200, payload, tags
+
+
+@app.get("/students/{email}")
+async def get_student_by_email(email: str, request: Request, db: AsyncSession = Depends(get_async_db)):
+    normalized_email = email.strip().lower()
+
+    async def build():
+        student = (
+            await db.scalars(select(Student).where(func.lower(Student.email) == normalized_email).limit(1))
+        ).first()
+        if not student:
+            return 404, {"ok": False, "error": "Student not found", "email": normalized_email}, []
+
+        conversations = (
+            await db.scalars(
+                select(Conversation)
+                .where(Conversation.student_id == student.id)
+                .order_by(Conversation.last_updated.desc())
+            )
+        ).all()
+
+        return _student_view(normalized_email, student, conversations)
+
+    return await _serve_cached_async(request, student_cache_key(normalized_email), build)
+
 
 @app.get("/threads/{thread_id}")
-def get_thread(thread_id: str):
+def get_thread(thread_id: str, request: Request):
+    set_span_attributes(thread_id=thread_id)
     creds = _load_creds()
     if not creds:
-        return JSONResponse({"ok": False, "message": "Not logged in"}, status_code=401)
+        return FastJSONResponse({"ok": False, "message": "Not logged in"}, status_code=401)
 
-    service = build_gmail_service(creds)
-    msgs = extract_thread_messages(service, thread_id)
+    def build():
+        service = build_gmail_service(creds)
+        msgs = extract_thread_messages(service, thread_id)
+        # An empty list means the Gmail fetch failed; don't pin that in the cache
+        tags = [thread_tag(thread_id)] if msgs else None
+        return 200, {"ok": True, "threadId": thread_id, "messages": msgs}, tags
 
-    return {"ok": True, "threadId": thread_id, "messages": msgs}
+    return _serve_cached(request, thread_cache_key(thread_id), build)
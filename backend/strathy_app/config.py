@@ -14,3 +14,140 @@ SCOPES = [
 
 CREDENTIALS_FILE = os.getenv("GOOGLE_CREDENTIALS_PATH", "credentials/web_client.json")
 TOKEN_FILE = os.getenv("TOKEN_PATH", "token.json")
+
+# ====== Response cache ======
+# A redis:// URL shares it across processes. "memory" keeps an in-process TTL/LRU, which only sees
+# invalidations made in its own process: right for one API process that also polls (RUN_SCHEDULER_IN_API=1),
+# stale for up to the TTL otherwise. Unset: "memory" when RUN_SCHEDULER_IN_API is set, else "none" (no cache).
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "")
+RESPONSE_CACHE_TTL_SECONDS = float(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "120"))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+
+# ====== Response encoding ======
+# Responses at least this large are gzip/brotli-compressed; -1 disables compression
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1000"))
+RESPONSE_COMPRESSION_LEVEL = int(os.getenv("RESPONSE_COMPRESSION_LEVEL", "6"))
+
+# ====== Background enrichment ======
+ENRICHMENT_MAX_WORKERS = int(os.getenv("ENRICHMENT_MAX_WORKERS", "2"))
+ENRICHMENT_RATE_PER_MINUTE = float(os.getenv("ENRICHMENT_RATE_PER_MINUTE", "30"))
+# Draft a reply for the newest message of each thread from an allowed sender while enriching it
+PRECOMPUTE_DRAFTS = os.getenv("PRECOMPUTE_DRAFTS", "1").lower() in ("1", "true", "yes")
+
+# ====== API rate budgets ======
+ANTHROPIC_REQUESTS_PER_MINUTE = float(os.getenv("ANTHROPIC_REQUESTS_PER_MINUTE", "50"))
+ANTHROPIC_TOKENS_PER_MINUTE = float(os.getenv("ANTHROPIC_TOKENS_PER_MINUTE", "40000"))
+GMAIL_QUOTA_UNITS_PER_SECOND = float(os.getenv("GMAIL_QUOTA_UNITS_PER_SECOND", "250"))
+# Share of each bucket that background work (scheduler, enricher) may not touch
+RATE_LIMIT_INTERACTIVE_RESERVE = float(os.getenv("RATE_LIMIT_INTERACTIVE_RESERVE", "0.2"))
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", "3"))
+
+# ====== Upstream resilience ======
+# Socket timeout for Gmail API calls; model calls use LLM_MODEL_TIMEOUTS
+GMAIL_TIMEOUT_SECONDS = float(os.getenv("GMAIL_TIMEOUT_SECONDS", "30"))
+# Pooled Gmail transport: hosts kept, keep-alive connections per host, and whether extra
+# threads wait for a free connection (1) or open throwaway ones (0)
+GMAIL_HTTP_POOL_CONNECTIONS = int(os.getenv("GMAIL_HTTP_POOL_CONNECTIONS", "4"))
+GMAIL_HTTP_POOL_SIZE = int(os.getenv("GMAIL_HTTP_POOL_SIZE", "16"))
+GMAIL_HTTP_POOL_BLOCK = os.getenv("GMAIL_HTTP_POOL_BLOCK", "1").lower() in ("1", "true", "yes")
+# Parallel messages.get calls when loading the inbox (1 = sequential)
+GMAIL_FETCH_WORKERS = int(os.getenv("GMAIL_FETCH_WORKERS", "8"))
+# Overall budget for one routed model call, fallbacks included
+LLM_CALL_DEADLINE_SECONDS = float(os.getenv("LLM_CALL_DEADLINE_SECONDS", "90"))
+# Consecutive timeouts/5xx that open an upstream's circuit, and how long it stays open
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_RESET_SECONDS = float(os.getenv("CIRCUIT_RESET_SECONDS", "30"))
+# Interactive model calls for these tasks (comma-separated, e.g. "reply") are duplicated when
+# slower than the route's p95; LLM_HEDGE_DELAY_MS is used until enough latencies are seen
+LLM_HEDGE_TASKS = os.getenv("LLM_HEDGE_TASKS", "")
+LLM_HEDGE_DELAY_MS = float(os.getenv("LLM_HEDGE_DELAY_MS", "5000"))
+LLM_HEDGE_MAX_WORKERS = int(os.getenv("LLM_HEDGE_MAX_WORKERS", "16"))
+
+# ====== Tracing ======
+# Point at a local OpenTelemetry collector (OTLP/HTTP), e.g. http://localhost:4318; empty disables tracing
+OTEL_EXPORTER_OTLP_ENDPOINT = os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT", "")
+OTEL_SERVICE_NAME = os.getenv("OTEL_SERVICE_NAME", "strathy-backend")
+
+# ====== Worker ======
+# The API no longer polls Gmail unless this is set; run `python -m backend.strathy_app.worker` instead
+RUN_SCHEDULER_IN_API = os.getenv("RUN_SCHEDULER_IN_API", "0").lower() in ("1", "true", "yes")
+WORKER_POLL_MINUTES = float(os.getenv("WORKER_POLL_MINUTES", "3"))
+WORKER_LOCK_KEY = int(os.getenv("WORKER_LOCK_KEY", "715300001"))
+WORKER_LOCK_FILE = os.getenv("WORKER_LOCK_FILE", ".strathy-worker.lock")
+WORKER_METRICS_PORT = int(os.getenv("WORKER_METRICS_PORT", "0"))
+WORKER_MESSAGES_PER_TICK = int(os.getenv("WORKER_MESSAGES_PER_TICK", "10"))
+# Thread ids hash into this many lanes: one thread's messages are processed in order, by one worker
+# (set the same value on every worker). Lanes are shared out between live workers through the DB
+WORKER_LANES = int(os.getenv("WORKER_LANES", "8"))
+# Threads per worker process; each runs one lane's messages at a time
+WORKER_LANE_THREADS = int(os.getenv("WORKER_LANE_THREADS", "4"))
+# A worker that stops renewing its lanes (crashed) loses them after this long; keep it above a poll interval
+WORKER_LANE_LEASE_SECONDS = int(os.getenv("WORKER_LANE_LEASE_SECONDS", str(int(WORKER_POLL_MINUTES * 60 * 3))))
+
+# ====== Reply ledger ======
+# A claim older than this is considered abandoned (crashed worker) and may be taken over
+REPLY_CLAIM_LEASE_SECONDS = int(os.getenv("REPLY_CLAIM_LEASE_SECONDS", "600"))
+
+# ====== Gmail labels ======
+# Handled mail (replied, blocked or skipped) gets this label so the poller's query can exclude it
+PROCESSED_LABEL_NAME = os.getenv("PROCESSED_LABEL_NAME", "Strathy/Processed")
+# Buffered label changes are flushed with messages.batchModify (Gmail allows at most 1000 ids per call)
+LABEL_BATCH_SIZE = min(int(os.getenv("LABEL_BATCH_SIZE", "1000")), 1000)
+
+# ====== Sender policy ======
+# Allow/block lists for AI replies; edits are picked up without a restart
+SENDER_POLICY_PATH = os.getenv(
+    "SENDER_POLICY_PATH", os.path.join(os.path.dirname(__file__), "sender_policy.json")
+)
+SENDER_POLICY_RELOAD_SECONDS = float(os.getenv("SENDER_POLICY_RELOAD_SECONDS", "5"))
+
+# ====== Thread history ======
+# Parsed messages kept per process (by Gmail message id); only unseen messages are downloaded
+THREAD_MESSAGE_CACHE_SIZE = int(os.getenv("THREAD_MESSAGE_CACHE_SIZE", "5000"))
+
+# ====== Students ======
+# How often the in-process student index checks the students table for changes
+STUDENT_INDEX_REFRESH_SECONDS = float(os.getenv("STUDENT_INDEX_REFRESH_SECONDS", "30"))
+# Rows per transaction when importing a roster
+ROSTER_IMPORT_BATCH_SIZE = int(os.getenv("ROSTER_IMPORT_BATCH_SIZE", "500"))
+# Messages per transaction (and per checkpoint) when importing an mbox / Takeout archive
+ARCHIVE_IMPORT_BATCH_SIZE = int(os.getenv("ARCHIVE_IMPORT_BATCH_SIZE", "1000"))
+
+# ====== Answer cache ======
+# Replies staff marked reusable, offered as drafts for near-identical questions (local TF-IDF, no model call)
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "1").lower() in ("1", "true", "yes")
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.8"))
+ANSWER_CACHE_TTL_HOURS = float(os.getenv("ANSWER_CACHE_TTL_HOURS", "72"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "5000"))
+ANSWER_CACHE_REFRESH_SECONDS = float(os.getenv("ANSWER_CACHE_REFRESH_SECONDS", "30"))
+
+# ====== LLM routing ======
+# "<provider>:<model>" per task; providers: anthropic, stub (deterministic, offline).
+# Extraction is simple field-filling, so it goes to the small fast model by default.
+LLM_REPLY_MODEL = os.getenv("LLM_REPLY_MODEL", "anthropic:claude-sonnet-4-5")
+LLM_EXTRACTION_MODEL = os.getenv("LLM_EXTRACTION_MODEL", "anthropic:claude-haiku-4-5")
+# Precomputed drafts: reply and extraction in one JSON answer, so the reply model by default
+LLM_DRAFT_MODEL = os.getenv("LLM_DRAFT_MODEL", LLM_REPLY_MODEL)
+# Comma-separated fallbacks tried in order when the primary times out or errors
+LLM_REPLY_FALLBACKS = os.getenv("LLM_REPLY_FALLBACKS", "")
+LLM_EXTRACTION_FALLBACKS = os.getenv("LLM_EXTRACTION_FALLBACKS", "anthropic:claude-sonnet-4-5")
+LLM_DRAFT_FALLBACKS = os.getenv("LLM_DRAFT_FALLBACKS", LLM_REPLY_FALLBACKS)
+# Per-model request timeouts, e.g. "claude-haiku-4-5=15,claude-sonnet-4-5=45"
+LLM_MODEL_TIMEOUTS = os.getenv("LLM_MODEL_TIMEOUTS", "claude-haiku-4-5=15,claude-sonnet-4-5=45")
+LLM_DEFAULT_TIMEOUT_SECONDS = float(os.getenv("LLM_DEFAULT_TIMEOUT_SECONDS", "60"))
+# Simulated latency for the offline "stub" provider
+LLM_STUB_LATENCY_MS = float(os.getenv("LLM_STUB_LATENCY_MS", "0"))
+
+# ====== Model input compaction ======
+# Estimated-token budget for the email text in each model call (0 = no limit, repeats are still dropped)
+LLM_INPUT_BUDGET_EXTRACTION = int(os.getenv("LLM_INPUT_BUDGET_EXTRACTION", "3000"))
+LLM_INPUT_BUDGET_REPLY = int(os.getenv("LLM_INPUT_BUDGET_REPLY", "2000"))
+# Over budget, longer bullet/numbered/table runs keep this many lines
+COMPACTION_MAX_LIST_ITEMS = int(os.getenv("COMPACTION_MAX_LIST_ITEMS", "12"))
+
+# ====== Bulk parsing (backfills, imports) ======
+# Processes parse_messages() spreads parsing over (0 = one per CPU, 1 = inline)
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0"))
+PARSE_CHUNK_SIZE = int(os.getenv("PARSE_CHUNK_SIZE", "64"))
+# Smaller batches are parsed inline: starting the pool costs more than it saves
+PARSE_POOL_MIN_MESSAGES = int(os.getenv("PARSE_POOL_MIN_MESSAGES", "500"))
@@ -0,0 +1,56 @@
+# backend/strathy_app/mail_import.py
+"""
+Backfill students, conversations and messages from a mailbox archive, offline
+(no Gmail or model calls).
+
+    python -m backend.strathy_app.mail_import takeout-20261019.zip
+    python -m backend.strathy_app.mail_import "All mail Including Spam and Trash.mbox" --workers 4
+    python -m backend.strathy_app.mail_import exported/ --owner-email adam@strathmore.edu --dry-run
+
+Accepts an mbox file (optionally .gz), a directory of them, or a Google
+Takeout .zip/.tgz read in place. Progress is checkpointed after every batch
+(next to the archive unless --checkpoint is given); re-running resumes, and
+messages already imported are skipped.
+"""
+import argparse
+import logging
+import sys
+import tarfile
+import zipfile
+
+from dotenv import load_dotenv
+
+from .config import ARCHIVE_IMPORT_BATCH_SIZE
+from .services.mail_import_service import import_archive
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="mbox file, directory of .mbox files, or Takeout .zip/.tgz")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_IMPORT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, help="parsing processes (default PARSE_WORKERS; 1 = inline)")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <path>.import-checkpoint.json)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    parser.add_argument("--owner-email", help="the mailbox's own address, to recognise sent mail in plain mbox files")
+    parser.add_argument("--dry-run", action="store_true", help="read and match messages, commit nothing")
+    args = parser.parse_args(argv)
+
+    checkpoint = args.checkpoint or args.path.rstrip("/\\") + ".import-checkpoint.json"
+    try:
+        stats = import_archive(
+            args.path, batch_size=args.batch_size, checkpoint_path=checkpoint, restart=args.restart,
+            dry_run=args.dry_run, workers=args.workers, owner_email=args.owner_email,
+        )
+    except (OSError, ValueError, RuntimeError, zipfile.BadZipFile, tarfile.TarError) as e:
+        print(f"Archive import failed: {e}", file=sys.stderr)
+        return 1
+
+    prefix = "Dry run: " if args.dry_run else ""
+    print(prefix + ", ".join(f"{k}={v}" for k, v in stats.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1 @@
-from .models import Student, Conversation, Message
+from .models import Student, Conversation, Message, ReplyLedger, AnswerCacheEntry
@@ -0,0 +1,72 @@
+# backend/strathy_app/models/async_db.py
+"""
+Asyncio engine and sessions for the API's async handlers, so a query or
+commit doesn't block the event loop. The worker, the enricher and the
+services keep using the synchronous `SessionLocal` from models.py; both
+engines point at the same database.
+
+The async URL is derived from DATABASE_URL (postgresql -> asyncpg,
+sqlite -> aiosqlite) unless ASYNC_DATABASE_URL is set.
+"""
+import os
+import threading
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from .models import DATABASE_URL
+
+# Sync dialect -> asyncio driver for the same database
+_ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite", "mysql": "aiomysql"}
+
+
+def async_database_url(url: str) -> Tuple[str, Dict]:
+    """(async URL, connect_args) for a synchronous SQLAlchemy URL."""
+    override = os.getenv("ASYNC_DATABASE_URL")
+    if override:
+        return override, {}
+
+    sync_url = make_url(url)
+    backend = sync_url.get_backend_name()
+    driver = _ASYNC_DRIVERS.get(backend)
+    if driver is None:
+        raise ValueError(f"No asyncio driver known for {backend} URLs; set ASYNC_DATABASE_URL")
+
+    connect_args = {}
+    query = dict(sync_url.query)
+    if driver == "asyncpg" and "sslmode" in query:
+        # libpq's sslmode is spelled ssl for asyncpg
+        sslmode = query.pop("sslmode")
+        if sslmode != "disable":
+            connect_args["ssl"] = sslmode
+    async_url = sync_url.set(drivername=f"{backend}+{driver}", query=query)
+    return async_url.render_as_string(hide_password=False), connect_args
+
+
+_engine: Optional[AsyncEngine] = None
+_sessionmaker: Optional[async_sessionmaker] = None
+_lock = threading.Lock()
+
+
+def get_async_engine() -> AsyncEngine:
+    global _engine, _sessionmaker
+    if _engine is None:
+        with _lock:
+            if _engine is None:
+                url, connect_args = async_database_url(DATABASE_URL)
+                _engine = create_async_engine(url, connect_args=connect_args)
+                # expire_on_commit=False: attributes stay readable after commit without another (awaited) load
+                _sessionmaker = async_sessionmaker(_engine, expire_on_commit=False)
+    return _engine
+
+
+def AsyncSessionLocal() -> AsyncSession:
+    get_async_engine()
+    return _sessionmaker()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """FastAPI dependency: one AsyncSession per request."""
+    async with AsyncSessionLocal() as db:
+        yield db
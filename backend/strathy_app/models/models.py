@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, create_engine
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, JSON, create_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship, sessionmaker
 from datetime import datetime
@@ -17,6 +17,9 @@ if not DATABASE_URL:
 engine = create_engine(DATABASE_URL)
 Base = declarative_base()
 
+# JSONB on Postgres, plain JSON elsewhere (SQLite for local benchmarks/dev)
+JSONType = JSON().with_variant(JSONB, "postgresql")
+
 
 # =========================
 # 🧑‍🎓 STUDENT MODEL
@@ -57,9 +60,15 @@ class Conversation(Base):
     # 🆕 Per-thread extracted fields (moved from Student)
     full_thread_summary = Column(Text, nullable=True)
     details_status = Column(String(20), nullable=False, default="empty")  # 'complete' | 'partial' | 'empty'
-    missing_fields = Column(JSONB, nullable=False, default=list)
+    missing_fields = Column(JSONType, nullable=False, default=list)
     follow_up_message = Column(Text, nullable=True)
 
+    # 📝 Latest AI draft reply for staff review
+    draft_reply = Column(Text, nullable=True)
+    draft_message_id = Column(String, nullable=True)  # Gmail message the draft answers
+    draft_source = Column(String(20), nullable=True)  # 'streamed' | 'precomputed' | 'cached'
+    draft_created_at = Column(DateTime, nullable=True)
+
     # Relationships
     student = relationship("Student", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation")
@@ -84,6 +93,77 @@ class Message(Base):
     conversation = relationship("Conversation", back_populates="messages")
 
 
+# =========================
+# 🧾 REPLY LEDGER
+# =========================
+class ReplyLedger(Base):
+    """
+    One row per inbound Gmail message we may auto-reply to.
+    state: 'claimed' -> 'generated' (reply_text stored) -> 'sent'
+    """
+    __tablename__ = "reply_ledger"
+
+    id = Column(Integer, primary_key=True, index=True)
+    gmail_message_id = Column(String, unique=True, index=True, nullable=False)
+    thread_id = Column(String, index=True)
+    state = Column(String(20), nullable=False, default="claimed")
+    owner = Column(String, nullable=True)  # claim token of the process currently working on it
+    reply_text = Column(Text, nullable=True)
+    sent_message_id = Column(String, nullable=True)
+    attempts = Column(Integer, nullable=False, default=1)
+    claimed_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# =========================
+# 🧠 ANSWER CACHE
+# =========================
+class AnswerCacheEntry(Base):
+    """
+    An approved (question, reply) pair that can answer similar later questions
+    without a model call. Rows are only inserted and deleted (invalidation,
+    expiry), never edited, apart from the hit counters.
+    """
+    __tablename__ = "answer_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    question = Column(Text, nullable=False)
+    reply = Column(Text, nullable=False)
+    sender_name = Column(String, nullable=True)  # who the reply was addressed to, for personalising
+    source = Column(String(20), nullable=False, default="staff")  # 'staff' | 'auto'
+    thread_id = Column(String, nullable=True)
+    hits = Column(Integer, nullable=False, default=0)
+    last_hit_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=True, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+# =========================
+# 🛣️ WORKER LANES
+# =========================
+class WorkerLane(Base):
+    """
+    Lease on one processing lane (a hash bucket of Gmail thread ids). Only the
+    owner processes mail from threads in the lane, so messages of one thread
+    are never handled by two workers at once.
+    """
+    __tablename__ = "worker_lanes"
+
+    lane = Column(Integer, primary_key=True, autoincrement=False)
+    owner = Column(String, nullable=True)  # worker token, None when free
+    lease_until = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class WorkerHeartbeat(Base):
+    """Live worker processes; lanes are shared out evenly between them."""
+    __tablename__ = "worker_heartbeats"
+
+    owner = Column(String, primary_key=True)
+    seen_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+
 # =========================
 # ⚙️ DATABASE INIT
 # =========================
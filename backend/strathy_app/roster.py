@@ -0,0 +1,44 @@
+# backend/strathy_app/roster.py
+"""
+Import a student roster (CSV or XLSX) into the students table.
+
+    python -m backend.strathy_app.roster students.csv
+    python -m backend.strathy_app.roster roster.xlsx --sheet "2025/26" --dry-run
+
+Columns (header names are matched loosely): admission number, name, email,
+course, year, semester, group. Senders found in the roster with every field
+filled skip model extraction.
+"""
+import argparse
+import logging
+import sys
+
+from dotenv import load_dotenv
+
+from .config import ROSTER_IMPORT_BATCH_SIZE
+from .services.roster_service import import_roster
+
+
+def main(argv=None) -> int:
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="roster file (.csv, .xlsx)")
+    parser.add_argument("--sheet", help="worksheet name for .xlsx (default: the active sheet)")
+    parser.add_argument("--batch-size", type=int, default=ROSTER_IMPORT_BATCH_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="read and match rows, commit nothing")
+    args = parser.parse_args(argv)
+
+    try:
+        stats = import_roster(args.path, batch_size=args.batch_size, sheet=args.sheet, dry_run=args.dry_run)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Roster import failed: {e}", file=sys.stderr)
+        return 1
+
+    prefix = "Dry run: " if args.dry_run else ""
+    print(prefix + ", ".join(f"{k}={v}" for k, v in stats.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
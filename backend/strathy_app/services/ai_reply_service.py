@@ -1,23 +1,38 @@
-#========================
-#=== Anthropic Client ===
-#========================
-import anthropic
-import os
-
-from dotenv import load_dotenv
-load_dotenv()
-ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-# Initialize Anthropic client
-client = anthropic.Anthropic(api_key=ANTHROPIC_API_KEY)
+#==========================
+#=== AI Reply (routed) ===
+#==========================
+import logging
+import time
+from typing import Dict, Iterator, Optional, Tuple
 
-def generate_ai_reply(sender_name: str, sender_email: str, subject: str, body: str) -> str:
-    """
-    Calls Anthropic API to generate a polite, helpful reply
-    based on the sender's email (name, email, subject, and body).
-    Ensures the AI addresses the sender correctly.
-    """
-    try:
-        prompt = f"""
+from .answer_cache import get_answer_cache, personalise, question_text
+from .llm_provider import DRAFT, REPLY, get_llm
+from .resilience import is_upstream_failure
+from .model_extraction_service import SYSTEM_PROMPT as EXTRACTION_PROMPT, _parse_model_json
+from ..config import LLM_INPUT_BUDGET_REPLY
+from ..utils.compaction import compact_for_model
+from ..utils.metrics import STAGE_SECONDS, record_llm_usage, timed
+
+logger = logging.getLogger(__name__)
+
+DRAFT_SYSTEM_PROMPT = EXTRACTION_PROMPT + """
+Additionally, the user message asks for a reply to the email. Put that reply
+(plain text, ready to send) under one more key, "reply", in the same JSON object.
+"""
+
+
+class ReplyGenerationError(Exception):
+    """The reply model call failed, so there is no reply to send."""
+
+    @property
+    def retryable(self) -> bool:
+        """True when the model API was at fault (timeout, outage, open circuit) rather than the request."""
+        return is_upstream_failure(self.__cause__)
+
+
+def build_reply_prompt(sender_name: str, sender_email: str, subject: str, body: str) -> str:
+    body = compact_for_model(body, LLM_INPUT_BUDGET_REPLY, "reply")
+    return f"""
         You are Adam, Strathmore University's AI Administrative Assistant.
 
         The sender is:
@@ -33,55 +48,105 @@ def generate_ai_reply(sender_name: str, sender_email: str, subject: str, body: s
         Do not invent or assume other names.
         """
 
-        response = client.messages.create(
-            model="claude-sonnet-4-5",  # or claude-3-sonnet for cheaper cost
-            max_tokens=300,
-            messages=[{"role": "user", "content": prompt}]
-        )
 
-        return response.content[0].text.strip()
+class CachedReply(str):
+    """Reply text served from the answer cache. It is only ever a draft for staff to review, never auto-sent."""
 
+
+def cached_reply(sender_name: str, subject: str, body: str) -> Optional[CachedReply]:
+    """A reply staff marked reusable for a near-identical question, re-addressed to this sender (no model call)."""
+    try:
+        hit = get_answer_cache().lookup(question_text(subject, body))
     except Exception as e:
-        return f"(Error generating AI reply: {e})"
-
-# # =====================
-# # === Gemini Client ===
-# # =====================
-# from google import genai
-# import os
-#
-#
-# GEMINI_API_KEY = os.getenv("GENAI_API_KEY")  # set this in your environment
-# client = genai.Client(api_key=GEMINI_API_KEY)
-#
-# def generate_ai_reply(sender_name: str, sender_email: str, subject: str, body: str) -> str:
-#     """
-#     Calls Google's Gemini API to generate a polite, helpful reply
-#     based on the sender's email (name, email, subject, and body).
-#     """
-#     try:
-#         prompt = f"""
-#         You are Adam, Strathmore University's AI Administrative Assistant.
-#
-#         The sender is:
-#         Name: {sender_name}
-#         Email: {sender_email}
-#
-#         They wrote the following email:
-#         Subject: {subject}
-#         Body: {body}
-#
-#         Write a professional, concise, and helpful reply.
-#         Make sure to address the sender by their actual name: {sender_name}.
-#         Do not invent or assume other names.
-#         """
-#
-#         response = client.models.generate_content(
-#             model="gemini-2.5-pro",  # or "gemini-1.5-flash" for faster/cheaper responses
-#             contents=prompt,
-#         )
-#
-#         return response.text.strip()
-#
-#     except Exception as e:
-#         return f"(Error generating AI reply: {e})"
\ No newline at end of file
+        logger.warning("Answer cache lookup failed: %s", e)
+        return None
+    if hit is None:
+        return None
+    logger.info("🧠 Answer cache hit (entry %s, similarity %.2f)", hit.entry_id, hit.similarity)
+    return CachedReply(personalise(hit.reply, hit.sender_name, sender_name))
+
+
+@timed("llm.reply")
+def generate_ai_reply(sender_name: str, sender_email: str, subject: str, body: str) -> str:
+    """
+    Calls the reply model (see LLM_REPLY_MODEL) to generate a polite, helpful reply
+    based on the sender's email (name, email, subject, and body).
+    Ensures the AI addresses the sender correctly. This is the auto-send path,
+    so the answer cache is deliberately not consulted here.
+    Raises ReplyGenerationError if every model on the route fails.
+    """
+    try:
+        prompt = build_reply_prompt(sender_name, sender_email, subject, body)
+        response = get_llm().complete(REPLY, prompt, max_tokens=300)
+    except Exception as e:
+        raise ReplyGenerationError(f"Error generating AI reply: {e}") from e
+
+    record_llm_usage("reply", response)
+    return response.text.strip()
+
+
+def stream_ai_reply(sender_name: str, sender_email: str, subject: str, body: str) -> Iterator[str]:
+    """
+    Same reply as generate_ai_reply, yielded as text deltas while the model writes it.
+    Errors propagate to the caller (which has usually shown partial text already).
+    Records time-to-first-token as stage "llm.reply_stream.first_token".
+    An answer cache hit is yielded as a single CachedReply chunk.
+    """
+    cached = cached_reply(sender_name, subject, body)
+    if cached:
+        yield cached
+        return
+    prompt = build_reply_prompt(sender_name, sender_email, subject, body)
+    started = time.perf_counter()
+    first = True
+    response = None
+    stream = get_llm().stream(REPLY, prompt, max_tokens=300)
+    while True:
+        try:
+            chunk = next(stream)
+        except StopIteration as stop:
+            response = stop.value
+            break
+        if first:
+            STAGE_SECONDS.labels(stage="llm.reply_stream.first_token").observe(time.perf_counter() - started)
+            first = False
+        yield chunk
+
+    STAGE_SECONDS.labels(stage="llm.reply_stream").observe(time.perf_counter() - started)
+    if response is not None:
+        record_llm_usage("reply", response)
+
+
+@timed("llm.draft")
+def draft_reply(
+    sender_name: str, sender_email: str, subject: str, body: str, with_details: bool = False
+) -> Tuple[Optional[str], Optional[Dict]]:
+    """
+    Background draft of the reply to an email, for staff to review.
+
+    With `with_details`, one model call (LLM_DRAFT_MODEL) returns the reply and
+    the student-detail extraction together as JSON; the details come back as
+    the second item, or None if the answer couldn't be parsed. Without it, a
+    reusable staff answer to a near-identical question comes back as a
+    CachedReply (no model call). Errors propagate rather than being turned
+    into reply text.
+    """
+    if not with_details:
+        cached = cached_reply(sender_name, subject, body)
+        if cached:
+            return cached, None
+
+    prompt = build_reply_prompt(sender_name, sender_email, subject, body)
+    if not with_details:
+        response = get_llm().complete(REPLY, prompt, max_tokens=300)
+        record_llm_usage("draft", response)
+        return response.text.strip() or None, None
+
+    response = get_llm().complete(DRAFT, prompt, system=DRAFT_SYSTEM_PROMPT, max_tokens=3000, temperature=0)
+    record_llm_usage("draft", response)
+    data = _parse_model_json(response.text)
+    if "error" in data or not isinstance(data.get("reply"), str):
+        logger.warning("Draft model returned no usable JSON for %s", sender_email)
+        return None, None
+    reply = data.pop("reply").strip()
+    return reply or None, data
@@ -0,0 +1,323 @@
+# backend/strathy_app/services/answer_cache.py
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import func
+
+from backend.strathy_app.models.models import AnswerCacheEntry, SessionLocal
+from ..config import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_REFRESH_SECONDS,
+    ANSWER_CACHE_THRESHOLD,
+    ANSWER_CACHE_TTL_HOURS,
+)
+from ..utils.metrics import ANSWER_CACHE_LOOKUPS, ANSWER_CACHE_SIMILARITY
+
+logger = logging.getLogger(__name__)
+
+# Near-identical questions aren't stored twice
+DUPLICATE_SIMILARITY = 0.97
+# Too little text to match on safely
+MIN_QUESTION_TERMS = 4
+
+_WORD_RE = re.compile(r"[a-z][a-z']+|\d{1,4}")
+# Admission numbers and the like: a reply mentioning one was written for one student
+_PERSONAL_RE = re.compile(r"\b\d{5,}\b|\b[A-Z]{2,}/\d+/\d+\b")
+_QUOTED_RE = re.compile(r"^\s*On .{0,200}wrote:\s*$", re.MULTILINE)
+_SALUTATION_RE = re.compile(r"^(\s*(?:dear|hi|hello)\s+)([^,\n]+)(,?)", re.IGNORECASE)
+# "I have NOT paid" and "I paid" differ by one term and still score ~0.86
+_NEGATION_RE = re.compile(r"\b(?:not|no|never|nor|none|nothing|neither|cannot|without|unable)\b|n't\b", re.IGNORECASE)
+
+_STOPWORDS = frozenset("""
+a about am an and any are as at be been but by can could dear do does for from get good got had has have hello
+hi how i i'm if in is it it's just kindly let me my of on or our please regards so thank thanks that the their
+them there this to was we were what when where which who why will with would you your yours sir madam morning
+afternoon evening greetings best sincerely
+""".split())
+
+
+def question_text(subject: Optional[str], body: Optional[str]) -> str:
+    """The text a question is matched on: subject plus body, without quoted earlier mail."""
+    body = body or ""
+    quoted = _QUOTED_RE.search(body)
+    if quoted:
+        body = body[:quoted.start()]
+    body = "\n".join(line for line in body.splitlines() if not line.lstrip().startswith(">"))
+    return f"{subject or ''}\n{body}".strip()
+
+
+def _terms(text: str) -> List[str]:
+    words = [w for w in _WORD_RE.findall((text or "").lower()) if w not in _STOPWORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+def _facts(text: str) -> Tuple[bool, FrozenSet[str]]:
+    """What must match exactly for a cached answer to apply: negated or not, and the figures mentioned."""
+    text = (text or "").replace("\u2019", "'")
+    return bool(_NEGATION_RE.search(text)), frozenset(re.findall(r"\d+", text))
+
+
+def personalise(reply: str, cached_name: Optional[str], sender_name: Optional[str]) -> str:
+    """Re-address a cached reply: swap the salutation (and any other use of the old name) for the new sender."""
+    if not sender_name:
+        return reply
+    if cached_name and cached_name.strip() and cached_name.strip() != sender_name:
+        reply = re.sub(rf"\b{re.escape(cached_name.strip())}\b", lambda _: sender_name, reply)
+    return _SALUTATION_RE.sub(lambda m: f"{m.group(1)}{sender_name}{m.group(3)}", reply, count=1)
+
+
+class _Index(NamedTuple):
+    idf: Dict[str, float]
+    vectors: Dict[int, Dict[str, float]]
+    postings: Dict[str, Set[int]]
+    entries: Dict[int, AnswerCacheEntry]
+    facts: Dict[int, Tuple[bool, FrozenSet[str]]]
+
+
+def _vector(terms: List[str], idf: Dict[str, float]) -> Dict[str, float]:
+    tf = Counter(t for t in terms if t in idf)
+    vec = {t: (1 + math.log(n)) * idf[t] for t, n in tf.items()}
+    norm = math.sqrt(sum(w * w for w in vec.values()))
+    return {t: w / norm for t, w in vec.items()} if norm else {}
+
+
+class AnswerHit(NamedTuple):
+    entry_id: int
+    reply: str
+    sender_name: Optional[str]
+    similarity: float
+
+
+class AnswerCache:
+    """
+    Local similarity cache over approved (question, reply) pairs.
+
+    Questions are compared as TF-IDF vectors of words and word pairs (cosine
+    similarity, no model or network). A lookup at or above `threshold`
+    returns the stored reply, provided both questions are negated (or not)
+    alike and mention the same figures: "I have not paid" never gets the
+    answer to "I paid". Entries are replies staff marked reusable; hits are
+    only ever offered as drafts for review, never sent automatically.
+
+    Entries live in the answer_cache table, so every process shares them;
+    each process keeps the vectors in memory and rebuilds them when rows are
+    added or deleted (checked at most every `refresh_seconds`). Entries
+    expire `ttl_hours` after they were stored.
+    """
+
+    def __init__(self, threshold: float = ANSWER_CACHE_THRESHOLD, ttl_hours: float = ANSWER_CACHE_TTL_HOURS,
+                 refresh_seconds: float = ANSWER_CACHE_REFRESH_SECONDS,
+                 max_entries: int = ANSWER_CACHE_MAX_ENTRIES, enabled: bool = ANSWER_CACHE_ENABLED):
+        self.threshold = threshold
+        self.ttl_hours = ttl_hours
+        self.refresh_seconds = refresh_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._index = _Index({}, {}, {}, {}, {})  # replaced as a whole on reload
+        self._version = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    # ---- index ----
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if not self._stale and now - self._checked_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if not self._stale and now - self._checked_at < self.refresh_seconds:
+                return
+            self._checked_at = now
+            db = SessionLocal()
+            try:
+                # Rows are only ever inserted or deleted, so count + max id identifies the contents
+                version = tuple(db.query(func.count(AnswerCacheEntry.id), func.max(AnswerCacheEntry.id)).one())
+                if version == self._version and not self._stale:
+                    return
+                self._stale = False
+                rows = (
+                    db.query(AnswerCacheEntry)
+                    .filter((AnswerCacheEntry.expires_at.is_(None)) | (AnswerCacheEntry.expires_at > datetime.utcnow()))
+                    .order_by(AnswerCacheEntry.id.desc())
+                    .limit(self.max_entries)
+                    .all()
+                )
+                for row in rows:
+                    db.expunge(row)
+            except Exception as e:
+                logger.error("Could not load the answer cache (keeping previous): %s", e)
+                return
+            finally:
+                db.close()
+
+            docs = {row.id: _terms(row.question) for row in rows}
+            df = Counter(t for terms in docs.values() for t in set(terms))
+            idf = {t: math.log((1 + len(docs)) / (1 + n)) + 1 for t, n in df.items()}
+            vectors = {entry_id: _vector(terms, idf) for entry_id, terms in docs.items()}
+            postings: Dict[str, Set[int]] = {}
+            for entry_id, vec in vectors.items():
+                for t in vec:
+                    postings.setdefault(t, set()).add(entry_id)
+            facts = {row.id: _facts(row.question) for row in rows}
+            self._index = _Index(idf, vectors, postings, {row.id: row for row in rows}, facts)
+            self._version = version
+            logger.info("🧠 Answer cache loaded: %d entries", len(rows))
+
+    def _best(self, text: str):
+        index = self._index
+        query = _vector(_terms(text), index.idf)
+        facts = _facts(text)
+        candidates = set().union(*(index.postings.get(t, ()) for t in query)) if query else set()
+        best, best_sim = None, 0.0
+        now = datetime.utcnow()
+        for entry_id in candidates:
+            entry = index.entries[entry_id]
+            if (entry.expires_at and entry.expires_at <= now) or index.facts[entry_id] != facts:
+                continue
+            vec = index.vectors[entry_id]
+            sim = sum(w * vec.get(t, 0.0) for t, w in query.items())
+            if sim > best_sim:
+                best, best_sim = entry, sim
+        return best, best_sim
+
+    # ---- public API ----
+    def lookup(self, question: str) -> Optional[AnswerHit]:
+        """The cached reply for the most similar stored question, if similar enough."""
+        if not self.enabled:
+            return None
+        self._maybe_reload()
+        entry, similarity = self._best(question)
+        ANSWER_CACHE_SIMILARITY.observe(similarity)
+        if entry is None or similarity < self.threshold:
+            with self._lock:
+                self._misses += 1
+            ANSWER_CACHE_LOOKUPS.labels(result="miss").inc()
+            return None
+
+        with self._lock:
+            self._hits += 1
+        ANSWER_CACHE_LOOKUPS.labels(result="hit").inc()
+        self._record_hit(entry.id)
+        return AnswerHit(entry.id, entry.reply, entry.sender_name, round(similarity, 4))
+
+    @staticmethod
+    def _record_hit(entry_id: int):
+        db = SessionLocal()
+        try:
+            db.query(AnswerCacheEntry).filter(AnswerCacheEntry.id == entry_id).update(
+                {AnswerCacheEntry.hits: AnswerCacheEntry.hits + 1, AnswerCacheEntry.last_hit_at: datetime.utcnow()},
+                synchronize_session=False,
+            )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("Could not record answer cache hit %s: %s", entry_id, e)
+        finally:
+            db.close()
+
+    def remember(self, question: str, reply: str, sender_name: Optional[str] = None, source: str = "staff",
+                 thread_id: Optional[str] = None, sender_email: Optional[str] = None) -> Optional[int]:
+        """
+        Store an approved reply for reuse. Skipped (None) when the question is
+        too short to match safely, the reply looks written for one student
+        (admission numbers, their email), or a near-identical question is
+        already cached.
+        """
+        if not self.enabled or not reply or not reply.strip():
+            return None
+        if len(set(_terms(question))) < MIN_QUESTION_TERMS:
+            return None
+        if _PERSONAL_RE.search(reply) or (sender_email and sender_email.lower() in reply.lower()):
+            return None
+
+        self._maybe_reload()
+        _, similarity = self._best(question)
+        if similarity >= DUPLICATE_SIMILARITY:
+            return None
+
+        now = datetime.utcnow()
+        db = SessionLocal()
+        try:
+            # Expired rows are never matched; drop them while we're writing anyway
+            db.query(AnswerCacheEntry).filter(AnswerCacheEntry.expires_at <= now).delete(synchronize_session=False)
+            entry = AnswerCacheEntry(
+                question=question,
+                reply=reply.strip(),
+                sender_name=sender_name,
+                source=source,
+                thread_id=thread_id,
+                created_at=now,
+                expires_at=now + timedelta(hours=self.ttl_hours) if self.ttl_hours > 0 else None,
+            )
+            db.add(entry)
+            db.commit()
+            entry_id = entry.id
+        except Exception as e:
+            db.rollback()
+            logger.warning("Could not store answer cache entry: %s", e)
+            return None
+        finally:
+            db.close()
+        self._stale = True
+        return entry_id
+
+    def invalidate(self, entry_id: Optional[int] = None, contains: Optional[str] = None,
+                   expired_only: bool = False) -> int:
+        """
+        Delete cached answers: one entry, those whose question or reply
+        contains `contains` (case-insensitive), only the expired ones, or,
+        with no arguments, all of them. Returns the number deleted.
+        """
+        db = SessionLocal()
+        try:
+            query = db.query(AnswerCacheEntry)
+            if entry_id is not None:
+                query = query.filter(AnswerCacheEntry.id == entry_id)
+            if contains:
+                pattern = f"%{contains.lower()}%"
+                query = query.filter(
+                    func.lower(AnswerCacheEntry.question).like(pattern) | func.lower(AnswerCacheEntry.reply).like(pattern)
+                )
+            if expired_only:
+                query = query.filter(AnswerCacheEntry.expires_at <= datetime.utcnow())
+            deleted = query.delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        self._stale = True
+        return deleted
+
+    def stats(self) -> Dict:
+        self._maybe_reload()
+        lookups = self._hits + self._misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._index.entries),
+            "threshold": self.threshold,
+            "ttl_hours": self.ttl_hours,
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": round(self._hits / lookups, 4) if lookups else None,
+        }
+
+
+_cache: Optional[AnswerCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = AnswerCache()
+    return _cache
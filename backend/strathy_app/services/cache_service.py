@@ -0,0 +1,233 @@
+# backend/strathy_app/services/cache_service.py
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, NamedTuple, Optional
+
+from ..config import (
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_TTL_SECONDS,
+    RESPONSE_CACHE_URL,
+    RUN_SCHEDULER_IN_API,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    """A serialized response body plus its strong ETag."""
+    body: bytes
+    etag: str
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the exact response bytes."""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header value against a strong ETag."""
+    if not if_none_match:
+        return False
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+# ========================
+# In-process TTL/LRU cache
+# ========================
+class LocalResponseCache:
+    """Thread-safe TTL + LRU cache with tag-based invalidation."""
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 120):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple[float, CachedResponse, tuple]]" = OrderedDict()
+        self._tags: dict[str, set] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            item = self._entries.get(key)
+            if not item:
+                return None
+            expires_at, value, _tags = item
+            if expires_at < time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: CachedResponse, tags: Iterable[str] = ()):
+        tags = tuple(set(tags))
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.get(tag, ())):
+                    self._drop(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _drop(self, key: str):
+        item = self._entries.pop(key, None)
+        if not item:
+            return
+        for tag in item[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    self._tags.pop(tag, None)
+
+
+# ========================
+# Redis-backed cache
+# ========================
+class RedisResponseCache:
+    """Same interface as LocalResponseCache, shared across processes via Redis."""
+
+    PREFIX = "strathy:resp:"
+
+    def __init__(self, url: str, ttl_seconds: float = 120):
+        import redis  # optional dependency, only needed when RESPONSE_CACHE_URL points at Redis
+
+        self.ttl_seconds = int(ttl_seconds)
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        raw = self._redis.get(self.PREFIX + key)
+        if not raw:
+            return None
+        data = json.loads(raw)
+        return CachedResponse(body=data["body"].encode("utf-8"), etag=data["etag"])
+
+    def set(self, key: str, value: CachedResponse, tags: Iterable[str] = ()):
+        payload = json.dumps({"body": value.body.decode("utf-8"), "etag": value.etag})
+        pipe = self._redis.pipeline()
+        pipe.set(self.PREFIX + key, payload, ex=self.ttl_seconds)
+        for tag in set(tags):
+            pipe.sadd(self.PREFIX + "tag:" + tag, key)
+            pipe.expire(self.PREFIX + "tag:" + tag, self.ttl_seconds)
+        pipe.execute()
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        for tag in tags:
+            tag_key = self.PREFIX + "tag:" + tag
+            keys = self._redis.smembers(tag_key)
+            if keys:
+                self._redis.delete(*[self.PREFIX + k.decode("utf-8") for k in keys])
+            self._redis.delete(tag_key)
+
+    def clear(self):
+        for key in self._redis.scan_iter(self.PREFIX + "*"):
+            self._redis.delete(key)
+
+
+# ========================
+# No cache
+# ========================
+class NullResponseCache:
+    """Same interface, caches nothing: every request is built from the DB (ETags and 304s still work)."""
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        return None
+
+    def set(self, key: str, value: CachedResponse, tags: Iterable[str] = ()):
+        pass
+
+    def invalidate_tags(self, tags: Iterable[str]):
+        pass
+
+    def clear(self):
+        pass
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """
+    Return the process-wide response cache (see RESPONSE_CACHE_URL).
+
+    Invalidations made by another process (the worker, another API worker, a
+    CLI import) only reach this one through Redis. So the in-process cache is
+    the default only when this API process also does the polling; otherwise,
+    without Redis, nothing is cached rather than serving stale views. An
+    explicit "memory" with a separate worker is honoured, with a warning.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                url = RESPONSE_CACHE_URL or ("memory" if RUN_SCHEDULER_IN_API else "none")
+                if url.startswith("redis://") or url.startswith("rediss://"):
+                    try:
+                        _cache = RedisResponseCache(url, RESPONSE_CACHE_TTL_SECONDS)
+                    except Exception as e:
+                        logger.warning("Redis response cache unavailable (%s); caching nothing", e)
+                        _cache = NullResponseCache()
+                elif url == "memory":
+                    if not RUN_SCHEDULER_IN_API:
+                        logger.warning(
+                            "RESPONSE_CACHE_URL=memory without RUN_SCHEDULER_IN_API: changes made by the worker or "
+                            "other processes don't invalidate this process's cache, so /students and /threads "
+                            "can be up to %ss stale. Use a redis:// URL.", int(RESPONSE_CACHE_TTL_SECONDS),
+                        )
+                    _cache = LocalResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS)
+                else:
+                    _cache = NullResponseCache()
+    return _cache
+
+
+# ========================
+# Keys, tags & invalidation
+# ========================
+def student_cache_key(email: str) -> str:
+    return f"student:{(email or '').strip().lower()}"
+
+
+def thread_cache_key(thread_id: str) -> str:
+    return f"thread:{thread_id}"
+
+
+def student_tag(email: str) -> str:
+    return f"student:{(email or '').strip().lower()}"
+
+
+def thread_tag(thread_id: str) -> str:
+    return f"thread:{thread_id}"
+
+
+def invalidate_ingestion(thread_id: Optional[str] = None, email: Optional[str] = None):
+    """
+    Called whenever a message is ingested, replied to or enriched.
+    Drops every cached view that depends on the thread and/or the student.
+    """
+    tags = []
+    if thread_id:
+        tags.append(thread_tag(thread_id))
+    if email:
+        tags.append(student_tag(email))
+    if not tags:
+        return
+    try:
+        get_response_cache().invalidate_tags(tags)
+    except Exception as e:
+        logger.warning("Response cache invalidation failed for %s: %s", tags, e)
@@ -2,7 +2,8 @@
 
 from sqlalchemy.orm import Session
 from datetime import datetime
-from backend.strathy_app.models.models import Conversation, Message
+from backend.strathy_app.models.models import Conversation, Message, Student
+from .student_index import get_student_index
 from .student_service import create_or_update_student
 from backend.strathy_app.services.model_extraction_service import extract_student_details
 
@@ -11,24 +12,35 @@ def save_conversation_and_messages(db: Session, email_text: str, subject: str, s
     """
     Extracts student details, saves/updates the student, and stores
     thread-specific info (summary, missing fields, follow-up) in the Conversation table.
+
+    A sender the student index already knows with complete details skips the
+    model call: their stored record is used as the extraction result.
     """
 
-    # 🔍 Extract structured info from message text
-    extracted = extract_student_details(email_text) or {}
+    known = get_student_index().complete_student(sender_email)
+    student = db.get(Student, known.id) if known else None
+    fast_path = student is not None
 
-    # 🧠 Student-level data (stable identity info)
-    student_data = {
-        "full_name": extracted.get("full_name"),
-        "admission_number": extracted.get("admission_number"),
-        "course": extracted.get("course"),
-        "year": extracted.get("year"),
-        "semester": extracted.get("semester"),
-        "group": extracted.get("group"),
-        "email": sender_email,
-    }
+    if fast_path:
+        # ⚡ Known student: nothing to extract, keep the thread's existing summary
+        extracted = known.as_extraction()
+    else:
+        # 🔍 Extract structured info from message text
+        extracted = extract_student_details(email_text) or {}
+
+        # 🧠 Student-level data (stable identity info)
+        student_data = {
+            "full_name": extracted.get("full_name"),
+            "admission_number": extracted.get("admission_number"),
+            "course": extracted.get("course"),
+            "year": extracted.get("year"),
+            "semester": extracted.get("semester"),
+            "group": extracted.get("group"),
+            "email": sender_email,
+        }
 
-    # 🏫 Create or update Student record
-    student = create_or_update_student(db, student_data, thread_id=thread_id)
+        # 🏫 Create or update Student record
+        student = create_or_update_student(db, student_data, thread_id=thread_id)
 
     # 🎯 Find or create Conversation record (thread-level)
     convo = (
@@ -62,6 +74,11 @@ def save_conversation_and_messages(db: Session, email_text: str, subject: str, s
         convo.details_status = details_status or convo.details_status
         convo.missing_fields = missing_fields or convo.missing_fields
         convo.follow_up_message = follow_up_message or convo.follow_up_message
+        if fast_path:
+            # Nothing is missing any more: drop an earlier request for details
+            convo.student_id = convo.student_id or student.id
+            convo.missing_fields = []
+            convo.follow_up_message = ""
 
     db.commit()
     db.refresh(convo)
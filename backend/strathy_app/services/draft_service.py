@@ -0,0 +1,100 @@
+# backend/strathy_app/services/draft_service.py
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from backend.strathy_app.models.models import SessionLocal, Conversation
+from .cache_service import invalidate_ingestion
+
+logger = logging.getLogger(__name__)
+
+# draft_source of a draft served from the answer cache (not model-written for this message)
+CACHED_SOURCE = "cached"
+
+
+def save_draft(
+    thread_id: str,
+    message_id: Optional[str],
+    text: str,
+    source: str,
+    subject: Optional[str] = None,
+    body: Optional[str] = None,
+) -> bool:
+    """Store the AI draft for a thread (creating the conversation preview if needed)."""
+    if not thread_id or not text:
+        return False
+    db = SessionLocal()
+    try:
+        conversation = db.query(Conversation).filter(Conversation.thread_id == thread_id).first()
+        if not conversation:
+            conversation = Conversation(thread_id=thread_id, subject=subject, message_body=body or "")
+            db.add(conversation)
+        conversation.draft_reply = text
+        conversation.draft_message_id = message_id
+        conversation.draft_source = source
+        conversation.draft_created_at = datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning("Failed to save draft for thread %s: %s", thread_id, e)
+        return False
+    finally:
+        db.close()
+
+    invalidate_ingestion(thread_id=thread_id)
+    return True
+
+
+
+def is_fresh(conversation: Optional[Conversation], message_id: Optional[str]) -> bool:
+    """A draft is only good for the message it answered; a newer message makes it stale."""
+    return bool(
+        conversation
+        and conversation.draft_reply
+        and message_id
+        and conversation.draft_message_id == message_id
+    )
+
+
+def clear_stale_draft(db, conversation: Optional[Conversation], message_id: Optional[str]) -> bool:
+    """Drop a draft written for an older message of the thread (caller's session). True if cleared."""
+    if not conversation or not conversation.draft_reply or not message_id:
+        return False
+    if conversation.draft_message_id == message_id:
+        return False
+    conversation.draft_reply = None
+    conversation.draft_message_id = None
+    conversation.draft_source = None
+    conversation.draft_created_at = None
+    db.commit()
+    return True
+
+
+def draft_payload(conversation: Optional[Conversation], message_id: Optional[str] = None) -> Dict:
+    """The draft fields the dashboard gets; without `message_id` the stored draft is returned as is."""
+    fresh = is_fresh(conversation, message_id) if message_id else bool(conversation and conversation.draft_reply)
+    return {
+        "draft_reply": conversation.draft_reply if fresh else "",
+        "draft_message_id": conversation.draft_message_id if fresh else None,
+        "draft_source": conversation.draft_source if fresh else None,
+        "draft_created_at": conversation.draft_created_at.isoformat()
+        if fresh and conversation.draft_created_at else None,
+    }
+
+
+def fresh_draft(thread_id: Optional[str], message_id: Optional[str]) -> Optional[str]:
+    """
+    The stored draft text if it answers `message_id`, else None. Drafts taken
+    from the answer cache are never returned: this feeds the auto-send path,
+    and those are only for staff to review.
+    """
+    if not thread_id or not message_id:
+        return None
+    db = SessionLocal()
+    try:
+        conversation = db.query(Conversation).filter(Conversation.thread_id == thread_id).first()
+        if not is_fresh(conversation, message_id) or conversation.draft_source == CACHED_SOURCE:
+            return None
+        return conversation.draft_reply
+    finally:
+        db.close()
@@ -0,0 +1,294 @@
+# backend/strathy_app/services/enrichment_service.py
+import hashlib
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from backend.strathy_app.models.models import SessionLocal, Conversation, Student
+from ..config import ENRICHMENT_MAX_WORKERS, ENRICHMENT_RATE_PER_MINUTE, PRECOMPUTE_DRAFTS
+from .cache_service import invalidate_ingestion
+from .draft_service import CACHED_SOURCE, clear_stale_draft, is_fresh, save_draft
+from .rate_limiter import BACKGROUND, priority
+from .sender_policy import get_sender_policy
+from .student_index import get_student_index
+from .student_service import create_or_update_student
+
+logger = logging.getLogger(__name__)
+
+
+def needs_enrichment(conversation: Optional[Conversation]) -> bool:
+    """A conversation needs extraction when it has text but no details yet."""
+    return bool(
+        conversation
+        and conversation.message_body
+        and conversation.details_status in [None, "", "empty"]
+    )
+
+
+def _body_hash(body: str) -> str:
+    return hashlib.sha1((body or "").encode("utf-8")).hexdigest()
+
+
+class _RateBudget:
+    """Simple per-minute budget so background extraction can't flood the model API."""
+
+    def __init__(self, per_minute: float):
+        self.per_minute = per_minute
+        self._allowance = per_minute
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if self.per_minute <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._allowance = min(
+                    self.per_minute, self._allowance + (now - self._last) * self.per_minute / 60.0
+                )
+                self._last = now
+                if self._allowance >= 1:
+                    self._allowance -= 1
+                    return
+                wait = (1 - self._allowance) * 60.0 / self.per_minute
+            time.sleep(wait)
+
+
+class Enricher:
+    """
+    Background enrichment for conversations.
+
+    Read endpoints call `enqueue()` and return immediately; a bounded pool
+    upserts the conversation preview, runs `extract_student_details` and
+    commits, then invalidates cached views for the thread/student.
+
+    Given the thread's newest `message_id`, it also drafts a reply for staff
+    (if the sender is allowed and there's no draft for that message yet).
+    When the thread still needs extraction too, both come from one model call.
+    A draft for an older message is cleared first, and a draft finished after
+    a newer message was queued is discarded.
+    """
+
+    def __init__(self, max_workers: int = 2, rate_per_minute: float = 30,
+                 precompute_drafts: bool = PRECOMPUTE_DRAFTS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="enricher")
+        self._budget = _RateBudget(rate_per_minute)
+        self._pending: Dict[str, Dict] = {}
+        self._running: set = set()
+        # thread_id -> hash of the body we last extracted, so an "empty" result isn't re-billed on every read
+        self._attempted: Dict[str, str] = {}
+        # thread_id -> newest Gmail message id seen, so a slow draft can't overwrite a newer one
+        self._latest_message: Dict[str, str] = {}
+        self.precompute_drafts = precompute_drafts
+        self._lock = threading.Lock()
+
+    def is_pending(self, thread_id: Optional[str]) -> bool:
+        with self._lock:
+            return bool(thread_id) and (thread_id in self._pending or thread_id in self._running)
+
+    def already_attempted(self, thread_id: Optional[str], body: Optional[str]) -> bool:
+        with self._lock:
+            return bool(thread_id) and self._attempted.get(thread_id) == _body_hash(body)
+
+    def enqueue(
+        self,
+        thread_id: str,
+        sender_email: Optional[str] = None,
+        subject: Optional[str] = None,
+        body: Optional[str] = None,
+        message_id: Optional[str] = None,
+        sender_name: Optional[str] = None,
+    ) -> bool:
+        """
+        Queue a thread for preview upsert + extraction (+ a draft reply when
+        `message_id`, the thread's newest message, is given). Returns True if
+        pending afterwards.
+        """
+        if not thread_id:
+            return False
+        fields = {"sender_email": sender_email, "subject": subject, "body": body,
+                  "message_id": message_id, "sender_name": sender_name}
+        with self._lock:
+            if message_id:
+                self._latest_message[thread_id] = message_id
+            task = self._pending.get(thread_id)
+            if task is not None:
+                # Coalesce: the queued job picks up the newest preview when it runs
+                task.update({k: v for k, v in fields.items() if v})
+                return True
+            self._pending[thread_id] = fields
+        self._executor.submit(self._run, thread_id)
+        return True
+
+    def _run(self, thread_id: str):
+        with self._lock:
+            task = self._pending.pop(thread_id, None) or {}
+            self._running.add(thread_id)
+        db = SessionLocal()
+        try:
+            with priority(BACKGROUND):
+                self._enrich(db, thread_id, task)
+        except Exception as e:
+            db.rollback()
+            logger.warning("⚠️ Enrichment failed for thread %s: %s", thread_id, e)
+        finally:
+            db.close()
+            with self._lock:
+                self._running.discard(thread_id)
+
+    def _enrich(self, db, thread_id: str, task: Dict):
+        conversation, student = self._upsert_preview(db, thread_id, task)
+        sender_email = task.get("sender_email") or (student.email if student else None)
+        message_id = task.get("message_id")
+        wants_extraction = (
+            needs_enrichment(conversation) and not self.already_attempted(thread_id, conversation.message_body)
+        )
+
+        if wants_extraction and self._fill_known_student(db, conversation, sender_email):
+            wants_extraction = False
+
+        if conversation and message_id:
+            clear_stale_draft(db, conversation, message_id)
+        if self._wants_draft(conversation, message_id, sender_email):
+            self._budget.acquire()
+            details = self._draft(conversation, task, sender_email, with_details=wants_extraction)
+            if details is not None:
+                self._apply_details(db, conversation, student, sender_email, details)
+                wants_extraction = False
+
+        if wants_extraction:
+            self._budget.acquire()
+            self._extract(db, conversation, student, sender_email)
+
+        invalidate_ingestion(thread_id=thread_id, email=sender_email)
+
+    def _fill_known_student(self, db, conversation: Conversation, sender_email: Optional[str]) -> bool:
+        """⚡ A sender with a complete students row needs no extraction; True if that applied."""
+        known = get_student_index().complete_student(sender_email)
+        if known is None:
+            return False
+        conversation.student_id = conversation.student_id or known.id
+        conversation.details_status = "complete"
+        conversation.missing_fields = []
+        conversation.follow_up_message = ""
+        db.commit()
+        with self._lock:
+            self._attempted[conversation.thread_id] = _body_hash(conversation.message_body)
+        return True
+
+    def _wants_draft(self, conversation: Optional[Conversation], message_id: Optional[str],
+                     sender_email: Optional[str]) -> bool:
+        return bool(
+            self.precompute_drafts
+            and conversation
+            and message_id
+            and not is_fresh(conversation, message_id)
+            and sender_email
+            and get_sender_policy().is_allowed(sender_email)
+        )
+
+    def _draft(self, conversation: Conversation, task: Dict, sender_email: str,
+               with_details: bool) -> Optional[Dict]:
+        """Draft the reply (and, with_details, extract in the same call); returns the details or None."""
+        from backend.strathy_app.services.ai_reply_service import CachedReply, draft_reply
+
+        thread_id, message_id = conversation.thread_id, task["message_id"]
+        body = conversation.message_body
+        try:
+            reply, details = draft_reply(
+                task.get("sender_name") or sender_email.split("@")[0],
+                sender_email,
+                conversation.subject or "(no subject)",
+                body,
+                with_details=with_details,
+            )
+        except Exception as e:
+            logger.warning("⚠️ Drafting failed for thread %s: %s", thread_id, e)
+            return None
+
+        with self._lock:
+            superseded = self._latest_message.get(thread_id, message_id) != message_id
+            if details is not None:
+                self._attempted[thread_id] = _body_hash(body)
+        if superseded:
+            logger.info("📝 Dropping draft for %s: thread %s has a newer message", message_id, thread_id)
+        elif reply:
+            source = CACHED_SOURCE if isinstance(reply, CachedReply) else "precomputed"
+            save_draft(thread_id, message_id, reply, source=source)
+        return details
+
+    @staticmethod
+    def _upsert_preview(db, thread_id: str, task: Dict):
+        conversation = db.query(Conversation).filter(Conversation.thread_id == thread_id).first()
+        student = (
+            db.query(Student).filter(Student.id == conversation.student_id).first()
+            if conversation and conversation.student_id
+            else None
+        )
+
+        subject, body = task.get("subject"), task.get("body")
+        if not conversation:
+            if body is None and subject is None:
+                return None, student
+            conversation = Conversation(
+                student_id=student.id if student else None,
+                thread_id=thread_id,
+                subject=subject,
+                message_body=body or "",
+            )
+            db.add(conversation)
+            db.commit()
+        elif (subject and subject != conversation.subject) or (body and body != conversation.message_body):
+            conversation.subject = subject or conversation.subject
+            conversation.message_body = body or conversation.message_body
+            db.commit()
+        return conversation, student
+
+    def _extract(self, db, conversation: Conversation, student: Optional[Student], sender_email: Optional[str]):
+        from backend.strathy_app.services.model_extraction_service import extract_student_details
+
+        body = conversation.message_body
+        extracted = extract_student_details(body) or {}
+        with self._lock:
+            self._attempted[conversation.thread_id] = _body_hash(body)
+        self._apply_details(db, conversation, student, sender_email, extracted)
+
+    @staticmethod
+    def _apply_details(db, conversation: Conversation, student: Optional[Student],
+                       sender_email: Optional[str], extracted: Dict):
+        conversation.full_thread_summary = extracted.get("full_thread_summary", "")
+        conversation.details_status = extracted.get("details_status", "empty")
+        conversation.missing_fields = extracted.get("missing_fields", [])
+        conversation.follow_up_message = extracted.get("follow_up_message", "")
+
+        if not student and extracted.get("admission_number") and sender_email:
+            student_payload = {
+                "full_name": extracted.get("full_name"),
+                "admission_number": extracted.get("admission_number"),
+                "course": extracted.get("course"),
+                "year": extracted.get("year"),
+                "semester": extracted.get("semester"),
+                "group": extracted.get("group"),
+                "email": sender_email,
+            }
+            student = create_or_update_student(db, student_payload)
+            conversation.student_id = student.id
+
+        db.commit()
+
+
+_enricher = None
+_enricher_lock = threading.Lock()
+
+
+def get_enricher() -> Enricher:
+    """Return the process-wide background enricher."""
+    global _enricher
+    if _enricher is None:
+        with _enricher_lock:
+            if _enricher is None:
+                _enricher = Enricher(ENRICHMENT_MAX_WORKERS, ENRICHMENT_RATE_PER_MINUTE)
+    return _enricher
@@ -1,7 +1,12 @@
 # backend/strathy_app/services/gmail_service.py
 import base64
+import contextvars
 import logging
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime, timezone
 
@@ -13,9 +18,24 @@ from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
-from ..config import SCOPES, CREDENTIALS_FILE, TOKEN_FILE
-from .ai_reply_service import generate_ai_reply
+from ..config import (
+    GMAIL_FETCH_WORKERS, SCOPES, CREDENTIALS_FILE, TOKEN_FILE,
+    THREAD_MESSAGE_CACHE_SIZE,
+)
+from .ai_reply_service import ReplyGenerationError, generate_ai_reply
+from .cache_service import invalidate_ingestion
+from .draft_service import fresh_draft
+from .gmail_transport import PooledHttp
+from .label_service import LabelBuffer, ensure_label
+from .rate_limiter import GMAIL_QUOTA_UNITS, RateLimitedError, gmail_execute
+from .resilience import is_upstream_failure
+from .sender_policy import get_sender_policy
+from .reply_ledger_service import (
+    GENERATED, SENT, claim_reply, mark_generated, mark_sent, release_claim, reply_state,
+)
 from ..utils.email_parser import parse_message
+from ..utils.metrics import timed
+from ..utils.tracing import set_span_attributes
 from ..utils.mime_helpers import build_reply_mime
 
 logger = logging.getLogger(__name__)
@@ -24,40 +44,115 @@ logger = logging.getLogger(__name__)
 # ========================
 # Gmail Connection Helpers
 # ========================
-def build_gmail_service(creds: Credentials):
-    """Load/refresh creds and return a Gmail service client."""
-    if not creds:
+def save_credentials(creds: Credentials):
+    Path(TOKEN_FILE).write_text(creds.to_json(), encoding="utf-8")
+
+
+def load_credentials() -> Optional[Credentials]:
+    """Load the stored OAuth token (shared by the API and the worker process)."""
+    if not Path(TOKEN_FILE).exists():
         return None
-    if not creds.valid and creds.refresh_token:
-        creds.refresh(Request())
     try:
-        return build("gmail", "v1", credentials=creds)
-    except HttpError as e:
-        logger.error("Failed to build Gmail service: %s", e)
+        return Credentials.from_authorized_user_file(TOKEN_FILE, SCOPES)
+    except Exception:
+        return None
+
+
+_services: Dict[tuple, object] = {}
+_services_lock = threading.Lock()
+
+
+def build_gmail_service(creds: Credentials):
+    """
+    Return the Gmail service client for these credentials. It is built once
+    per account on a pooled, thread-safe transport (services/gmail_transport.py)
+    and shared by every request and worker thread after that.
+    """
+    if not creds:
         return None
+    key = (getattr(creds, "client_id", None), getattr(creds, "refresh_token", None) or creds.token)
+    service = _services.get(key)
+    if service is not None:
+        return service
+
+    with _services_lock:
+        service = _services.get(key)
+        if service is not None:
+            return service
+        if not creds.valid and creds.refresh_token:
+            creds.refresh(Request())
+        try:
+            service = build("gmail", "v1", http=PooledHttp(creds), cache_discovery=False)
+        except HttpError as e:
+            logger.error("Failed to build Gmail service: %s", e)
+            return None
+        # One mailbox: a re-login replaces the old client
+        _services.clear()
+        _services[key] = service
+        return service
 
 
 def list_unread_messages(service, q: str = "is:unread", max_results: int = 5) -> List[Dict]:
     """List unread messages (returns list of message metadata dicts)."""
+    messages, _estimate = list_unread_page(service, q=q, max_results=max_results)
+    return messages
+
+
+@timed("gmail.messages.list")
+def list_unread_page(service, q: str = "is:unread", max_results: int = 5) -> tuple[List[Dict], int]:
+    """Like list_unread_messages, but also returns Gmail's resultSizeEstimate (backlog size)."""
     try:
-        resp = service.users().messages().list(
+        resp = gmail_execute(service.users().messages().list(
             userId="me", q=q, labelIds=["INBOX"], maxResults=max_results
-        ).execute()
-        return resp.get("messages", []) or []
-    except HttpError as e:
+        ), "messages.list")
+        return resp.get("messages", []) or [], int(resp.get("resultSizeEstimate", 0) or 0)
+    except (HttpError, RateLimitedError) as e:
         logger.error("Error listing messages: %s", e)
-        return []
+        return [], 0
 
 
+@timed("gmail.messages.get")
 def get_message(service, message_id: str, fmt: str = "full") -> Optional[Dict]:
     """Get a full message by ID from Gmail."""
     try:
-        return service.users().messages().get(userId="me", id=message_id, format=fmt).execute()
-    except HttpError as e:
+        return gmail_execute(
+            service.users().messages().get(userId="me", id=message_id, format=fmt), "messages.get"
+        )
+    except (HttpError, RateLimitedError) as e:
         logger.error("Error getting message %s: %s", message_id, e)
         return None
 
 
+def get_messages(service, message_ids: List[str], fmt: str = "full") -> List[Optional[Dict]]:
+    """
+    get_message() for many ids, GMAIL_FETCH_WORKERS at a time over the shared
+    connection pool. Results are in the order of `message_ids` (None where a
+    fetch failed).
+    """
+    if GMAIL_FETCH_WORKERS <= 1 or len(message_ids) <= 1:
+        return [get_message(service, mid, fmt) for mid in message_ids]
+    # Each task runs in a copy of this context: same rate-limit lane, deadline and trace
+    return list(_fetch_pool().map(
+        lambda mid, ctx: ctx.run(get_message, service, mid, fmt),
+        message_ids,
+        [contextvars.copy_context() for _ in message_ids],
+    ))
+
+
+_fetch_executor: Optional[ThreadPoolExecutor] = None
+_fetch_lock = threading.Lock()
+
+
+def _fetch_pool() -> ThreadPoolExecutor:
+    global _fetch_executor
+    if _fetch_executor is None:
+        with _fetch_lock:
+            if _fetch_executor is None:
+                _fetch_executor = ThreadPoolExecutor(max_workers=GMAIL_FETCH_WORKERS, thread_name_prefix="gmail-fetch")
+    return _fetch_executor
+
+
+@timed("gmail.messages.send")
 def send_mime(service, raw_mime, thread_id: Optional[str] = None) -> Optional[Dict]:
     """Send a MIME message via Gmail API."""
     try:
@@ -71,10 +166,10 @@ def send_mime(service, raw_mime, thread_id: Optional[str] = None) -> Optional[Di
         if thread_id:
             body["threadId"] = thread_id
 
-        sent = service.users().messages().send(userId="me", body=body).execute()
+        sent = gmail_execute(service.users().messages().send(userId="me", body=body), "messages.send")
         logger.info("✅ Sent message id=%s threadId=%s", sent.get("id"), sent.get("threadId"))
         return sent
-    except HttpError as e:
+    except (HttpError, RateLimitedError) as e:
         logger.error("Gmail send failed: %s", e)
         return None
 
@@ -95,52 +190,37 @@ def _extract_email(from_header: Optional[str]) -> Optional[str]:
     return None
 
 
+def sender_display_name(sender_header: str, sender_email: str) -> str:
+    """Name to address the sender by: the From display name, else the email's local part."""
+    if "<" in (sender_header or ""):
+        return sender_header.split("<")[0].strip().replace('"', "")
+    return (sender_email or "").split("@")[0]
+
+
 # ===========================
 # Email Processing / AI Reply
 # ===========================
 
-# 🚫 Blocklist (do not reply)
-BLOCKED_EMAILS = {
-    "strathmorecommunication@gmail.com",
-    "allstudents@strathmore.edu",
-    "allstaff@strathmore.edu",
-    "ictservices@strathmore.edu",
-    "tndumah@strathmore.edu",
-    "gnyaloti@strathmore.edu",
-    "bmonda@strathmore.edu",
-    "danson.mulinge@strathmore.edu",
-    "dmulinge@strathmore.edu",
-    "rkidewa@strathmore.edu",
-    "rkithuka@strathmore.edu",
-    "hmuchiri@strathmore.edu",
-}
-
-# ✅ Whitelist (trusted external senders)
-ALLOWED_EXTERNAL_SENDERS = {
-    "dedankimani007@gmail.com",
-}
-
-
+# 🚫/✅ Allow and block lists live in sender_policy.json (reloaded on change)
 def is_sender_allowed(email: str) -> bool:
     """Check if a sender is allowed to receive an AI reply."""
-    email = (email or "").lower().strip()
-    if email in BLOCKED_EMAILS:
-        return False
-    if email.endswith("@strathmore.edu"):
-        return True
-    if email in ALLOWED_EXTERNAL_SENDERS:
-        return True
-    return False
+    return get_sender_policy().is_allowed(email)
 
 
 # ===========================
 # Core Processing
 # ===========================
-def process_incoming_email(service, message: Dict) -> Optional[Dict]:
+@timed("pipeline.process_incoming_email")
+def process_incoming_email(service, message: Dict, labels: Optional[LabelBuffer] = None) -> Optional[Dict]:
+    """
+    Process one inbound message end to end. With a LabelBuffer the final label
+    changes are queued for a batched flush by the caller instead of applied now.
+    """
     msg_id = message.get("id")
     if not msg_id:
         return None
 
+    claim = None
     try:
         full = get_message(service, msg_id)
         if not full:
@@ -154,8 +234,7 @@ def process_incoming_email(service, message: Dict) -> Optional[Dict]:
 
         thread_id = full.get("threadId") or parsed.get("thread_id")
         thread_key = thread_id or msg_id
-
-        thread_messages = extract_thread_messages(service, thread_id) if thread_id else []
+        set_span_attributes(message_id=msg_id, thread_id=thread_id)
 
         if not sender_email:
             return None
@@ -169,18 +248,18 @@ def process_incoming_email(service, message: Dict) -> Optional[Dict]:
             if internal_date else None
         )
 
+        # 💤 Thread history is only fetched if a caller actually reads it; the message we
+        # already downloaded is cached so the thread fetch won't download it again
+        remember_message(full, parsed)
+        thread_messages = ThreadHistory(service, thread_id)
+
         # 🚫 Skip disallowed senders (do NOT mark read automatically by default)
         if not is_sender_allowed(sender_email):
-            reason = "Blocked sender" if sender_email in BLOCKED_EMAILS else "External domain not allowed"
+            reason = "Blocked sender" if get_sender_policy().is_blocked(sender_email) else "External domain not allowed"
             logger.info(f"⛔ Skipping AI reply to {sender_email} ({reason})")
 
-            # OPTIONAL: if you want blocked messages to disappear from UI, uncomment:
-            # try:
-            #     service.users().messages().modify(
-            #         userId="me", id=msg_id, body={"removeLabelIds": ["UNREAD"]}
-            #     ).execute()
-            # except HttpError as e:
-            #     logger.warning("Failed to clear UNREAD for blocked %s: %s", msg_id, e)
+            # 🏷️ Tag as processed so the poller stops picking it up, but keep it unread for staff
+            _mark_handled(service, msg_id, labels, mark_read=False)
 
             return {
                 "id": msg_id,
@@ -198,40 +277,74 @@ def process_incoming_email(service, message: Dict) -> Optional[Dict]:
                 "thread_messages": thread_messages,
             }
 
-        # ✅ Extract student details & AI summary
-        from backend.strathy_app.services.model_extraction_service import extract_student_details
-        ai_extraction = extract_student_details(body) or {}
 
-        # ✅ Save student & conversation in DB
+        # 🧾 Claim the reply before any model call, so overlapping pollers/workers/retries
+        # produce at most one extraction, one generation and one send per message
+        claim = claim_reply(msg_id, thread_id)
+        if claim is None:
+            if reply_state(msg_id) == SENT:
+                logger.info("🧾 Already replied to %s; clearing UNREAD", msg_id)
+                _mark_handled(service, msg_id, labels)
+                status = "replied"
+            else:
+                logger.info("🧾 Reply to %s is being handled by another worker; skipping", msg_id)
+                status = "in_progress"
+            return {
+                "id": msg_id,
+                "threadId": thread_id,
+                "from": sender_header,
+                "subject": subject,
+                "body": body,
+                "role": "Student",
+                "status": status,
+                "received_at": received_at,
+                "ai_reply": None,
+                "ai_replied_at": None,
+                "ai_role": None,
+                "thread_messages": thread_messages,
+            }
+
+        ai_extraction = {}
         student_id = None
         save_result = None
 
         db = SessionLocal()
         try:
-            save_result = save_conversation_and_messages(
-                db=db,
-                email_text=body,
-                subject=subject,
-                sender_email=sender_email,
-                thread_id=thread_key,
-            )
-
-            if save_result and save_result.get("student") is not None:
-                student_id = save_result["student"].id
-
-            # --- Update conversation with extracted AI metadata ---
-            conversation = (
-                db.query(Conversation)
-                .filter(Conversation.thread_id == thread_key)
-                .first()
-            )
-
-            if conversation:
-                conversation.full_thread_summary = ai_extraction.get("full_thread_summary", "")
-                conversation.details_status = ai_extraction.get("details_status", "empty")
-                conversation.missing_fields = ai_extraction.get("missing_fields", [])
-                conversation.follow_up_message = ai_extraction.get("follow_up_message", "")
-                db.commit()
+            if claim["state"] == GENERATED:
+                # A previous owner already extracted, saved and generated; only the send is left
+                conversation = db.query(Conversation).filter(Conversation.thread_id == thread_key).first()
+                student_id = conversation.student_id if conversation else None
+            else:
+                # ✅ Extract student details (skipped for known students) & save student + conversation in DB;
+                # extraction latency is still recorded on its own as stage "llm.extraction"
+                with timed("pipeline.db_save"):
+                    save_result = save_conversation_and_messages(
+                        db=db,
+                        email_text=body,
+                        subject=subject,
+                        sender_email=sender_email,
+                        thread_id=thread_key,
+                    )
+
+                if save_result and save_result.get("student") is not None:
+                    student_id = save_result["student"].id
+                ai_extraction = (save_result or {}).get("extracted") or {}
+
+                # --- Update conversation with extracted AI metadata ---
+                conversation = (
+                    db.query(Conversation)
+                    .filter(Conversation.thread_id == thread_key)
+                    .first()
+                )
+
+                if conversation:
+                    conversation.full_thread_summary = ai_extraction.get(
+                        "full_thread_summary", conversation.full_thread_summary
+                    )
+                    conversation.details_status = ai_extraction.get("details_status", "empty")
+                    conversation.missing_fields = ai_extraction.get("missing_fields", [])
+                    conversation.follow_up_message = ai_extraction.get("follow_up_message", "")
+                    db.commit()
 
         except Exception:
             # ✅ critical: rollback so this thread can be retried cleanly
@@ -240,24 +353,28 @@ def process_incoming_email(service, message: Dict) -> Optional[Dict]:
         finally:
             db.close()
 
+        # 🔄 Ingestion event: drop cached student/thread views
+        invalidate_ingestion(thread_id=thread_key, email=sender_email)
+
         # ✅ Generate AI reply
-        ai_reply_result = generate_and_send_ai_reply(service, {
-            "from": sender_header,
-            "subject": subject,
-            "body": body,
-            "threadId": thread_id,
-            "original_headers": original_headers,
-        })
+        with timed("pipeline.reply_and_send"):
+            ai_reply_result = generate_and_send_ai_reply(service, {
+                "id": msg_id,
+                "from": sender_header,
+                "subject": subject,
+                "body": body,
+                "threadId": thread_id,
+                "original_headers": original_headers,
+            }, claim=claim)
 
         status = ai_reply_result.get("status", "pending") if ai_reply_result else "pending"
 
-        # ✅ Only now mark as read, after DB + reply attempt succeeded
-        try:
-            service.users().messages().modify(
-                userId="me", id=msg_id, body={"removeLabelIds": ["UNREAD"]}
-            ).execute()
-        except HttpError as e:
-            logger.warning("Failed to clear UNREAD for %s: %s", msg_id, e)
+        # ✅ Only now mark as read, after DB + reply attempt succeeded; an upstream
+        # outage leaves it unread so the next poll retries the reply
+        if ai_reply_result and ai_reply_result.get("retry"):
+            logger.info("↩️ Leaving %s unread to retry the reply later", msg_id)
+        else:
+            _mark_handled(service, msg_id, labels)
 
         return {
             "id": msg_id,
@@ -279,11 +396,40 @@ def process_incoming_email(service, message: Dict) -> Optional[Dict]:
 
     except Exception as exc:
         logger.exception("process_incoming_email failed: %s", exc)
-        # ✅ do NOT mark read on failure — leave it unread so you can retry
+        # ✅ do NOT mark read on failure — leave it unread (and the claim free) so you can retry
+        if claim is not None:
+            release_claim(claim)
         return None
 
 
-def generate_and_send_ai_reply(service, student_msg: Dict) -> Optional[Dict]:
+def _mark_handled(service, msg_id: str, labels: Optional[LabelBuffer] = None, mark_read: bool = True):
+    """Add the processed label (and clear UNREAD): buffered if a LabelBuffer is given, else right away."""
+    if labels is not None:
+        labels.mark_handled(msg_id, mark_read=mark_read)
+        return
+    processed_id = ensure_label(service)
+    body = {"removeLabelIds": ["UNREAD"]} if mark_read else {}
+    if processed_id:
+        body["addLabelIds"] = [processed_id]
+    if not body:
+        return
+    try:
+        with timed("gmail.messages.modify"):
+            gmail_execute(service.users().messages().modify(userId="me", id=msg_id, body=body), "messages.modify")
+    except (HttpError, RateLimitedError) as e:
+        logger.warning("Failed to update labels for %s: %s", msg_id, e)
+
+
+def generate_and_send_ai_reply(service, student_msg: Dict, claim: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Generate and send the AI reply for one inbound message.
+
+    `claim` is the reply-ledger claim for student_msg["id"]; if not given it is
+    taken here. Without an "id" there is nothing to dedupe on and the reply is
+    sent unguarded. A result with "retry" set means nothing was sent and the
+    message must stay unread for the next poll (a generated text is kept in
+    the ledger and sent then).
+    """
     try:
         sender_header = student_msg.get("from", "")
         sender_email = _extract_email(sender_header)
@@ -299,22 +445,36 @@ def generate_and_send_ai_reply(service, student_msg: Dict) -> Optional[Dict]:
         # ✅ NEW: original headers from the incoming email (for In-Reply-To + References)
         original_headers = student_msg.get("original_headers") or []
 
-        sender_name = (
-            sender_header.split("<")[0].strip().replace('"', "")
-            if "<" in sender_header
-            else sender_email.split("@")[0]
-        )
+        sender_name = sender_display_name(sender_header, sender_email)
 
-        ai_reply_text = generate_ai_reply(
-            sender_name=sender_name,
-            sender_email=sender_email,
-            subject=subject,
-            body=body
-        )
+        if claim is None and student_msg.get("id"):
+            claim = claim_reply(student_msg["id"], thread_id)
+            if claim is None:
+                status = "replied" if reply_state(student_msg["id"]) == SENT else "in_progress"
+                return {"status": status, "ai_reply": None, "sent_at": None}
+
+        if claim is not None and claim.get("reply_text"):
+            # ♻️ Generated before a crash; send that text instead of paying for another call
+            ai_reply_text = claim["reply_text"]
+        else:
+            # ♻️ The background enricher may already have drafted this exact message
+            ai_reply_text = fresh_draft(thread_id, student_msg.get("id")) or generate_ai_reply(
+                sender_name=sender_name,
+                sender_email=sender_email,
+                subject=subject,
+                body=body
+            )
 
-        if not ai_reply_text:
-            logger.warning("⚠️ AI did not generate a reply for %s", sender_email)
-            return {"status": "pending", "ai_reply": None, "sent_at": None}
+            if not ai_reply_text:
+                logger.warning("⚠️ AI did not generate a reply for %s", sender_email)
+                if claim is not None:
+                    release_claim(claim)
+                # Left unread (and unlabelled) so the next poll tries again
+                return {"status": "pending", "ai_reply": None, "sent_at": None, "retry": True}
+
+            if claim is not None and not mark_generated(claim, ai_reply_text):
+                # Our lease expired and someone else owns the message now
+                return {"status": "in_progress", "ai_reply": None, "sent_at": None}
 
         # 📨 Send reply WITH threading headers
         mime_msg = build_reply_mime(
@@ -326,10 +486,17 @@ def generate_and_send_ai_reply(service, student_msg: Dict) -> Optional[Dict]:
         )
 
         sent = send_mime(service, mime_msg, thread_id=thread_id)
+        if claim is not None:
+            if sent:
+                mark_sent(claim, sent.get("id"))
+            else:
+                # The generated text stays in the ledger; the next poll sends it without a model call
+                release_claim(claim)
 
         sent_at = datetime.now(timezone.utc).isoformat()
         return {
             "status": "replied" if sent else "pending",
+            "retry": not sent,
             "threadId": thread_id,
             "to": sender_email,
             "from": "dedan.kimani@strathmore.edu",
@@ -340,47 +507,110 @@ def generate_and_send_ai_reply(service, student_msg: Dict) -> Optional[Dict]:
             "role": "ADAM"
         }
 
+    except ReplyGenerationError as exc:
+        logger.warning("⚠️ No AI reply for %s: %s", student_msg.get("id"), exc)
+        if claim is not None:
+            release_claim(claim)
+        return {"status": "pending", "ai_reply": None, "sent_at": None, "error": str(exc), "retry": exc.retryable}
+
     except Exception as exc:
         logger.exception("generate_and_send_ai_reply failed: %s", exc)
-        return {"status": "pending", "ai_reply": None, "sent_at": None}
+        if claim is not None:
+            release_claim(claim)
+        return {"status": "pending", "ai_reply": None, "sent_at": None, "retry": is_upstream_failure(exc)}
 
 
 def get_ai_reply_for_thread(service, thread_id: str) -> Optional[str]:
     """Fetch the latest AI reply in a Gmail thread."""
-    try:
-        thread = service.users().threads().get(userId="me", id=thread_id, format="full").execute()
-        messages = thread.get("messages", [])
-        for msg in reversed(messages):  # newest first
-            parsed = parse_message(msg)
-            sender_header = parsed.get("sender", "")
-            if sender_header and "dedan.kimani@strathmore.edu" in sender_header.lower():
-                return parsed.get("body")
-        return None
-    except HttpError as e:
-        logger.error("Failed to fetch AI reply for thread %s: %s", thread_id, e)
-        return None
+    for msg in reversed(extract_thread_messages(service, thread_id)):  # newest first
+        sender_header = msg.get("sender") or ""
+        if "dedan.kimani@strathmore.edu" in sender_header.lower():
+            return msg.get("body")
+    return None
 
+# ===========================
+# Thread history
+# ===========================
+_parsed_messages: "OrderedDict[str, Dict]" = OrderedDict()
+_parsed_lock = threading.Lock()
+
+
+def remember_message(msg: Dict, parsed: Optional[Dict] = None) -> Dict:
+    """Cache the parsed, immutable parts of a full Gmail message (sender/subject/body) by id."""
+    parsed = parsed or parse_message(msg)
+    sender_header = parsed.get("sender", "")
+    entry = {
+        "sender": sender_header,
+        "sender_email": _extract_email(sender_header),
+        "subject": parsed.get("subject"),
+        "body": parsed.get("body"),
+    }
+    if msg.get("id"):
+        with _parsed_lock:
+            _parsed_messages[msg["id"]] = entry
+            _parsed_messages.move_to_end(msg["id"])
+            while len(_parsed_messages) > THREAD_MESSAGE_CACHE_SIZE:
+                _parsed_messages.popitem(last=False)
+    return entry
+
+
+def _cached_message(message_id: str) -> Optional[Dict]:
+    with _parsed_lock:
+        entry = _parsed_messages.get(message_id)
+        if entry is not None:
+            _parsed_messages.move_to_end(message_id)
+        return entry
+
+
+@timed("gmail.threads.get")
 def extract_thread_messages(service, thread_id: str) -> List[Dict]:
-    """Return all messages in a Gmail thread, parsed into a structured list."""
+    """
+    Return all messages in a Gmail thread, parsed into a structured list.
+
+    Lists the thread with format="minimal" (ids, labels, dates) and downloads
+    only messages not parsed before, in parallel. Once the gets would cost as
+    much quota as one full threads.get (GMAIL_QUOTA_UNITS), or one of them
+    fails, the full thread is fetched instead. A message still missing after
+    that is left out of the history with a warning.
+    """
     try:
-        thread = service.users().threads().get(userId="me", id=thread_id, format="full").execute()
+        thread = gmail_execute(
+            service.users().threads().get(userId="me", id=thread_id, format="minimal"), "threads.get"
+        )
         messages = thread.get("messages", [])
-        extracted = []
 
+        missing = [m["id"] for m in messages if _cached_message(m["id"]) is None]
+        fetch_thread = GMAIL_QUOTA_UNITS["messages.get"] * len(missing) >= GMAIL_QUOTA_UNITS["threads.get"]
+        if missing and not fetch_thread:
+            for full in get_messages(service, missing):
+                if full:
+                    remember_message(full)
+                else:
+                    fetch_thread = True
+        if fetch_thread:
+            full_thread = gmail_execute(
+                service.users().threads().get(userId="me", id=thread_id, format="full"), "threads.get"
+            )
+            for msg in full_thread.get("messages", []):
+                remember_message(msg)
+
+        extracted = []
         for msg in messages:
-            parsed = parse_message(msg)
-            sender_header = parsed.get("sender", "")
-            sender_email = _extract_email(sender_header)
+            entry = _cached_message(msg["id"])
+            if entry is None:
+                logger.warning("⚠️ Message %s of thread %s could not be fetched; left out of its history",
+                               msg["id"], thread_id)
+                continue
 
             label_ids = msg.get("labelIds") or []
             role = "ADAM" if "SENT" in label_ids else "Student"
 
             extracted.append({
                 "id": msg.get("id"),
-                "sender": sender_header,
-                "sender_email": sender_email,
-                "subject": parsed.get("subject"),
-                "body": parsed.get("body"),
+                "sender": entry["sender"],
+                "sender_email": entry["sender_email"],
+                "subject": entry["subject"],
+                "body": entry["body"],
                 "role": role,
                 "date": datetime.fromtimestamp(
                     int(msg.get("internalDate", 0)) / 1000, tz=timezone.utc
@@ -388,6 +618,40 @@ def extract_thread_messages(service, thread_id: str) -> List[Dict]:
             })
         return extracted
 
-    except HttpError as e:
+    except (HttpError, RateLimitedError) as e:
         logger.error("❌ Failed to extract thread %s: %s", thread_id, e)
         return []
+
+
+class ThreadHistory:
+    """
+    Lazy handle on a thread's history: nothing is fetched until it is iterated,
+    indexed, measured or load()-ed, and then only once.
+    """
+
+    def __init__(self, service, thread_id: Optional[str]):
+        self.service = service
+        self.thread_id = thread_id
+        self._messages: Optional[List[Dict]] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._messages is not None
+
+    def load(self) -> List[Dict]:
+        if self._messages is None:
+            self._messages = extract_thread_messages(self.service, self.thread_id) if self.thread_id else []
+        return self._messages
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __len__(self):
+        return len(self.load())
+
+    def __getitem__(self, index):
+        return self.load()[index]
+
+    def __repr__(self):
+        state = f"{len(self._messages)} messages" if self._messages is not None else "not loaded"
+        return f"<ThreadHistory {self.thread_id} ({state})>"
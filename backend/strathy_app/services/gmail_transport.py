@@ -0,0 +1,68 @@
+# backend/strathy_app/services/gmail_transport.py
+import logging
+import threading
+from typing import Optional
+
+import httplib2
+from google.auth.transport.requests import AuthorizedSession, Request
+from requests.adapters import HTTPAdapter
+
+from ..config import (
+    GMAIL_HTTP_POOL_BLOCK,
+    GMAIL_HTTP_POOL_CONNECTIONS,
+    GMAIL_HTTP_POOL_SIZE,
+    GMAIL_TIMEOUT_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# requests already decoded the body, so these no longer describe `content`
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+class PooledHttp:
+    """
+    Drop-in for the httplib2.Http that googleapiclient uses, backed by a
+    google-auth AuthorizedSession (requests + urllib3).
+
+    Unlike httplib2, one instance can be shared by every thread: urllib3 keeps
+    up to `pool_size` keep-alive connections per host and, with `pool_block`,
+    makes extra threads wait for a free one instead of opening throwaway
+    sockets. Expired credentials are refreshed once, under a lock, rather
+    than by every thread that notices.
+    """
+
+    def __init__(self, credentials, timeout: float = GMAIL_TIMEOUT_SECONDS,
+                 pool_connections: int = GMAIL_HTTP_POOL_CONNECTIONS, pool_size: int = GMAIL_HTTP_POOL_SIZE,
+                 pool_block: bool = GMAIL_HTTP_POOL_BLOCK):
+        self.credentials = credentials  # googleapiclient reads http.credentials for batch/media requests
+        self.timeout = timeout
+        self.session = AuthorizedSession(credentials)
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_size,
+                              pool_block=pool_block, max_retries=0)
+        self.session.mount("https://", adapter)
+        self._refresh_lock = threading.Lock()
+
+    def _ensure_token(self):
+        if self.credentials.valid or not getattr(self.credentials, "refresh_token", None):
+            return
+        with self._refresh_lock:
+            if not self.credentials.valid:
+                logger.info("🔑 Refreshing Gmail access token")
+                self.credentials.refresh(Request())
+
+    def request(self, uri: str, method: str = "GET", body=None, headers: Optional[dict] = None,
+                redirections: int = 5, connection_type=None):
+        """httplib2.Http.request(): returns (httplib2.Response, bytes)."""
+        self._ensure_token()
+        response = self.session.request(
+            method, uri, data=body, headers=headers, timeout=self.timeout, allow_redirects=redirections > 0,
+        )
+        info = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        info["status"] = str(response.status_code)
+        resp = httplib2.Response(info)
+        resp.reason = response.reason
+        return resp, response.content
+
+    def close(self):
+        self.session.close()
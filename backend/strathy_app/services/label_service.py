@@ -0,0 +1,126 @@
+# backend/strathy_app/services/label_service.py
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from googleapiclient.errors import HttpError
+
+from ..config import LABEL_BATCH_SIZE, PROCESSED_LABEL_NAME
+from .rate_limiter import RateLimitedError, gmail_execute
+
+logger = logging.getLogger(__name__)
+
+_label_ids: Dict[str, str] = {}
+_label_lock = threading.Lock()
+
+
+def label_query_name(name: str) -> str:
+    """Gmail search syntax for a label: lower-case, '/' and spaces become '-'."""
+    return name.lower().replace("/", "-").replace(" ", "-")
+
+
+def processed_query(base: str = "is:unread") -> str:
+    """Search query for mail the poller still has to handle."""
+    return f"{base} -label:{label_query_name(PROCESSED_LABEL_NAME)}"
+
+
+def ensure_label(service, name: str = PROCESSED_LABEL_NAME) -> Optional[str]:
+    """Return the id of a user label, creating it on first use (cached per process)."""
+    with _label_lock:
+        if name in _label_ids:
+            return _label_ids[name]
+        try:
+            labels = gmail_execute(service.users().labels().list(userId="me"), "labels.list")
+            for label in labels.get("labels", []) or []:
+                if label.get("name") == name:
+                    _label_ids[name] = label["id"]
+                    return label["id"]
+            created = gmail_execute(service.users().labels().create(userId="me", body={
+                "name": name,
+                "labelListVisibility": "labelShow",
+                "messageListVisibility": "show",
+            }), "labels.create")
+            logger.info("🏷️ Created Gmail label %s (%s)", name, created.get("id"))
+            _label_ids[name] = created["id"]
+            return created["id"]
+        except (HttpError, RateLimitedError) as e:
+            logger.error("Failed to resolve Gmail label %s: %s", name, e)
+            return None
+
+
+class LabelBuffer:
+    """
+    Collects per-message label changes and applies them with
+    users.messages.batchModify instead of one messages.modify per message.
+
+    Messages with the same (add, remove) label sets share a batch; a batch is
+    flushed when it reaches `batch_size` ids, otherwise on flush() (end of a
+    worker tick). Failed batches are logged and dropped: the messages stay
+    unread/unlabelled, so the next poll sees them again and the reply ledger
+    keeps that from producing a second reply.
+    """
+
+    def __init__(self, service, batch_size: int = LABEL_BATCH_SIZE):
+        self.service = service
+        self.batch_size = max(1, min(batch_size, 1000))
+        self._pending: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], List[str]] = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def add(self, message_id: str, add: Iterable[str] = (), remove: Iterable[str] = ()):
+        key = (tuple(sorted(set(add))), tuple(sorted(set(remove))))
+        if not key[0] and not key[1]:
+            return
+        with self._lock:
+            ids = self._pending.setdefault(key, [])
+            if message_id not in ids:
+                ids.append(message_id)
+            full = ids if len(ids) >= self.batch_size else None
+            if full is not None:
+                del self._pending[key]
+        if full is not None:
+            self._send(key, full)
+
+    def mark_handled(self, message_id: str, mark_read: bool = True):
+        """Tag as processed (so the poller skips it) and, unless told otherwise, clear UNREAD."""
+        processed_id = ensure_label(self.service)
+        self.add(
+            message_id,
+            add=[processed_id] if processed_id else [],
+            remove=["UNREAD"] if mark_read else [],
+        )
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(ids) for ids in self._pending.values())
+
+    def flush(self) -> int:
+        """Apply everything buffered; returns the number of messages updated."""
+        with self._lock:
+            batches, self._pending = self._pending, {}
+        return sum(self._send(key, ids) for key, ids in batches.items())
+
+    def _send(self, key, ids: List[str]) -> int:
+        add, remove = key
+        done = 0
+        for start in range(0, len(ids), self.batch_size):
+            chunk = ids[start:start + self.batch_size]
+            body = {"ids": chunk}
+            if add:
+                body["addLabelIds"] = list(add)
+            if remove:
+                body["removeLabelIds"] = list(remove)
+            try:
+                gmail_execute(
+                    self.service.users().messages().batchModify(userId="me", body=body),
+                    "messages.batchModify",
+                )
+                done += len(chunk)
+            except (HttpError, RateLimitedError) as e:
+                logger.warning("batchModify of %d messages failed: %s", len(chunk), e)
+        return done
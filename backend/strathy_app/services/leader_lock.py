@@ -0,0 +1,110 @@
+# backend/strathy_app/services/leader_lock.py
+import logging
+import os
+import threading
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderLock:
+    """
+    Single-poller election.
+
+    On Postgres this holds a session-level `pg_try_advisory_lock` on a dedicated
+    connection for as long as the process lives; if that connection drops, the
+    lock is released server-side and a standby worker takes over on its next
+    tick. Other databases (SQLite in dev) fall back to an exclusive file lock.
+    """
+
+    def __init__(self, engine, key: int, lock_file: str):
+        self.engine = engine
+        self.key = key
+        self.lock_file = lock_file
+        self._conn = None
+        self._fh = None
+        self._lock = threading.Lock()
+
+    @property
+    def _is_postgres(self) -> bool:
+        return self.engine.dialect.name == "postgresql"
+
+    def try_acquire(self) -> bool:
+        """Return True if this process is (still) the leader."""
+        with self._lock:
+            if self._is_postgres:
+                return self._try_pg()
+            return self._try_file()
+
+    def release(self):
+        with self._lock:
+            if self._conn is not None:
+                try:
+                    self._conn.execute(text("SELECT pg_advisory_unlock(:k)"), {"k": self.key})
+                    self._conn.close()
+                except Exception:
+                    pass
+                self._conn = None
+            if self._fh is not None:
+                try:
+                    import fcntl
+                    fcntl.flock(self._fh, fcntl.LOCK_UN)
+                    self._fh.close()
+                except Exception:
+                    pass
+                self._fh = None
+
+    # --- Postgres advisory lock ---
+    def _try_pg(self) -> bool:
+        if self._conn is not None:
+            # The advisory lock lives as long as this session; just make sure it's still alive
+            try:
+                self._conn.execute(text("SELECT 1"))
+                self._conn.commit()
+                return True
+            except Exception as e:
+                logger.warning("Leader connection lost, re-electing: %s", e)
+            self._drop_conn()
+
+        try:
+            conn = self.engine.connect()
+            got = conn.execute(text("SELECT pg_try_advisory_lock(:k)"), {"k": self.key}).scalar()
+            conn.commit()
+        except Exception as e:
+            logger.error("Leader election failed: %s", e)
+            return False
+        if got:
+            self._conn = conn
+            logger.info("👑 Acquired worker leadership (advisory lock %s)", self.key)
+            return True
+        conn.close()
+        return False
+
+    def _drop_conn(self):
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    # --- File lock fallback ---
+    def _try_file(self) -> bool:
+        if self._fh is not None:
+            return True
+        import fcntl
+
+        fh = open(self.lock_file, "a+")
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return False
+        fh.seek(0)
+        fh.truncate()
+        fh.write(str(os.getpid()))
+        fh.flush()
+        self._fh = fh
+        logger.info("👑 Acquired worker leadership (file lock %s)", self.lock_file)
+        return True
+
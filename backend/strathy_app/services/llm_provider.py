@@ -0,0 +1,438 @@
+# backend/strathy_app/services/llm_provider.py
+import json
+import logging
+import re
+import threading
+import time
+from typing import Callable, Dict, Generator, List, NamedTuple, Optional
+
+from ..config import (
+    ANTHROPIC_API_KEY,
+    LLM_CALL_DEADLINE_SECONDS,
+    LLM_DEFAULT_TIMEOUT_SECONDS,
+    LLM_DRAFT_FALLBACKS,
+    LLM_DRAFT_MODEL,
+    LLM_EXTRACTION_FALLBACKS,
+    LLM_EXTRACTION_MODEL,
+    LLM_HEDGE_DELAY_MS,
+    LLM_HEDGE_TASKS,
+    LLM_MODEL_TIMEOUTS,
+    LLM_REPLY_FALLBACKS,
+    LLM_REPLY_MODEL,
+    LLM_STUB_LATENCY_MS,
+)
+from ..utils.metrics import LLM_FALLBACKS
+from ..utils.tracing import set_span_attributes
+from .rate_limiter import INTERACTIVE, anthropic_create, anthropic_stream, current_priority
+from .resilience import (
+    CircuitOpenError,
+    LatencyTracker,
+    UpstreamTimeoutError,
+    check_deadline,
+    deadline,
+    get_breaker,
+    hedged,
+    time_left,
+)
+
+logger = logging.getLogger(__name__)
+
+REPLY = "reply"
+EXTRACTION = "extraction"
+DRAFT = "draft"  # reply + extraction as one JSON object
+
+
+class LLMResponse(NamedTuple):
+    """Provider-neutral completion result."""
+    text: str
+    model: str
+    provider: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+
+
+class LLMTimeoutError(UpstreamTimeoutError):
+    """A provider gave up on a call after the model's timeout."""
+
+
+class LLMProvider:
+    """One backend that can run a prompt against one of its models."""
+
+    name = "base"
+
+    def complete(self, *, task: str, model: str, prompt: str, system: Optional[str] = None,
+                 max_tokens: int = 300, temperature: Optional[float] = None,
+                 timeout: Optional[float] = None) -> LLMResponse:
+        raise NotImplementedError
+
+    def stream(self, *, task: str, model: str, prompt: str, system: Optional[str] = None,
+               max_tokens: int = 300, temperature: Optional[float] = None,
+               timeout: Optional[float] = None) -> Generator[str, None, LLMResponse]:
+        """Yield text deltas, returning the full LLMResponse. Default: one chunk from complete()."""
+        response = self.complete(task=task, model=model, prompt=prompt, system=system,
+                                 max_tokens=max_tokens, temperature=temperature, timeout=timeout)
+        yield response.text
+        return response
+
+
+# ========================
+# Anthropic
+# ========================
+class AnthropicProvider(LLMProvider):
+    """Anthropic Messages API, through the shared rate limiter (which owns retries)."""
+
+    name = "anthropic"
+
+    def __init__(self, client=None):
+        self._client = client
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    import anthropic
+                    self._client = anthropic.Anthropic(
+                        api_key=ANTHROPIC_API_KEY, max_retries=0, timeout=LLM_DEFAULT_TIMEOUT_SECONDS,
+                    )
+        return self._client
+
+    @staticmethod
+    def _kwargs(model, prompt, system, max_tokens, temperature, timeout) -> Dict:
+        kwargs = {"model": model, "max_tokens": max_tokens, "messages": [{"role": "user", "content": prompt}]}
+        if system:
+            kwargs["system"] = system
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+        if timeout:
+            kwargs["timeout"] = timeout
+        return kwargs
+
+    def _response(self, message, model: str, text: str) -> LLMResponse:
+        usage = getattr(message, "usage", None)
+        return LLMResponse(
+            text=text,
+            model=model,
+            provider=self.name,
+            input_tokens=getattr(usage, "input_tokens", 0) or 0,
+            output_tokens=getattr(usage, "output_tokens", 0) or 0,
+        )
+
+    def complete(self, *, task, model, prompt, system=None, max_tokens=300, temperature=None, timeout=None):
+        try:
+            message = anthropic_create(self.client, **self._kwargs(model, prompt, system, max_tokens, temperature, timeout))
+        except Exception as e:
+            if type(e).__name__ == "APITimeoutError":
+                raise LLMTimeoutError(f"{model} timed out after {timeout}s") from e
+            raise
+        return self._response(message, model, message.content[0].text)
+
+    def stream(self, *, task, model, prompt, system=None, max_tokens=300, temperature=None, timeout=None):
+        chunks = []
+        try:
+            final = yield from _collect(
+                anthropic_stream(self.client, **self._kwargs(model, prompt, system, max_tokens, temperature, timeout)),
+                chunks,
+            )
+        except Exception as e:
+            if type(e).__name__ == "APITimeoutError":
+                raise LLMTimeoutError(f"{model} timed out after {timeout}s") from e
+            raise
+        return self._response(final, model, "".join(chunks))
+
+
+def _collect(gen: Generator, chunks: List[str]):
+    """Re-yield `gen`'s chunks while keeping a copy; returns gen's return value."""
+    while True:
+        try:
+            chunk = next(gen)
+        except StopIteration as stop:
+            return stop.value
+        chunks.append(chunk)
+        yield chunk
+
+
+# ========================
+# Deterministic stub (tests / benchmarks / offline dev)
+# ========================
+_ADMISSION_RE = re.compile(r"\b(\d{6}|[A-Z]{3,5}/\d{3,5}/\d{2})\b")
+_NAME_RE = re.compile(r"(?:regards|sincerely|thanks),?\s*\n\s*([A-Z][a-z]+(?: [A-Z][a-z]+)*)", re.IGNORECASE)
+_YEAR_SEM_RE = re.compile(r"\b([1-4])[./-]([1-2])\b")
+_COURSE_RE = re.compile(r"\b(BBIT|BCOM|BICS|LLB|BSCF|DBIT)\b")
+_GROUP_RE = re.compile(r"\bgroup\s+([A-E])\b", re.IGNORECASE)
+_SENDER_NAME_RE = re.compile(r"Name:\s*(.+)")
+
+
+def stub_extraction(text: str) -> Dict:
+    """Regex stand-in for the extraction model, returning the same JSON shape."""
+    def first(rx):
+        m = rx.search(text or "")
+        return m.group(1) if m else ""
+
+    ys = _YEAR_SEM_RE.search(text or "")
+    fields = {
+        "full_name": first(_NAME_RE),
+        "admission_number": first(_ADMISSION_RE),
+        "course": first(_COURSE_RE),
+        "year": ys.group(1) if ys else "",
+        "semester": ys.group(2) if ys else "",
+        "group": first(_GROUP_RE).upper(),
+    }
+    missing = [k for k, v in fields.items() if not v]
+    status = "complete" if not missing else ("empty" if len(missing) == len(fields) else "partial")
+    fields.update({
+        "year_semester": f"{fields['year']}.{fields['semester']}" if ys else "",
+        "full_thread_summary": (text or "").strip().split("\n")[0][:200],
+        "details_status": status,
+        "missing_fields": missing,
+        "follow_up_message": "" if status == "complete" else "Please share your " + ", ".join(missing) + ".",
+    })
+    return fields
+
+
+class StubProvider(LLMProvider):
+    """
+    Local, deterministic provider: regex extraction and a templated reply.
+    `latency_s` simulates model latency; a latency above the call's timeout
+    raises LLMTimeoutError, so fallback paths can be exercised offline.
+    """
+
+    name = "stub"
+
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+
+    def complete(self, *, task, model, prompt, system=None, max_tokens=300, temperature=None, timeout=None):
+        self._wait(self.latency_s, model, timeout)
+        return self._respond(task, model, prompt, system)
+
+    def stream(self, *, task, model, prompt, system=None, max_tokens=300, temperature=None, timeout=None):
+        # A fifth of the latency before the first token, the rest spread over the words
+        self._wait(self.latency_s / 5, model, timeout)
+        response = self._respond(task, model, prompt, system)
+        words = re.findall(r"\S+\s*", response.text) or [response.text]
+        for word in words:
+            if self.latency_s:
+                time.sleep(self.latency_s * 4 / 5 / len(words))
+            yield word
+        return response
+
+    @staticmethod
+    def _wait(seconds: float, model: str, timeout: Optional[float]):
+        if not seconds:
+            return
+        if timeout and seconds > timeout:
+            time.sleep(timeout)
+            raise LLMTimeoutError(f"stub:{model} timed out after {timeout}s")
+        time.sleep(seconds)
+
+    def _respond(self, task, model, prompt, system) -> LLMResponse:
+        if task == EXTRACTION:
+            text = json.dumps(stub_extraction(prompt))
+        else:
+            m = _SENDER_NAME_RE.search(prompt or "")
+            name = m.group(1).strip() if m else "Student"
+            text = f"Dear {name},\n\nThank you for your email. We will look into it and revert shortly.\n\nRegards,\nAdam"
+            if task == DRAFT:
+                text = json.dumps({**stub_extraction(prompt), "reply": text})
+        return LLMResponse(
+            text=text,
+            model=model,
+            provider=self.name,
+            input_tokens=max(1, len((system or "") + (prompt or "")) // 4),
+            output_tokens=max(1, len(text) // 4),
+        )
+
+
+# ========================
+# Routing
+# ========================
+class ModelRoute(NamedTuple):
+    provider: str
+    model: str
+    timeout: float
+
+
+def _parse_timeouts(spec: str) -> Dict[str, float]:
+    timeouts = {}
+    for item in (spec or "").split(","):
+        model, _, seconds = item.partition("=")
+        if model.strip() and seconds.strip():
+            timeouts[model.strip()] = float(seconds)
+    return timeouts
+
+
+def _parse_route(spec: str, timeouts: Dict[str, float]) -> ModelRoute:
+    provider, _, model = spec.strip().partition(":")
+    if not model:
+        provider, model = "anthropic", provider
+    return ModelRoute(provider, model, timeouts.get(model, LLM_DEFAULT_TIMEOUT_SECONDS))
+
+
+def routes_from_config() -> Dict[str, List[ModelRoute]]:
+    timeouts = _parse_timeouts(LLM_MODEL_TIMEOUTS)
+    routes = {}
+    for task, primary, fallbacks in (
+        (REPLY, LLM_REPLY_MODEL, LLM_REPLY_FALLBACKS),
+        (EXTRACTION, LLM_EXTRACTION_MODEL, LLM_EXTRACTION_FALLBACKS),
+        (DRAFT, LLM_DRAFT_MODEL, LLM_DRAFT_FALLBACKS),
+    ):
+        specs = [primary] + [f for f in (fallbacks or "").split(",") if f.strip()]
+        routes[task] = [_parse_route(s, timeouts) for s in specs]
+    return routes
+
+
+def _fallback_reason(e: Exception) -> str:
+    if isinstance(e, CircuitOpenError):
+        return "circuit_open"
+    return "timeout" if isinstance(e, UpstreamTimeoutError) else "error"
+
+
+class LLMRouter:
+    """
+    Sends each task to its model route: the primary model first, then each
+    fallback in order if a call times out or errors. Raises the last error
+    when the whole route fails.
+
+    Each route model has its own circuit breaker, so a degraded model is
+    skipped straight to the fallback. The whole route shares one deadline
+    (LLM_CALL_DEADLINE_SECONDS, or a tighter resilience.deadline() around the
+    call). Interactive calls for tasks in LLM_HEDGE_TASKS are hedged: a
+    duplicate goes out once the first is slower than that model's recent p95.
+    """
+
+    def __init__(self, routes: Dict[str, List[ModelRoute]], providers: Dict[str, LLMProvider],
+                 hedge_tasks: Optional[List[str]] = None):
+        self.routes = routes
+        self.providers = providers
+        if hedge_tasks is None:
+            hedge_tasks = [t.strip() for t in LLM_HEDGE_TASKS.split(",") if t.strip()]
+        self.hedge_tasks = set(hedge_tasks)
+        self._latencies: Dict[str, LatencyTracker] = {}
+
+    def _latency(self, name: str) -> LatencyTracker:
+        tracker = self._latencies.get(name)
+        if tracker is None:
+            tracker = self._latencies.setdefault(name, LatencyTracker())
+        return tracker
+
+    def _complete_on(self, task: str, route: ModelRoute, provider: LLMProvider, **kwargs) -> LLMResponse:
+        name = f"{route.provider}:{route.model}"
+        breaker = get_breaker(name)
+        check_deadline(name)
+        timeout = time_left(route.timeout)
+
+        def attempt():
+            started = time.perf_counter()
+            response = breaker.call(lambda: provider.complete(task=task, model=route.model, timeout=timeout, **kwargs))
+            self._latency(name).observe(time.perf_counter() - started)
+            return response
+
+        if task in self.hedge_tasks and current_priority() == INTERACTIVE:
+            delay = self._latency(name).quantile(0.95) or LLM_HEDGE_DELAY_MS / 1000
+            return hedged(attempt, delay, name)
+        return attempt()
+
+    def complete(self, task: str, prompt: str, system: Optional[str] = None,
+                 max_tokens: int = 300, temperature: Optional[float] = None) -> LLMResponse:
+        last_error: Optional[Exception] = None
+        with deadline(LLM_CALL_DEADLINE_SECONDS):
+            for route in self.routes[task]:
+                provider = self.providers.get(route.provider)
+                if provider is None:
+                    logger.error("No LLM provider %r for %s (route %s)", route.provider, task, route.model)
+                    continue
+                try:
+                    response = self._complete_on(
+                        task, route, provider, prompt=prompt, system=system,
+                        max_tokens=max_tokens, temperature=temperature,
+                    )
+                    set_span_attributes(**{"llm.task": task, "llm.provider": route.provider, "llm.routed_model": route.model})
+                    return response
+                except Exception as e:
+                    reason = _fallback_reason(e)
+                    LLM_FALLBACKS.labels(task=task, model=route.model, reason=reason).inc()
+                    logger.warning("LLM %s call to %s:%s failed (%s): %s", task, route.provider, route.model, reason, e)
+                    last_error = e
+                    if time_left(1.0) <= 0:
+                        break
+        raise last_error or RuntimeError(f"No usable model route for {task}")
+
+    def stream(self, task: str, prompt: str, system: Optional[str] = None,
+               max_tokens: int = 300, temperature: Optional[float] = None) -> Generator[str, None, LLMResponse]:
+        """
+        Like complete(), but yields text deltas and returns the LLMResponse.
+        Falls back to the next model only before the first token; a stream that
+        breaks midway raises, since the caller has already shown partial text.
+        Never hedged.
+        """
+        last_error: Optional[Exception] = None
+        until = time.monotonic() + LLM_CALL_DEADLINE_SECONDS
+        for route in self.routes[task]:
+            provider = self.providers.get(route.provider)
+            if provider is None:
+                logger.error("No LLM provider %r for %s (route %s)", route.provider, task, route.model)
+                continue
+            name = f"{route.provider}:{route.model}"
+            breaker = get_breaker(name)
+            chunks: List[str] = []
+            recorded = False
+            try:
+                left = min(until - time.monotonic(), time_left(route.timeout))
+                if left <= 0:
+                    raise UpstreamTimeoutError(f"Deadline exceeded before calling {name}", name)
+                breaker.allow()
+                try:
+                    gen = provider.stream(
+                        task=task, model=route.model, prompt=prompt, system=system,
+                        max_tokens=max_tokens, temperature=temperature, timeout=left,
+                    )
+                    result = yield from _collect(gen, chunks)
+                except Exception as e:
+                    breaker.record(e)
+                    recorded = True
+                    raise
+                finally:
+                    if not recorded:
+                        # Finished, or abandoned by the consumer mid-stream: the model was answering
+                        breaker.record(None)
+                return result
+            except Exception as e:
+                if chunks:
+                    raise
+                reason = _fallback_reason(e)
+                LLM_FALLBACKS.labels(task=task, model=route.model, reason=reason).inc()
+                logger.warning("LLM %s stream from %s:%s failed (%s): %s", task, route.provider, route.model, reason, e)
+                last_error = e
+        raise last_error or RuntimeError(f"No usable model route for {task}")
+
+
+_PROVIDER_FACTORIES: Dict[str, Callable[[], LLMProvider]] = {
+    "anthropic": AnthropicProvider,
+    "stub": lambda: StubProvider(LLM_STUB_LATENCY_MS / 1000),
+}
+_router: Optional[LLMRouter] = None
+_router_lock = threading.Lock()
+
+
+def register_provider(name: str, factory: Callable[[], LLMProvider]):
+    """Make a provider available to routes as "<name>:<model>"."""
+    _PROVIDER_FACTORIES[name] = factory
+
+
+def get_llm() -> LLMRouter:
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = LLMRouter(
+                    routes_from_config(),
+                    {name: factory() for name, factory in _PROVIDER_FACTORIES.items()},
+                )
+    return _router
+
+
+def set_provider(name: str, provider: LLMProvider):
+    """Swap a provider instance at runtime (benchmarks, tests)."""
+    get_llm().providers[name] = provider
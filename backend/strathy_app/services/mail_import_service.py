@@ -0,0 +1,320 @@
+# backend/strathy_app/services/mail_import_service.py
+import gzip
+import json
+import logging
+import os
+import tarfile
+import time
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from email.utils import parseaddr
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from sqlalchemy import func
+
+from backend.strathy_app.models.models import Conversation, Message, SessionLocal, Student
+from ..config import ARCHIVE_IMPORT_BATCH_SIZE
+from ..utils.email_parser import iter_parse_messages
+from ..utils.mbox import iter_mbox, parse_archive_message
+from .cache_service import get_response_cache, student_tag, thread_tag
+from .sender_policy import get_sender_policy
+
+logger = logging.getLogger(__name__)
+
+# Never imported: not mail a student sent or was sent
+_SKIPPED_LABELS = {"SPAM", "TRASH", "CHAT", "DRAFT"}
+
+
+# ========================
+# Archive sources
+# ========================
+def _is_mbox(name: str) -> bool:
+    return name.lower().endswith((".mbox", ".mbx"))
+
+
+@contextmanager
+def _member(opener):
+    fh = opener()
+    try:
+        yield fh
+    finally:
+        fh.close()
+
+
+def iter_sources(path: str) -> Iterator[Tuple[str, int, object]]:
+    """
+    (key, size in bytes, opener) for every mbox in `path`: a .mbox file, a
+    gzipped one, a directory of them, or a Takeout .zip / .tgz (read in place,
+    nothing is extracted to disk). `key` identifies the mbox in checkpoints.
+    """
+    lower = path.lower()
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                if _is_mbox(name):
+                    full = os.path.join(root, name)
+                    yield full, os.path.getsize(full), lambda full=full: open(full, "rb")
+    elif lower.endswith(".zip"):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if _is_mbox(info.filename):
+                    yield f"{path}!{info.filename}", info.file_size, lambda info=info: archive.open(info)
+    elif lower.endswith((".tgz", ".tar.gz", ".tar")):
+        with tarfile.open(path, "r:*") as archive:
+            for info in archive.getmembers():
+                if info.isfile() and _is_mbox(info.name):
+                    yield f"{path}!{info.name}", info.size, lambda info=info: archive.extractfile(info)
+    elif lower.endswith(".gz"):
+        yield path, os.path.getsize(path), lambda: gzip.open(path, "rb")
+    else:
+        yield path, os.path.getsize(path), lambda: open(path, "rb")
+
+
+# ========================
+# Checkpoints
+# ========================
+class Checkpoint:
+    """
+    Resume point of an import: per mbox, the offset of the last message
+    committed and whether it is finished. Written (atomically) after every
+    committed batch, so an interrupted import picks up where it stopped.
+    """
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.sources: Dict[str, Dict] = {}
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "Checkpoint":
+        checkpoint = cls(path)
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as fh:
+                checkpoint.sources = json.load(fh).get("sources", {})
+        return checkpoint
+
+    def after(self, key: str) -> int:
+        return self.sources.get(key, {}).get("after", -1)
+
+    def done(self, key: str) -> bool:
+        return self.sources.get(key, {}).get("done", False)
+
+    def save(self, key: str, after: int, done: bool = False):
+        self.sources[key] = {"after": after, "done": done}
+        if not self.path:
+            return
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"sources": self.sources, "saved_at": datetime.utcnow().isoformat()}, fh, indent=2)
+        os.replace(tmp, self.path)
+
+
+# ========================
+# Import
+# ========================
+def _sent_at(parsed: Dict) -> datetime:
+    if parsed.get("internal_date"):
+        return datetime.fromtimestamp(int(parsed["internal_date"]) / 1000, tz=timezone.utc).replace(tzinfo=None)
+    return datetime.utcnow()
+
+
+def _classify(parsed: Dict, owner_email: Optional[str], stats: Dict) -> Optional[Dict]:
+    """The row to import for a parsed message (student, role, ...), or None if it is skipped."""
+    if parsed.get("error"):
+        stats["errors"] += 1
+        logger.warning("Unreadable message at offset %s: %s", parsed.get("offset"), parsed["error"])
+        return None
+    labels = set(parsed.get("labels") or [])
+    if labels & _SKIPPED_LABELS:
+        stats["skipped_label"] += 1
+        return None
+
+    policy = get_sender_policy()
+    sender_name, sender_email = parseaddr(parsed.get("sender") or "")
+    sender_email = sender_email.lower()
+    sent = "SENT" in labels or bool(owner_email and sender_email == owner_email)
+    if sent:
+        student_email = next((addr for addr in parsed.get("to") or [] if policy.is_allowed(addr)), None)
+    else:
+        student_email = sender_email if policy.is_allowed(sender_email) else None
+    if not student_email or not parsed.get("thread_id"):
+        stats["skipped_sender"] += 1
+        return None
+
+    return {
+        "message_id": parsed["message_id"],
+        "thread_id": parsed["thread_id"],
+        "student_email": student_email,
+        "student_name": None if sent else (sender_name or None),
+        "sender_email": sender_email,
+        "sender_name": sender_name or sender_email.split("@")[0],
+        "subject": parsed.get("subject") or "(no subject)",
+        "body": parsed.get("body") or "",
+        "role": "ADAM" if sent else "student",
+        "sent_at": _sent_at(parsed),
+    }
+
+
+def _write_batch(db, rows: List[Dict], stats: Dict) -> Tuple[Set[str], Set[str]]:
+    """Students, conversations and messages for one batch; returns the (emails, thread ids) touched."""
+    known = {
+        mid for (mid,) in db.query(Message.message_id).filter(Message.message_id.in_({r["message_id"] for r in rows}))
+    }
+    fresh, seen = [], set()
+    for row in rows:
+        if row["message_id"] in known or row["message_id"] in seen:
+            stats["duplicates"] += 1
+            continue
+        seen.add(row["message_id"])
+        fresh.append(row)
+    if not fresh:
+        return set(), set()
+
+    emails = {r["student_email"] for r in fresh}
+    students: Dict[str, Student] = {}
+    for student in db.query(Student).filter(func.lower(Student.email).in_(emails)).order_by(Student.updated_at):
+        students[student.email.lower()] = student
+    for row in fresh:
+        if row["student_email"] not in students:
+            student = Student(email=row["student_email"], full_name=row["student_name"])
+            db.add(student)
+            students[row["student_email"]] = student
+            stats["students_created"] += 1
+        elif row["student_name"] and not students[row["student_email"]].full_name:
+            students[row["student_email"]].full_name = row["student_name"]
+
+    thread_ids = {r["thread_id"] for r in fresh}
+    conversations = {c.thread_id: c for c in db.query(Conversation).filter(Conversation.thread_id.in_(thread_ids))}
+    created: Set[str] = set()
+    db.flush()  # student ids
+    for row in fresh:
+        conversation = conversations.get(row["thread_id"])
+        if conversation is None:
+            conversation = Conversation(
+                thread_id=row["thread_id"],
+                student_id=students[row["student_email"]].id,
+                subject=row["subject"],
+                message_body="",
+                last_updated=row["sent_at"],
+                details_status="empty",
+                missing_fields=[],
+            )
+            db.add(conversation)
+            conversations[row["thread_id"]] = conversation
+            created.add(row["thread_id"])
+            stats["conversations_created"] += 1
+        # The thread's latest student message is what extraction (and the dashboard) reads
+        last_updated = conversation.last_updated or row["sent_at"]
+        if row["role"] == "student" and (not conversation.message_body or row["sent_at"] >= last_updated):
+            conversation.message_body = row["body"]
+            conversation.last_updated = max(last_updated, row["sent_at"])
+            if row["thread_id"] not in created:
+                stats["conversations_updated"] += 1
+
+    db.flush()  # conversation ids
+    db.add_all(
+        Message(
+            message_id=row["message_id"],
+            conversation_id=conversations[row["thread_id"]].id,
+            sender_email=row["sender_email"],
+            sender_name=row["sender_name"],
+            subject=row["subject"],
+            body=row["body"],
+            role=row["role"],
+            sent_at=row["sent_at"],
+        )
+        for row in fresh
+    )
+    stats["imported"] += len(fresh)
+    return emails, thread_ids
+
+
+def import_archive(path: str, batch_size: int = ARCHIVE_IMPORT_BATCH_SIZE, checkpoint_path: Optional[str] = None,
+                   restart: bool = False, dry_run: bool = False, workers: Optional[int] = None,
+                   owner_email: Optional[str] = None) -> Dict:
+    """
+    Stream an mbox / Google Takeout archive into students, conversations and
+    messages without any Gmail or model call.
+
+    Messages are read one at a time (memory stays flat whatever the archive
+    size), parsed with email_parser (over `workers` processes) and written
+    `batch_size` per transaction. Only mail from or to senders the sender
+    policy allows is imported; spam, trash, chats and drafts are skipped, and
+    messages already in the DB are counted as duplicates, so re-running is
+    safe. Conversations are left for background extraction ("empty" details).
+    Sent mail is recognised by Takeout's "Sent" label or, for plain mbox
+    files, by `owner_email`. Returns counts and throughput.
+
+    This normally runs in its own process (the mail_import CLI), so nothing
+    here touches the API's in-memory state. The API and worker pick up new
+    students through the student index's periodic reload (row count and
+    latest updated_at, checked every STUDENT_INDEX_REFRESH_SECONDS). Each
+    committed batch's cache tags are invalidated through the response cache,
+    which reaches the API only when RESPONSE_CACHE_URL points at Redis (by
+    default a separate API process doesn't cache those views at all).
+    """
+    stats = {
+        "messages": 0, "imported": 0, "duplicates": 0, "skipped_sender": 0, "skipped_label": 0, "errors": 0,
+        "students_created": 0, "conversations_created": 0, "conversations_updated": 0, "bytes": 0,
+    }
+    owner_email = (owner_email or "").lower() or None
+    checkpoint = Checkpoint(checkpoint_path) if restart or dry_run else Checkpoint.load(checkpoint_path)
+    if dry_run:
+        checkpoint.path = None
+    cache = get_response_cache()
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        for key, size, opener in iter_sources(path):
+            if checkpoint.done(key):
+                logger.info("📦 %s already imported; skipping", key)
+                continue
+            after = checkpoint.after(key)
+            if after >= 0:
+                logger.info("📦 Resuming %s after offset %d of %d", key, after, size)
+
+            with _member(opener) as fh:
+                entries = ((offset, raw) for offset, raw in iter_mbox(fh, start=max(after, 0)) if offset > after)
+                batch: List[Dict] = []
+                last_offset = after
+
+                def flush():
+                    if batch:
+                        emails, thread_ids = _write_batch(db, batch, stats)
+                        if dry_run:
+                            db.rollback()
+                        else:
+                            db.commit()
+                            cache.invalidate_tags([student_tag(e) for e in emails] + [thread_tag(t) for t in thread_ids])
+                    checkpoint.save(key, last_offset)
+                    batch.clear()
+                    elapsed = time.perf_counter() - started
+                    logger.info(
+                        "📦 %d messages read, %d imported (%.0f msgs/s)",
+                        stats["messages"], stats["imported"], stats["messages"] / elapsed if elapsed else 0,
+                    )
+
+                for parsed in iter_parse_messages(entries, workers=workers, parse=parse_archive_message):
+                    stats["messages"] += 1
+                    stats["bytes"] += parsed.get("size", 0)
+                    last_offset = parsed["offset"]
+                    row = _classify(parsed, owner_email, stats)
+                    if row is not None:
+                        batch.append(row)
+                    if len(batch) >= batch_size:
+                        flush()
+                if batch:
+                    flush()
+                checkpoint.save(key, last_offset, done=True)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    elapsed = time.perf_counter() - started
+    stats["elapsed_s"] = round(elapsed, 2)
+    stats["messages_per_s"] = round(stats["messages"] / elapsed, 1) if elapsed else None
+    stats["mb_per_s"] = round(stats["bytes"] / (1024 * 1024) / elapsed, 2) if elapsed else None
+    return stats
@@ -1,17 +1,14 @@
-# ========================
-# === Anthropic Client ===
-# ========================
+# ==================================
+# === Student Extraction (routed) ===
+# ==================================
 
-import os
 import json
 import re
-import anthropic
-from dotenv import load_dotenv
 
-load_dotenv()
-
-# Initialize Anthropic client
-client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+from .llm_provider import EXTRACTION, get_llm
+from ..config import LLM_INPUT_BUDGET_EXTRACTION
+from ..utils.compaction import compact_for_model
+from ..utils.metrics import record_llm_usage, timed
 
 SYSTEM_PROMPT = """You are an intelligent extraction model for university admission data.
 
@@ -69,119 +66,15 @@ def _parse_model_json(raw_content: str) -> dict:
 
     return data
 
+@timed("llm.extraction")
 def extract_student_details(email_body: str) -> dict:
     """
-    Send the email text to Anthropic and return structured JSON.
+    Send the email text to the extraction model (see LLM_EXTRACTION_MODEL,
+    a small fast model by default) and return structured JSON. The text is
+    compacted to LLM_INPUT_BUDGET_EXTRACTION tokens first.
     """
-    response = client.messages.create(
-        model="claude-sonnet-4-5",
-        system=SYSTEM_PROMPT,
-        messages=[{"role": "user", "content": email_body}],
-        max_tokens=3000,
-        temperature=0
-    )
-
-    raw_content = response.content[0].text
-    return _parse_model_json(raw_content)
-
+    email_body = compact_for_model(email_body, LLM_INPUT_BUDGET_EXTRACTION, "extraction")
+    response = get_llm().complete(EXTRACTION, email_body, system=SYSTEM_PROMPT, max_tokens=3000, temperature=0)
 
-# =====================
-# === Gemini Client ===
-# =====================
-# import os
-# import json
-# from google import genai
-# from dotenv import load_dotenv
-#
-# load_dotenv()
-#
-# # Initialize Gemini client (make sure GENAI_API_KEY env var is set)
-# GEMINI_API_KEY = os.getenv("GENAI_API_KEY")
-# client = genai.Client(api_key=GEMINI_API_KEY)
-#
-# SYSTEM_PROMPT = """You are an intelligent extraction model for university admission data.
-#
-# Your goal is to analyze a student's email or message and extract the following structured fields:
-#
-# - full_name: The student's full name. At least ONE name is okay, which is can be safe to be categorize as "Complete"
-# - admission_number: The student's admission number if mentioned (examples: "148705", "156443", "BBIT/00432/23"). If not present, return "".
-# - course: The course code or name (e.g., "BBIT" or "Bachelor of Business Information Technology"). If not present, return "".
-# - year: The academic year as a single digit string (e.g., "1", "2", "3", "4"). If not present, return "".
-# - semester: The semester number as a single digit string (e.g., "1" or "2"). If not present, return "".
-# - year_semester: Combined representation "year.semester" (e.g., "4.2"). If either year or semester is missing, return "".
-# - group: The group or section (e.g., "A", "B", "C", "D", "E"). If not present, return "".
-# - full_thread_summary: If this email is part of a longer thread, write a 2–4 sentence summary capturing the full context or purpose of the conversation so far.
-#   Always include this summary even if only one message is provided — capture the student's intent, context, or request in a natural way.
-# - details_status: One of "complete", "partial", or "empty". "complete" means full_name, admission_number, course, year, semester and group are all present. "partial" if at least one field found but not all. "empty" if none of the main fields found.
-# - missing_fields: A JSON array listing the missing main fields from: ["full_name","admission_number","course","year","semester","group"].
-# - follow_up_message: If status is "partial" or "empty", produce a short polite message to request the missing fields from the student. If status is "complete", return an empty string.
-#
-# Rules:
-# - Return ONLY a valid JSON object, and use those exact keys and types.
-# - Keep values as strings (use "" for missing).
-# - For year and semester try to normalize numeric forms. For example:
-#   - "year 4 semester 2" -> "year": "4", "semester": "2", "year_semester": "4.2"
-#   - "4.2", "4/2", "4-2" in the text should map to year "4" semester "2" and year_semester "4.2".
-# - Admission numbers can be numeric-only (6 digits). Return as-is.
-# - If the model is unsure about a value, leave it empty ("") and include it in missing_fields.
-# - Always include a `full_thread_summary` field with a natural summary — never leave it blank.
-# - Do not include any commentary — only the JSON.
-#
-# Example output:
-# {
-#   "full_name": "John Mwangi",
-#   "admission_number": "148705",
-#   "course": "BBIT",
-#   "year": "4",
-#   "semester": "2",
-#   "year_semester": "4.2",
-#   "group": "B",
-#   "full_thread_summary": "Student has been discussing project submission deadlines and timetable updates over several messages.",
-#   "details_status": "partial",
-#   "missing_fields": ["admission_number"],
-#   "follow_up_message": "Hi John, could you please share your admission number so we can assist you better?"
-# }
-# """
-#
-# def extract_student_details(email_body: str) -> dict:
-#     """
-#     Send the email text to Gemini and return structured JSON (with semester, message_summary, and full_thread_summary).
-#     """
-#     try:
-#         full_prompt = f"{SYSTEM_PROMPT}\n\nEmail body:\n{email_body}"
-#
-#         response = client.models.generate_content(
-#             model="gemini-2.5-pro",
-#             contents=full_prompt,
-#             config={
-#                 "temperature": 0,
-#                 "max_output_tokens": 3000,
-#             },
-#         )
-#
-#         content = response.text.strip()
-#
-#         # --- 🧹 Clean up code fences if Gemini adds them ---
-#         if content.startswith("```"):
-#             # Remove markdown fences like ```json ... ```
-#             content = content.strip("`")
-#             if content.lower().startswith("json"):
-#                 content = content[4:]
-#             # Also strip any trailing triple backticks
-#             content = content.replace("```", "").strip()
-#
-#         # --- 🧩 Try to parse JSON safely ---
-#         try:
-#             data = json.loads(content)
-#         except json.JSONDecodeError:
-#             data = {"error": "Invalid JSON returned from model", "raw": content}
-#
-#         # --- 🧠 Fallback for missing summary ---
-#         if "full_thread_summary" not in data or not data.get("full_thread_summary"):
-#             data["full_thread_summary"] = data.get("message_summary", "")
-#
-#         return data
-#
-#     except Exception as e:
-#         return {"error": f"(Error generating AI extraction: {e})"}
-#
+    record_llm_usage("extraction", response)
+    return _parse_model_json(response.text)
@@ -0,0 +1,351 @@
+# backend/strathy_app/services/rate_limiter.py
+import contextvars
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from ..utils.metrics import RATE_LIMIT_WAIT_SECONDS
+from .resilience import check_deadline, get_breaker, time_left
+from ..utils.tracing import set_span_attributes, span
+from ..config import (
+    ANTHROPIC_REQUESTS_PER_MINUTE,
+    ANTHROPIC_TOKENS_PER_MINUTE,
+    GMAIL_QUOTA_UNITS_PER_SECOND,
+    RATE_LIMIT_INTERACTIVE_RESERVE,
+    RATE_LIMIT_MAX_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+# ========================
+# Priority lanes
+# ========================
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_current_priority = contextvars.ContextVar("rate_limit_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority(lane: str):
+    """Run a block (e.g. the scheduler job or the enricher) in a given priority lane."""
+    token = _current_priority.set(lane)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> str:
+    return _current_priority.get()
+
+
+# Gmail API quota units per method (https://developers.google.com/gmail/api/reference/quota)
+GMAIL_QUOTA_UNITS = {
+    "messages.list": 5,
+    "messages.get": 5,
+    "messages.modify": 5,
+    "messages.batchModify": 50,
+    "messages.send": 100,
+    "threads.get": 10,
+    "labels.list": 1,
+    "labels.create": 5,
+}
+
+
+class RateLimitedError(Exception):
+    """Raised when an upstream keeps answering 429 after all retries."""
+
+
+class TokenBucket:
+    """Classic token bucket: `capacity` burst, refilled at `rate` tokens per second."""
+
+    def __init__(self, capacity: float, rate: float):
+        self.capacity = float(capacity)
+        self.rate = float(rate)
+        self.level = float(capacity)
+        self._last = time.monotonic()
+
+    def refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self._last) * self.rate)
+        self._last = now
+
+    def wait_for(self, amount: float, reserve: float = 0.0) -> float:
+        """
+        Seconds until `amount` (plus a reserved floor) is available; 0 if available now.
+        Never more than a full bucket is needed: `level` can't exceed `capacity`, so a
+        larger target (a big background request plus the reserve) would never be met.
+        """
+        needed = min(min(amount, self.capacity) + reserve * self.capacity, self.capacity)
+        if self.level >= needed:
+            return 0.0
+        if self.rate <= 0:
+            return float("inf")
+        return (needed - self.level) / self.rate
+
+
+class ApiGovernor:
+    """
+    Per-API budget made of several buckets (e.g. requests and tokens).
+
+    Interactive callers always go first: background callers wait while any
+    interactive caller is queued and may not dip into the reserved share.
+    429s push `blocked_until` forward so every caller backs off together.
+    """
+
+    def __init__(self, name: str, buckets: Dict[str, TokenBucket], interactive_reserve: float = 0.2):
+        self.name = name
+        self.buckets = buckets
+        self.interactive_reserve = interactive_reserve
+        self.blocked_until = 0.0
+        self._consecutive_429 = 0
+        self._waiting = {INTERACTIVE: 0, BACKGROUND: 0}
+        self._cond = threading.Condition()
+        self._wait_stats: Dict[str, Dict[str, float]] = {}
+
+    def acquire(self, lane: Optional[str] = None, **costs: float) -> float:
+        """
+        Block until every bucket can pay its cost. Returns seconds waited.
+        Raises UpstreamTimeoutError if the current resilience.deadline() passes first.
+        """
+        lane = lane or current_priority()
+        reserve = self.interactive_reserve if lane == BACKGROUND else 0.0
+        started = time.monotonic()
+
+        with self._cond:
+            self._waiting[lane] = self._waiting.get(lane, 0) + 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    for bucket in self.buckets.values():
+                        bucket.refill(now)
+
+                    wait = max(0.0, self.blocked_until - now)
+                    if lane == BACKGROUND and self._waiting.get(INTERACTIVE, 0) > 0:
+                        wait = max(wait, 0.05)
+                    for key, amount in costs.items():
+                        bucket = self.buckets.get(key)
+                        if bucket is not None:
+                            wait = max(wait, bucket.wait_for(amount, reserve))
+
+                    if wait <= 0:
+                        for key, amount in costs.items():
+                            if key in self.buckets:
+                                self.buckets[key].level -= amount
+                        break
+                    check_deadline(self.name)
+                    self._cond.wait(timeout=min(wait, time_left(5.0)))
+            finally:
+                self._waiting[lane] -= 1
+                self._cond.notify_all()
+
+        waited = time.monotonic() - started
+        self._record_wait(lane, waited)
+        return waited
+
+    def adjust(self, key: str, delta: float):
+        """Charge (positive) or refund (negative) a bucket once the real cost is known."""
+        with self._cond:
+            bucket = self.buckets.get(key)
+            if bucket is not None:
+                bucket.level = min(bucket.capacity, bucket.level - delta)
+                self._cond.notify_all()
+
+    def penalize(self, retry_after: Optional[float] = None) -> float:
+        """Back off after a 429: honour Retry-After, else exponential with jitter."""
+        with self._cond:
+            self._consecutive_429 += 1
+            if retry_after is None:
+                retry_after = min(60.0, (2 ** self._consecutive_429) + random.uniform(0, 1))
+            self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+            return retry_after
+
+    def succeeded(self):
+        with self._cond:
+            self._consecutive_429 = 0
+
+    def _record_wait(self, lane: str, waited: float):
+        RATE_LIMIT_WAIT_SECONDS.labels(api=self.name, lane=lane).observe(waited)
+        with self._cond:
+            stats = self._wait_stats.setdefault(lane, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            stats["count"] += 1
+            stats["total_seconds"] += waited
+            stats["max_seconds"] = max(stats["max_seconds"], waited)
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {
+                "blocked_for_seconds": max(0.0, self.blocked_until - time.monotonic()),
+                "buckets": {k: round(b.level, 2) for k, b in self.buckets.items()},
+                "wait": {lane: dict(s) for lane, s in self._wait_stats.items()},
+            }
+
+
+# ========================
+# Shared governors
+# ========================
+anthropic_governor = ApiGovernor(
+    "anthropic",
+    {
+        "requests": TokenBucket(ANTHROPIC_REQUESTS_PER_MINUTE, ANTHROPIC_REQUESTS_PER_MINUTE / 60.0),
+        "tokens": TokenBucket(ANTHROPIC_TOKENS_PER_MINUTE, ANTHROPIC_TOKENS_PER_MINUTE / 60.0),
+    },
+    interactive_reserve=RATE_LIMIT_INTERACTIVE_RESERVE,
+)
+
+gmail_governor = ApiGovernor(
+    "gmail",
+    {"quota_units": TokenBucket(GMAIL_QUOTA_UNITS_PER_SECOND, GMAIL_QUOTA_UNITS_PER_SECOND)},
+    interactive_reserve=RATE_LIMIT_INTERACTIVE_RESERVE,
+)
+
+
+def limiter_stats() -> Dict:
+    return {g.name: g.stats() for g in (anthropic_governor, gmail_governor)}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 chars/token) used to pre-charge the token bucket."""
+    return max(1, len(text or "") // 4)
+
+
+def _retry_after_from_headers(headers) -> Optional[float]:
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after") or headers.get("Retry-After")
+    except Exception:
+        return None
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_rate_limited(exc: Exception):
+    """Return (is_429, retry_after) for Anthropic and googleapiclient errors."""
+    status = getattr(exc, "status_code", None)
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+
+    resp = getattr(exc, "resp", None)  # googleapiclient.errors.HttpError
+    if resp is not None:
+        status = getattr(resp, "status", status)
+        headers = resp
+        if status == 403 and b"rateLimitExceeded" in (getattr(exc, "content", b"") or b""):
+            status = 429
+
+    if status == 429:
+        return True, _retry_after_from_headers(headers)
+    return False, None
+
+
+def governed_call(governor: ApiGovernor, fn: Callable, max_retries: Optional[int] = None, **costs):
+    """
+    Acquire budget on `governor`, call `fn()`, and retry on 429 honouring Retry-After.
+    Non-429 errors are re-raised unchanged. Gives up with UpstreamTimeoutError
+    once the current resilience.deadline() has passed.
+    """
+    retries = RATE_LIMIT_MAX_RETRIES if max_retries is None else max_retries
+    attempt = 0
+    while True:
+        check_deadline(governor.name)
+        governor.acquire(**costs)
+        try:
+            result = fn()
+            governor.succeeded()
+            return result
+        except Exception as exc:
+            limited, retry_after = _is_rate_limited(exc)
+            if not limited:
+                raise
+            backoff = governor.penalize(retry_after)
+            attempt += 1
+            logger.warning("⏳ %s rate limited (attempt %s), backing off %.1fs", governor.name, attempt, backoff)
+            if attempt > retries:
+                raise RateLimitedError(f"{governor.name} still rate limited after {retries} retries") from exc
+
+
+def gmail_execute(request, method: str):
+    """
+    Execute a googleapiclient request under the shared Gmail quota budget and
+    the Gmail circuit breaker (CircuitOpenError while Gmail is failing).
+    """
+    units = GMAIL_QUOTA_UNITS.get(method, 5)
+
+    def _execute():
+        with span(f"gmail.http {method}", **{
+            "gmail.method": method,
+            "gmail.quota_units": units,
+            "http.method": getattr(request, "method", None),
+        }):
+            return request.execute()
+
+    return get_breaker("gmail").call(lambda: governed_call(gmail_governor, _execute, quota_units=units))
+
+
+def _anthropic_estimate(kwargs) -> int:
+    prompt_text = (kwargs.get("system") or "") + "".join(
+        m.get("content", "") if isinstance(m.get("content"), str) else "" for m in kwargs.get("messages", [])
+    )
+    return estimate_tokens(prompt_text) + int(kwargs.get("max_tokens", 0))
+
+
+def _reconcile_usage(usage, estimate: int):
+    if usage is not None:
+        actual = (getattr(usage, "input_tokens", 0) or 0) + (getattr(usage, "output_tokens", 0) or 0)
+        anthropic_governor.adjust("tokens", actual - estimate)
+
+
+def anthropic_create(client, **kwargs):
+    """Call `client.messages.create` under the shared Anthropic budget, reconciling real token usage."""
+    estimate = _anthropic_estimate(kwargs)
+
+    def _create():
+        with span("anthropic.messages.create", **{
+            "llm.model": kwargs.get("model"),
+            "llm.max_tokens": kwargs.get("max_tokens"),
+            "llm.estimated_tokens": estimate,
+        }):
+            response = client.messages.create(**kwargs)
+            usage = getattr(response, "usage", None)
+            if usage is not None:
+                set_span_attributes(**{
+                    "llm.input_tokens": getattr(usage, "input_tokens", None),
+                    "llm.output_tokens": getattr(usage, "output_tokens", None),
+                })
+            return response
+
+    response = governed_call(anthropic_governor, _create, requests=1, tokens=estimate)
+    _reconcile_usage(getattr(response, "usage", None), estimate)
+    return response
+
+
+def anthropic_stream(client, **kwargs):
+    """
+    Generator over text deltas from `client.messages.stream`, under the shared
+    Anthropic budget. Budget and 429 retries apply to opening the stream; the
+    generator's return value is the final message (for usage).
+    """
+    estimate = _anthropic_estimate(kwargs)
+
+    def _open():
+        with span("anthropic.messages.stream", **{
+            "llm.model": kwargs.get("model"),
+            "llm.max_tokens": kwargs.get("max_tokens"),
+            "llm.estimated_tokens": estimate,
+        }):
+            manager = client.messages.stream(**kwargs)
+            return manager, manager.__enter__()
+
+    manager, stream = governed_call(anthropic_governor, _open, requests=1, tokens=estimate)
+    try:
+        for text in stream.text_stream:
+            yield text
+        final = stream.get_final_message()
+    finally:
+        manager.__exit__(None, None, None)
+    _reconcile_usage(getattr(final, "usage", None), estimate)
+    return final
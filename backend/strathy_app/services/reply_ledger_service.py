@@ -0,0 +1,153 @@
+# backend/strathy_app/services/reply_ledger_service.py
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from backend.strathy_app.models.models import SessionLocal, ReplyLedger
+from ..config import REPLY_CLAIM_LEASE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+CLAIMED = "claimed"
+GENERATED = "generated"
+SENT = "sent"
+
+
+def _new_token() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:12]}"
+
+
+def _claim_dict(row: ReplyLedger, token: str) -> Dict:
+    return {
+        "message_id": row.gmail_message_id,
+        "thread_id": row.thread_id,
+        "token": token,
+        "state": row.state,
+        "reply_text": row.reply_text,
+        "attempts": row.attempts,
+    }
+
+
+def claim_reply(message_id: str, thread_id: Optional[str] = None,
+                lease_seconds: int = REPLY_CLAIM_LEASE_SECONDS) -> Optional[Dict]:
+    """
+    Atomically claim the right to reply to an inbound Gmail message.
+
+    The unique index on gmail_message_id decides races between processes: the
+    first INSERT wins. An existing unfinished claim can be taken over only once
+    its lease has expired (the previous owner crashed or released it); the
+    conditional UPDATE makes that takeover atomic too.
+
+    Returns the claim (with any reply_text generated by a previous owner), or
+    None if the message was already replied to or is being handled elsewhere.
+    """
+    token = _new_token()
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        row = ReplyLedger(
+            gmail_message_id=message_id,
+            thread_id=thread_id,
+            state=CLAIMED,
+            owner=token,
+            attempts=1,
+            claimed_at=now,
+        )
+        db.add(row)
+        try:
+            db.commit()
+            return _claim_dict(row, token)
+        except IntegrityError:
+            db.rollback()
+
+        stale_before = now - timedelta(seconds=lease_seconds)
+        taken = (
+            db.query(ReplyLedger)
+            .filter(
+                ReplyLedger.gmail_message_id == message_id,
+                ReplyLedger.state != SENT,
+                or_(ReplyLedger.claimed_at.is_(None), ReplyLedger.claimed_at < stale_before),
+            )
+            .update(
+                {
+                    ReplyLedger.owner: token,
+                    ReplyLedger.claimed_at: now,
+                    ReplyLedger.attempts: ReplyLedger.attempts + 1,
+                },
+                synchronize_session=False,
+            )
+        )
+        db.commit()
+        if not taken:
+            return None
+
+        row = db.query(ReplyLedger).filter(ReplyLedger.gmail_message_id == message_id).first()
+        logger.info("🧾 Took over reply claim for %s (state=%s, attempt %s)", message_id, row.state, row.attempts)
+        return _claim_dict(row, token)
+    finally:
+        db.close()
+
+
+def reply_state(message_id: str) -> Optional[str]:
+    db = SessionLocal()
+    try:
+        row = db.query(ReplyLedger.state).filter(ReplyLedger.gmail_message_id == message_id).first()
+        return row[0] if row else None
+    finally:
+        db.close()
+
+
+def _transition(claim: Dict, values: Dict, from_states) -> bool:
+    """Apply an update only while we still own the claim; False means we lost it."""
+    db = SessionLocal()
+    try:
+        updated = (
+            db.query(ReplyLedger)
+            .filter(
+                ReplyLedger.gmail_message_id == claim["message_id"],
+                ReplyLedger.owner == claim["token"],
+                ReplyLedger.state.in_(from_states),
+            )
+            .update(values, synchronize_session=False)
+        )
+        db.commit()
+        return bool(updated)
+    finally:
+        db.close()
+
+
+def mark_generated(claim: Dict, reply_text: str) -> bool:
+    """Persist the generated reply before sending so a crash doesn't cost another model call."""
+    ok = _transition(claim, {ReplyLedger.state: GENERATED, ReplyLedger.reply_text: reply_text}, [CLAIMED])
+    if ok:
+        claim["state"] = GENERATED
+        claim["reply_text"] = reply_text
+    else:
+        logger.warning("Lost reply claim for %s before sending", claim["message_id"])
+    return ok
+
+
+def mark_sent(claim: Dict, sent_message_id: Optional[str]) -> bool:
+    ok = _transition(
+        claim,
+        {ReplyLedger.state: SENT, ReplyLedger.sent_message_id: sent_message_id},
+        [CLAIMED, GENERATED],
+    )
+    if ok:
+        claim["state"] = SENT
+    return ok
+
+
+def release_claim(claim: Dict) -> bool:
+    """Give the claim up (e.g. the send failed) so the next poll can retry immediately."""
+    return _transition(
+        claim,
+        {ReplyLedger.owner: None, ReplyLedger.claimed_at: None},
+        [CLAIMED, GENERATED],
+    )
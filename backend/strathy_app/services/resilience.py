@@ -0,0 +1,277 @@
+# backend/strathy_app/services/resilience.py
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional
+
+from ..config import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS, LLM_HEDGE_MAX_WORKERS
+from ..utils.metrics import CIRCUIT_REJECTIONS, CIRCUIT_STATE, CIRCUIT_TRANSITIONS, HEDGED_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+
+# ========================
+# Typed errors
+# ========================
+class UpstreamError(Exception):
+    """An external API (Gmail, a model provider) failed or was unreachable; worth retrying later."""
+
+    def __init__(self, message: str, upstream: Optional[str] = None):
+        super().__init__(message)
+        self.upstream = upstream
+
+
+class UpstreamTimeoutError(UpstreamError):
+    """The call, or the deadline it ran under, ran out of time."""
+
+
+class CircuitOpenError(UpstreamError):
+    """Not attempted: the upstream's circuit breaker is open."""
+
+    def __init__(self, message: str, upstream: Optional[str] = None, retry_after: float = 0.0):
+        super().__init__(message, upstream)
+        self.retry_after = retry_after
+
+
+_TIMEOUT_NAMES = {"APITimeoutError", "ReadTimeout", "ConnectTimeout", "Timeout"}
+_UNAVAILABLE_NAMES = {
+    "APIConnectionError", "InternalServerError", "ServiceUnavailableError", "OverloadedError",
+    "ServerNotFoundError", "RemoteDisconnected", "ConnectionError",
+}
+
+
+def is_timeout(exc: BaseException) -> bool:
+    return isinstance(exc, (TimeoutError, UpstreamTimeoutError)) or type(exc).__name__ in _TIMEOUT_NAMES
+
+
+def is_upstream_failure(exc: Optional[BaseException]) -> bool:
+    """
+    True for errors that say the upstream is unhealthy: timeouts, connection
+    failures and 5xx answers. 4xx answers (bad request, not found) and 429s
+    (handled by the rate limiter) are the caller's problem, not the upstream's.
+    """
+    if exc is None:
+        return False
+    if isinstance(exc, (UpstreamError, ConnectionError)) or is_timeout(exc):
+        return True
+    if type(exc).__name__ in _UNAVAILABLE_NAMES:
+        return True
+    status = getattr(exc, "status_code", None) or getattr(getattr(exc, "resp", None), "status", None)
+    try:
+        return int(status) >= 500
+    except (TypeError, ValueError):
+        return False
+
+
+# ========================
+# Deadlines
+# ========================
+_deadline = contextvars.ContextVar("upstream_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: float):
+    """Bound every upstream call in the block to finish within `seconds` overall (nested deadlines keep the earlier one)."""
+    until = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(until if current is None else min(current, until))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def time_left(default: Optional[float] = None) -> Optional[float]:
+    """Seconds left before the current deadline, capped at `default`; None when neither is set."""
+    until = _deadline.get()
+    if until is None:
+        return default
+    left = until - time.monotonic()
+    return left if default is None else min(left, default)
+
+
+def check_deadline(upstream: str):
+    left = time_left()
+    if left is not None and left <= 0:
+        raise UpstreamTimeoutError(f"Deadline exceeded before calling {upstream}", upstream)
+
+
+# ========================
+# Circuit breaker
+# ========================
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Fails fast once an upstream looks down.
+
+    `failure_threshold` consecutive upstream failures (see is_upstream_failure)
+    open the circuit: calls raise CircuitOpenError without being attempted.
+    After `reset_seconds` one trial call is let through (half-open); its
+    success closes the circuit, its failure opens it again.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.labels(upstream=name).set(_STATE_VALUES[CLOSED])
+
+    def _transition(self, state: str):
+        if state == self.state:
+            return
+        logger.warning("🔌 Circuit %s: %s -> %s", self.name, self.state, state)
+        self.state = state
+        CIRCUIT_STATE.labels(upstream=self.name).set(_STATE_VALUES[state])
+        CIRCUIT_TRANSITIONS.labels(upstream=self.name, state=state).inc()
+
+    def allow(self):
+        """Raise CircuitOpenError unless a call may go out now."""
+        with self._lock:
+            if self.state == OPEN:
+                retry_after = self._opened_at + self.reset_seconds - time.monotonic()
+                if retry_after <= 0:
+                    self._transition(HALF_OPEN)
+                    self._trial_running = False
+                else:
+                    CIRCUIT_REJECTIONS.labels(upstream=self.name).inc()
+                    raise CircuitOpenError(f"{self.name} circuit is open", self.name, retry_after)
+            if self.state == HALF_OPEN:
+                if self._trial_running:
+                    CIRCUIT_REJECTIONS.labels(upstream=self.name).inc()
+                    raise CircuitOpenError(f"{self.name} circuit is half-open (trial call running)", self.name, 1.0)
+                self._trial_running = True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._trial_running = False
+            self._transition(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+                self._transition(OPEN)
+
+    def record(self, exc: Optional[BaseException]):
+        """Record a finished call: None for success, else its exception."""
+        if is_upstream_failure(exc):
+            self.record_failure()
+        else:
+            # The upstream answered, even if it was a 4xx
+            self.record_success()
+
+    def call(self, fn: Callable):
+        """
+        Run fn() through the breaker. Timeouts are re-raised as
+        UpstreamTimeoutError; other errors (HttpError 5xx included) unchanged.
+        """
+        self.allow()
+        try:
+            result = fn()
+        except Exception as e:
+            self.record(e)
+            if is_timeout(e) and not isinstance(e, UpstreamTimeoutError):
+                raise UpstreamTimeoutError(f"{self.name} call timed out: {e}", self.name) from e
+            raise
+        self.record(None)
+        return result
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self._failures,
+                "retry_in_seconds": round(max(0.0, self._opened_at + self.reset_seconds - time.monotonic()), 2)
+                if self.state == OPEN else 0.0,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(name)
+    return breaker
+
+
+def breaker_stats() -> Dict:
+    return {name: b.stats() for name, b in sorted(_breakers.items())}
+
+
+# ========================
+# Hedged requests
+# ========================
+class LatencyTracker:
+    """Recent successful call latencies, for picking the hedge delay."""
+
+    def __init__(self, size: int = 200, min_samples: int = 20):
+        self._samples = deque(maxlen=size)
+        self.min_samples = min_samples
+
+    def observe(self, seconds: float):
+        self._samples.append(seconds)
+
+    def quantile(self, q: float) -> Optional[float]:
+        samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+_hedge_pool: Optional[ThreadPoolExecutor] = None
+_hedge_pool_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _hedge_pool
+    if _hedge_pool is None:
+        with _hedge_pool_lock:
+            if _hedge_pool is None:
+                _hedge_pool = ThreadPoolExecutor(max_workers=LLM_HEDGE_MAX_WORKERS, thread_name_prefix="hedge")
+    return _hedge_pool
+
+
+def hedged(fn: Callable, delay: float, upstream: str):
+    """
+    Run fn(); if it hasn't finished after `delay` seconds, start a second
+    identical call and return whichever succeeds first. Only for idempotent
+    calls: the slower one still runs to completion and its result is dropped.
+    Raises the primary's error if both fail.
+    """
+    primary = _pool().submit(contextvars.copy_context().run, fn)
+    done, _ = wait([primary], timeout=delay)
+    if done:
+        return primary.result()
+
+    backup = _pool().submit(contextvars.copy_context().run, fn)
+    pending = {primary, backup}
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                HEDGED_REQUESTS.labels(upstream=upstream, winner="hedge" if future is backup else "primary").inc()
+                return future.result()
+    HEDGED_REQUESTS.labels(upstream=upstream, winner="none").inc()
+    return primary.result()
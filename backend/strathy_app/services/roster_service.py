@@ -0,0 +1,197 @@
+# backend/strathy_app/services/roster_service.py
+import csv
+import logging
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from backend.strathy_app.models.models import SessionLocal, Student
+from ..config import ROSTER_IMPORT_BATCH_SIZE
+from .cache_service import get_response_cache, student_tag
+from .student_index import get_student_index
+
+logger = logging.getLogger(__name__)
+
+# Normalized header -> Student field; headers are compared lower-case with _ - . collapsed to spaces
+_HEADER_ALIASES = {
+    "admission number": "admission_number",
+    "admission no": "admission_number",
+    "adm no": "admission_number",
+    "student number": "admission_number",
+    "student no": "admission_number",
+    "reg no": "admission_number",
+    "full name": "full_name",
+    "name": "full_name",
+    "student name": "full_name",
+    "email": "email",
+    "email address": "email",
+    "student email": "email",
+    "course": "course",
+    "programme": "course",
+    "program": "course",
+    "year": "year",
+    "year of study": "year",
+    "semester": "semester",
+    "sem": "semester",
+    "group": "group",
+    "section": "group",
+}
+
+
+def _normalize_header(header) -> Optional[str]:
+    key = re.sub(r"[\s_\-.]+", " ", str(header or "")).strip().lower()
+    return _HEADER_ALIASES.get(key)
+
+
+def _clean(value) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # spreadsheet numbers: 148705.0 -> "148705"
+    value = str(value).strip()
+    return value or None
+
+
+def _normalize_year_semester(record: Dict):
+    """'4.0' -> '4'; a combined '4.2' / '4/2' / '4-2' year with no semester becomes year 4, semester 2."""
+    for field in ("year", "semester"):
+        value = record.get(field)
+        if value and re.fullmatch(r"\d+\.0+", value):
+            record[field] = value.split(".")[0]
+    combined = re.fullmatch(r"(\d)\s*[./-]\s*(\d)", record.get("year") or "")
+    if combined and not record.get("semester"):
+        record["year"], record["semester"] = combined.groups()
+
+
+def _rows_from_table(rows: Iterable) -> Iterator[Dict]:
+    rows = iter(rows)
+    header = next(rows, None)
+    if header is None:
+        return
+    columns = [_normalize_header(h) for h in header]
+    if "admission_number" not in columns and "email" not in columns:
+        raise ValueError("Roster needs an admission number or email column; got " + ", ".join(map(str, header)))
+
+    for values in rows:
+        record = {}
+        for field, value in zip(columns, values):
+            if field and field not in record:
+                record[field] = _clean(value)
+        if any(record.values()):
+            _normalize_year_semester(record)
+            yield record
+
+
+def iter_roster_rows(path: str, sheet: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Stream roster rows as dicts of Student fields (None for blanks) from a CSV
+    or XLSX file, one row at a time. Column headers are matched loosely
+    ("Admission No", "admission_number", "Programme", ...).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".xlsx", ".xlsm"):
+        try:
+            from openpyxl import load_workbook
+        except ImportError as e:
+            raise RuntimeError("Reading .xlsx rosters needs openpyxl (pip install openpyxl)") from e
+        # read_only streams rows from the zip instead of building the whole sheet in memory
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet else workbook.active
+            yield from _rows_from_table(worksheet.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+    else:
+        with open(path, newline="", encoding="utf-8-sig") as fh:
+            yield from _rows_from_table(csv.reader(fh))
+
+
+def _upsert_batch(db, batch: List[Dict], stats: Dict) -> List[str]:
+    """Insert/update one batch of roster rows; returns the emails whose students changed."""
+    admissions = {r["admission_number"] for r in batch if r.get("admission_number")}
+    emails = {r["email"] for r in batch if r.get("email")}
+    by_admission = {
+        s.admission_number: s
+        for s in db.query(Student).filter(Student.admission_number.in_(admissions))
+    } if admissions else {}
+    by_email = {}
+    if emails:
+        for s in db.query(Student).filter(Student.email.in_(emails)).order_by(Student.updated_at):
+            by_email[s.email] = s
+
+    changed_emails = []
+    for row in batch:
+        admission, email = row.get("admission_number"), row.get("email")
+        student = by_admission.get(admission) if admission else None
+        if student is None and email:
+            candidate = by_email.get(email)
+            # Don't move another admission number onto this row's student
+            if candidate is not None and (not admission or not candidate.admission_number):
+                student = candidate
+
+        if student is None:
+            student = Student(**{k: v for k, v in row.items() if v is not None})
+            db.add(student)
+            stats["inserted"] += 1
+        else:
+            updates = {k: v for k, v in row.items() if v is not None and getattr(student, k) != v}
+            for key, value in updates.items():
+                setattr(student, key, value)
+            stats["updated" if updates else "unchanged"] += 1
+            if not updates:
+                continue
+
+        if admission:
+            by_admission[admission] = student
+        if email:
+            by_email[email] = student
+            changed_emails.append(email)
+    return changed_emails
+
+
+def import_roster(path: str, batch_size: int = ROSTER_IMPORT_BATCH_SIZE, sheet: Optional[str] = None,
+                  dry_run: bool = False) -> Dict:
+    """
+    Upsert a student roster into `students`, matching existing rows by
+    admission number, then by email. Blank cells never overwrite stored
+    values. Commits every `batch_size` rows (rolls back instead with
+    dry_run) and returns row counts.
+    """
+    stats = {"rows": 0, "inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0}
+    cache = get_response_cache()
+    db = SessionLocal()
+    try:
+        batch: List[Dict] = []
+
+        def flush():
+            changed = _upsert_batch(db, batch, stats)
+            if dry_run:
+                db.rollback()
+            else:
+                db.commit()
+                if changed:
+                    cache.invalidate_tags([student_tag(e) for e in changed])
+            batch.clear()
+
+        for row in iter_roster_rows(path, sheet=sheet):
+            stats["rows"] += 1
+            if row.get("email"):
+                row["email"] = row["email"].lower()
+            if not row.get("admission_number") and not row.get("email"):
+                stats["skipped"] += 1
+                continue
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush()
+                logger.info("🎓 Roster import: %d rows so far", stats["rows"])
+        if batch:
+            flush()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+    if not dry_run:
+        get_student_index().invalidate()
+    return stats
@@ -0,0 +1,101 @@
+# backend/strathy_app/services/sender_policy.py
+import json
+import logging
+import os
+import threading
+import time
+from typing import FrozenSet, Optional
+
+from ..config import SENDER_POLICY_PATH, SENDER_POLICY_RELOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class SenderPolicy:
+    """
+    Who may receive an AI reply, loaded from a JSON file:
+
+        {"allowed_domains": [...], "allowed_external_senders": [...], "blocked_emails": [...]}
+
+    The file is re-read when its mtime changes (checked at most every
+    `reload_seconds`). A missing or invalid file keeps the last good policy;
+    with no good policy yet, nobody is allowed.
+    """
+
+    def __init__(self, path: str = SENDER_POLICY_PATH, reload_seconds: float = SENDER_POLICY_RELOAD_SECONDS):
+        self.path = path
+        self.reload_seconds = reload_seconds
+        self.allowed_domains: FrozenSet[str] = frozenset()
+        self.allowed_external_senders: FrozenSet[str] = frozenset()
+        self.blocked_emails: FrozenSet[str] = frozenset()
+        self._mtime: Optional[float] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._maybe_reload(force=True)
+
+    def _maybe_reload(self, force: bool = False):
+        now = time.monotonic()
+        if not force and now - self._checked_at < self.reload_seconds:
+            return
+        with self._lock:
+            self._checked_at = now
+            try:
+                mtime = os.path.getmtime(self.path)
+                if mtime == self._mtime:
+                    return
+                with open(self.path, encoding="utf-8") as fh:
+                    data = json.load(fh)
+            except (OSError, ValueError) as e:
+                logger.error("Could not load sender policy %s (keeping previous): %s", self.path, e)
+                return
+
+            normalise = lambda items: frozenset((x or "").strip().lower() for x in items or [] if x)
+            self.allowed_domains = frozenset(d.lstrip("@") for d in normalise(data.get("allowed_domains")))
+            self.allowed_external_senders = normalise(data.get("allowed_external_senders"))
+            self.blocked_emails = normalise(data.get("blocked_emails"))
+            self._mtime = mtime
+            logger.info(
+                "📋 Sender policy loaded: %d domains, %d external senders, %d blocked",
+                len(self.allowed_domains), len(self.allowed_external_senders), len(self.blocked_emails),
+            )
+
+    def is_blocked(self, email: str) -> bool:
+        self._maybe_reload()
+        return (email or "").lower().strip() in self.blocked_emails
+
+    def is_allowed(self, email: str) -> bool:
+        self._maybe_reload()
+        email = (email or "").lower().strip()
+        if email in self.blocked_emails:
+            return False
+        if any(email.endswith("@" + domain) for domain in self.allowed_domains):
+            return True
+        return email in self.allowed_external_senders
+
+    def gmail_query(self, base: str = "is:unread") -> str:
+        """
+        The same rules as a Gmail search, so disallowed mail is never listed:
+        `is:unread -from:blocked... (from:strathmore.edu OR from:whitelisted...)`.
+        is_allowed() stays the final check on whatever the query lets through.
+        """
+        self._maybe_reload()
+        parts = [base] if base else []
+        parts += [f"-from:{email}" for email in sorted(self.blocked_emails)]
+        allowed = [f"from:{d}" for d in sorted(self.allowed_domains)]
+        allowed += [f"from:{email}" for email in sorted(self.allowed_external_senders)]
+        if allowed:
+            parts.append("(" + " OR ".join(allowed) + ")")
+        return " ".join(parts)
+
+
+_policy: Optional[SenderPolicy] = None
+_policy_lock = threading.Lock()
+
+
+def get_sender_policy() -> SenderPolicy:
+    global _policy
+    if _policy is None:
+        with _policy_lock:
+            if _policy is None:
+                _policy = SenderPolicy()
+    return _policy
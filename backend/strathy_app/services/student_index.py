@@ -0,0 +1,164 @@
+# backend/strathy_app/services/student_index.py
+import logging
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from sqlalchemy import func
+
+from backend.strathy_app.models.models import SessionLocal, Student
+from ..config import STUDENT_INDEX_REFRESH_SECONDS
+from ..utils.metrics import STUDENT_LOOKUPS
+
+logger = logging.getLogger(__name__)
+
+# The fields extraction reports as missing_fields; a student with all of them needs no extraction
+IDENTITY_FIELDS = ("full_name", "admission_number", "course", "year", "semester", "group")
+
+
+class StudentRecord(NamedTuple):
+    """Detached snapshot of a students row."""
+    id: int
+    full_name: Optional[str]
+    admission_number: Optional[str]
+    course: Optional[str]
+    year: Optional[str]
+    semester: Optional[str]
+    group: Optional[str]
+    email: Optional[str]
+
+    @property
+    def is_complete(self) -> bool:
+        return all((getattr(self, f) or "").strip() for f in IDENTITY_FIELDS)
+
+    def as_extraction(self) -> Dict:
+        """The record in extract_student_details' shape, as if the model had found everything."""
+        details = {f: getattr(self, f) or "" for f in IDENTITY_FIELDS}
+        details.update(
+            email=self.email,
+            year_semester=f"{self.year}.{self.semester}" if self.year and self.semester else "",
+            details_status="complete" if self.is_complete else "partial",
+            missing_fields=[f for f in IDENTITY_FIELDS if not (getattr(self, f) or "").strip()],
+            follow_up_message="",
+        )
+        return details
+
+
+def _norm_email(email: Optional[str]) -> str:
+    return (email or "").strip().lower()
+
+
+def _norm_admission(admission_number: Optional[str]) -> str:
+    return (admission_number or "").strip().upper()
+
+
+class StudentIndex:
+    """
+    In-process lookup of students by email and admission number, so known
+    senders can skip model extraction.
+
+    The whole table is loaded into two dicts. It is reloaded when the table
+    changes (row count or latest updated_at, checked at most every
+    `refresh_seconds`) or right after invalidate() (roster import); single
+    student upserts in this process are applied with remember().
+    """
+
+    def __init__(self, refresh_seconds: float = STUDENT_INDEX_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._by_email: Dict[str, StudentRecord] = {}
+        self._by_admission: Dict[str, StudentRecord] = {}
+        self._version: Optional[Tuple] = None
+        self._checked_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        self._stale = True
+
+    def remember(self, student: Student):
+        """Add/refresh one row just written by this process, without reloading the table."""
+        record = StudentRecord(
+            student.id, student.full_name, student.admission_number, student.course,
+            student.year, student.semester, student.group, student.email,
+        )
+        with self._lock:
+            if record.email:
+                self._by_email[_norm_email(record.email)] = record
+            if record.admission_number:
+                self._by_admission[_norm_admission(record.admission_number)] = record
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if not self._stale and now - self._checked_at < self.refresh_seconds:
+            return
+        with self._lock:
+            if not self._stale and now - self._checked_at < self.refresh_seconds:
+                return
+            self._checked_at = now
+            db = SessionLocal()
+            try:
+                version = tuple(db.query(func.count(Student.id), func.max(Student.updated_at)).one())
+                if version == self._version and not self._stale:
+                    return
+                self._stale = False
+                by_email, by_admission = {}, {}
+                rows = (
+                    db.query(
+                        Student.id, Student.full_name, Student.admission_number, Student.course,
+                        Student.year, Student.semester, Student.group, Student.email,
+                    )
+                    .order_by(Student.updated_at)
+                    .yield_per(5000)
+                )
+                for row in rows:
+                    record = StudentRecord(*row)
+                    # Ordered by updated_at: the most recently updated row wins a shared email
+                    if record.email:
+                        by_email[_norm_email(record.email)] = record
+                    if record.admission_number:
+                        by_admission[_norm_admission(record.admission_number)] = record
+            except Exception as e:
+                logger.error("Could not load the student index (keeping previous): %s", e)
+                return
+            finally:
+                db.close()
+
+            self._by_email, self._by_admission, self._version = by_email, by_admission, version
+            logger.info("🎓 Student index loaded: %d emails, %d admission numbers", len(by_email), len(by_admission))
+
+    def by_email(self, email: Optional[str]) -> Optional[StudentRecord]:
+        self._maybe_reload()
+        return self._by_email.get(_norm_email(email))
+
+    def by_admission_number(self, admission_number: Optional[str]) -> Optional[StudentRecord]:
+        self._maybe_reload()
+        return self._by_admission.get(_norm_admission(admission_number))
+
+    def complete_student(self, email: Optional[str]) -> Optional[StudentRecord]:
+        """The sender's student record if every identity field is known, else None (records the lookup)."""
+        record = self.by_email(email)
+        if record is None:
+            STUDENT_LOOKUPS.labels(result="unknown").inc()
+            return None
+        if not record.is_complete:
+            STUDENT_LOOKUPS.labels(result="incomplete").inc()
+            return None
+        STUDENT_LOOKUPS.labels(result="complete").inc()
+        return record
+
+    def __len__(self) -> int:
+        self._maybe_reload()
+        return len(self._by_email)
+
+
+_index: Optional[StudentIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_student_index() -> StudentIndex:
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = StudentIndex()
+    return _index
@@ -2,6 +2,7 @@
 
 from sqlalchemy.orm import Session
 from backend.strathy_app.models.models import Student, Conversation
+from .student_index import get_student_index
 import json
 
 def get_student_by_email(db: Session, email: str):
@@ -119,4 +120,5 @@ def create_or_update_student(db: Session, data: dict, thread_id: str = None):
     # ✅ Commit once at end
     db.commit()
     db.refresh(student)
+    get_student_index().remember(student)
     return student
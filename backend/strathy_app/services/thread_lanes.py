@@ -0,0 +1,253 @@
+# backend/strathy_app/services/thread_lanes.py
+import contextvars
+import logging
+import math
+import os
+import socket
+import threading
+import time
+import uuid
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
+
+from backend.strathy_app.models.models import SessionLocal, WorkerHeartbeat, WorkerLane
+from ..config import WORKER_LANE_LEASE_SECONDS, WORKER_LANE_THREADS, WORKER_LANES
+from ..utils.metrics import LANE_BACKLOG, LANE_LAG, LANE_WAIT, WORKER_LANES_OWNED
+
+logger = logging.getLogger(__name__)
+
+
+def lane_for(thread_id: str, lanes: int = WORKER_LANES) -> int:
+    """The lane a Gmail thread belongs to. crc32 rather than hash(): every process must agree."""
+    return zlib.crc32((thread_id or "").encode("utf-8")) % max(1, lanes)
+
+
+class LaneLeases:
+    """
+    This process's share of the thread lanes, leased through the database.
+
+    Every renew() records a heartbeat, works out the fair share
+    (ceil(lanes / live workers)), extends the leases it holds, hands back any
+    above the share and claims free or expired lanes up to it. Claims are
+    conditional UPDATEs, as in the reply ledger, so two workers never hold the
+    same lane; a worker that stops renewing (crashed) loses its lanes after
+    `lease_seconds`. Lanes handed back are only released between ticks, never
+    while their messages are being processed.
+    """
+
+    def __init__(self, lanes: int = WORKER_LANES, lease_seconds: int = WORKER_LANE_LEASE_SECONDS,
+                 token: Optional[str] = None):
+        self.lanes = max(1, lanes)
+        self.lease_seconds = lease_seconds
+        self.token = token or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.owned: Set[int] = set()
+        self._valid_until = 0.0  # monotonic; our leases can't have expired before this
+        self._rows_ready = False
+        self._lock = threading.Lock()
+
+    def _ensure_rows(self, db):
+        if self._rows_ready:
+            return
+        existing = {lane for (lane,) in db.query(WorkerLane.lane)}
+        missing = [lane for lane in range(self.lanes) if lane not in existing]
+        if missing:
+            db.add_all(WorkerLane(lane=lane) for lane in missing)
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()  # another worker created them first
+        self._rows_ready = True
+
+    def _heartbeat(self, db, now: datetime):
+        seen = (
+            db.query(WorkerHeartbeat)
+            .filter(WorkerHeartbeat.owner == self.token)
+            .update({WorkerHeartbeat.seen_at: now}, synchronize_session=False)
+        )
+        if not seen:
+            db.add(WorkerHeartbeat(owner=self.token, seen_at=now))
+        # Workers gone for ten lease periods are forgotten entirely
+        db.query(WorkerHeartbeat).filter(
+            WorkerHeartbeat.seen_at < now - timedelta(seconds=self.lease_seconds * 10)
+        ).delete(synchronize_session=False)
+        db.commit()
+
+    def renew(self) -> Set[int]:
+        """Rebalance and renew; returns the lanes this process may process until the next renew()."""
+        started = time.monotonic()
+        now = datetime.utcnow()
+        until = now + timedelta(seconds=self.lease_seconds)
+        free_or_expired = or_(WorkerLane.owner.is_(None), WorkerLane.lease_until.is_(None), WorkerLane.lease_until < now)
+        db = SessionLocal()
+        try:
+            self._ensure_rows(db)
+            self._heartbeat(db, now)
+            live = (
+                db.query(func.count(WorkerHeartbeat.owner))
+                .filter(WorkerHeartbeat.seen_at > now - timedelta(seconds=self.lease_seconds))
+                .scalar()
+            ) or 1
+            share = math.ceil(self.lanes / live)
+
+            db.query(WorkerLane).filter(WorkerLane.owner == self.token).update(
+                {WorkerLane.lease_until: until}, synchronize_session=False
+            )
+            held = sorted(
+                lane for (lane,) in db.query(WorkerLane.lane).filter(
+                    WorkerLane.owner == self.token, WorkerLane.lane < self.lanes
+                )
+            )
+
+            # More than our share: hand the highest lanes back for newer workers to pick up
+            surplus = held[share:]
+            if surplus:
+                db.query(WorkerLane).filter(WorkerLane.lane.in_(surplus), WorkerLane.owner == self.token).update(
+                    {WorkerLane.owner: None, WorkerLane.lease_until: None}, synchronize_session=False
+                )
+                held = held[:share]
+                logger.info("🛣️ Handed back lanes %s (%d live workers)", surplus, live)
+
+            if len(held) < share:
+                candidates = [
+                    lane for (lane,) in db.query(WorkerLane.lane)
+                    .filter(WorkerLane.lane < self.lanes, free_or_expired)
+                    .order_by(WorkerLane.lane)
+                ]
+                for lane in candidates:
+                    if len(held) >= share:
+                        break
+                    taken = (
+                        db.query(WorkerLane)
+                        .filter(WorkerLane.lane == lane, free_or_expired)
+                        .update({WorkerLane.owner: self.token, WorkerLane.lease_until: until},
+                                synchronize_session=False)
+                    )
+                    if taken:
+                        held.append(lane)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error("Could not renew worker lanes; processing nothing this tick: %s", e)
+            held = []
+        finally:
+            db.close()
+
+        with self._lock:
+            if set(held) != self.owned:
+                logger.info("🛣️ Worker %s now holds lanes %s", self.token, sorted(held))
+            self.owned = set(held)
+            self._valid_until = started + self.lease_seconds
+        WORKER_LANES_OWNED.set(len(held))
+        return set(held)
+
+    def holds(self, lane: int) -> bool:
+        """True while the lease on `lane` is certainly still ours (it may since have been renewed)."""
+        with self._lock:
+            return lane in self.owned and time.monotonic() < self._valid_until
+
+    def release(self):
+        """Give every lane back and drop the heartbeat (clean shutdown), so others take over at once."""
+        db = SessionLocal()
+        try:
+            db.query(WorkerLane).filter(WorkerLane.owner == self.token).update(
+                {WorkerLane.owner: None, WorkerLane.lease_until: None}, synchronize_session=False
+            )
+            db.query(WorkerHeartbeat).filter(WorkerHeartbeat.owner == self.token).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.warning("Could not release worker lanes: %s", e)
+        finally:
+            db.close()
+        with self._lock:
+            self.owned = set()
+        WORKER_LANES_OWNED.set(0)
+
+
+class LaneScheduler:
+    """
+    Runs messages grouped by thread lane: different lanes in parallel on up to
+    `threads` threads, one lane's messages strictly in order on one thread at
+    a time. Two messages of the same Gmail thread therefore never race on
+    their Conversation row.
+    """
+
+    def __init__(self, lanes: int = WORKER_LANES, threads: int = WORKER_LANE_THREADS):
+        self.lanes = max(1, lanes)
+        self.threads = max(1, threads)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    def _pool(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="lane")
+        return self._executor
+
+    def run(self, items: Iterable, thread_id_of: Callable, fn: Callable,
+            holds: Optional[Callable[[int], bool]] = None,
+            done: Optional[Callable[[Any], bool]] = None) -> List:
+        """
+        fn(item) for every item, in order within each lane. Once an item
+        raises, or its result fails `done`, the later items of the same
+        thread are left (None) for the next run: a reply must never overtake
+        the earlier message it follows. With `holds`, a lane whose lease was
+        lost mid-run stops and leaves the rest of its items for the new
+        owner. Returns the results (None for items that raised or were
+        left), in lane order.
+        """
+        listed_at = time.monotonic()
+        queues: Dict[int, List] = {}
+        for item in items:
+            thread_id = thread_id_of(item)
+            queues.setdefault(lane_for(thread_id, self.lanes), []).append((thread_id, item))
+        for lane, queue in queues.items():
+            LANE_BACKLOG.labels(lane=str(lane)).set(len(queue))
+
+        def drain(lane: int, queue: List) -> List:
+            label = str(lane)
+            results = []
+            stalled: Set[str] = set()  # threads with an earlier message not handled this run
+            for i, (thread_id, item) in enumerate(queue):
+                if holds is not None and not holds(lane):
+                    logger.warning("Lane %s lease lost; leaving %d message(s) to its new owner", lane, len(queue) - i)
+                    results.extend([None] * (len(queue) - i))
+                    break
+                if thread_id in stalled:
+                    logger.info("Lane %s: thread %s has an unhandled earlier message; leaving this one for later",
+                                lane, thread_id)
+                    results.append(None)
+                    LANE_BACKLOG.labels(lane=label).set(len(queue) - i - 1)
+                    continue
+                waited = time.monotonic() - listed_at
+                LANE_WAIT.labels(lane=label).observe(waited)
+                LANE_LAG.labels(lane=label).set(waited)
+                try:
+                    result = fn(item)
+                except Exception as e:
+                    logger.error("Lane %s: processing failed: %s", lane, e)
+                    result = None
+                    stalled.add(thread_id)
+                else:
+                    if done is not None and not done(result):
+                        stalled.add(thread_id)
+                results.append(result)
+                LANE_BACKLOG.labels(lane=label).set(len(queue) - i - 1)
+            LANE_BACKLOG.labels(lane=label).set(0)
+            LANE_LAG.labels(lane=label).set(0)
+            return results
+
+        if self.threads == 1 or len(queues) <= 1:
+            return [r for lane, queue in queues.items() for r in drain(lane, queue)]
+        # Each lane runs in a copy of this context: same rate-limit lane, deadline and trace
+        futures = [
+            self._pool().submit(contextvars.copy_context().run, drain, lane, queue)
+            for lane, queue in queues.items()
+        ]
+        return [r for future in futures for r in future.result()]
@@ -0,0 +1,135 @@
+# backend/strathy_app/utils/compaction.py
+import logging
+import math
+import re
+from typing import List, Tuple
+
+from ..config import COMPACTION_MAX_LIST_ITEMS
+from .metrics import LLM_COMPACTION_TOKENS_SAVED
+
+logger = logging.getLogger(__name__)
+
+_PIECE_RE = re.compile(r"\w+|[^\w\s]")
+_LIST_ITEM_RE = re.compile(r"^\s*(?:[-*•·▪‣◦]|\d{1,3}[.)]|[a-zA-Z][.)])\s+\S")
+# Paragraphs shorter than this ("Thanks", "Yes") may legitimately repeat
+_MIN_DEDUPE_CHARS = 20
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local, slightly pessimistic token count: one per punctuation mark, one per
+    four characters of each word. Close enough to the model's own count to
+    budget with, and needs no tokenizer download or API call.
+    """
+    if not text:
+        return 0
+    return sum(math.ceil(len(piece) / 4) for piece in _PIECE_RE.findall(text))
+
+
+def _dedupe_paragraphs(text: str) -> str:
+    """Drop paragraphs (blank-line separated) already seen earlier in the text."""
+    seen = set()
+    kept = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        key = " ".join(paragraph.split()).lower()
+        if len(key) >= _MIN_DEDUPE_CHARS:
+            if key in seen:
+                continue
+            seen.add(key)
+        kept.append(paragraph)
+    return "\n\n".join(kept)
+
+
+def _is_list_line(line: str) -> bool:
+    return bool(_LIST_ITEM_RE.match(line)) or line.count("|") >= 2 or "\t" in line.strip()
+
+
+def _collapse_lists(text: str, max_items: int) -> str:
+    """Shorten runs of bullet/numbered/table lines longer than max_items to their first and last lines."""
+    lines = text.split("\n")
+    out: List[str] = []
+    i = 0
+    while i < len(lines):
+        if not _is_list_line(lines[i]):
+            out.append(lines[i])
+            i += 1
+            continue
+        j = i
+        while j < len(lines) and _is_list_line(lines[j]):
+            j += 1
+        run = lines[i:j]
+        if len(run) > max_items:
+            head = max(1, max_items * 2 // 3)
+            tail = max(1, max_items - head)
+            out.extend(run[:head])
+            out.append(f"[... {len(run) - head - tail} more items ...]")
+            out.extend(run[-tail:])
+        else:
+            out.extend(run)
+        i = j
+    return "\n".join(out)
+
+
+def _head_and_tail(text: str, tokens: int, budget: int) -> str:
+    """Keep roughly the first two thirds and last third of the budget, cut at line breaks where possible."""
+    keep = max(budget - 20, 1)  # room for the marker
+    chars_per_token = len(text) / tokens
+    head_chars = int(keep * 2 / 3 * chars_per_token)
+    tail_chars = int((keep - keep * 2 / 3) * chars_per_token)
+
+    head_end = text.rfind("\n", int(head_chars * 0.8), head_chars)
+    head_end = head_end if head_end > 0 else head_chars
+    tail_start = text.find("\n", len(text) - tail_chars, len(text) - int(tail_chars * 0.8))
+    tail_start = tail_start + 1 if tail_start > 0 else len(text) - tail_chars
+    if tail_start <= head_end:
+        return text
+
+    omitted = estimate_tokens(text[head_end:tail_start])
+    return f"{text[:head_end].rstrip()}\n\n[... about {omitted} tokens omitted ...]\n\n{text[tail_start:].lstrip()}"
+
+
+def compact_text(text: str, budget: int, max_list_items: int = COMPACTION_MAX_LIST_ITEMS) -> Tuple[str, dict]:
+    """
+    Shrink text towards `budget` estimated tokens. Repeated paragraphs are
+    always dropped; only if that isn't enough are long lists shortened, then
+    the middle cut out. Returns the text and the tokens saved per step.
+    A budget of 0 or less only dedupes.
+    """
+    saved = {}
+    if not text:
+        return text, saved
+
+    tokens = estimate_tokens(text)
+    steps = [("dedupe", _dedupe_paragraphs)]
+    if budget > 0:
+        steps.append(("lists", lambda t: _collapse_lists(t, max_list_items)))
+    for step, fn in steps:
+        if step != "dedupe" and tokens <= budget:
+            break
+        compacted = fn(text)
+        after = estimate_tokens(compacted)
+        if after < tokens:
+            saved[step] = tokens - after
+            text, tokens = compacted, after
+
+    if budget > 0 and tokens > budget:
+        compacted = _head_and_tail(text, tokens, budget)
+        after = estimate_tokens(compacted)
+        if after < tokens:
+            saved["truncate"] = tokens - after
+            text = compacted
+    return text, saved
+
+
+def compact_for_model(text: str, budget: int, operation: str) -> str:
+    """compact_text() for one model call's input, logging and counting the tokens saved."""
+    compacted, saved = compact_text(text or "", budget)
+    if saved:
+        total = sum(saved.values())
+        for step, tokens in saved.items():
+            LLM_COMPACTION_TOKENS_SAVED.labels(operation=operation, step=step).inc(tokens)
+        logger.info(
+            "✂️ Compacted %s input: saved ~%d tokens (%s), ~%d left",
+            operation, total, ", ".join(f"{k}={v}" for k, v in saved.items()), estimate_tokens(compacted),
+        )
+    return compacted
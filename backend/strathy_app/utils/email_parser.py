@@ -1,8 +1,16 @@
 import base64
+import itertools
+import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from html.parser import HTMLParser
 from datetime import datetime, timezone
 from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from ..config import PARSE_CHUNK_SIZE, PARSE_POOL_MIN_MESSAGES, PARSE_WORKERS
+from .metrics import timed
 
 
 def _b64url_decode(data: str) -> bytes:
@@ -171,6 +179,7 @@ def clean_reply_text(body: str) -> str:
     return text
 
 
+@timed("parse.parse_message")
 def parse_message(message):
     """
     Given Gmail message JSON, return dict with:
@@ -229,3 +238,70 @@ def parse_message(message):
         "date": formatted_date,
         "relative_time": relative or "unknown time",
     }
+
+
+# ========================
+# Bulk parsing
+# ========================
+def _parse_chunk(messages: List, parse: Callable = None) -> List[Dict]:
+    parse = parse or parse_message
+    return [parse(m) for m in messages]
+
+
+def _chunks(messages: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    it = iter(messages)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_parse_messages(messages: Iterable, workers: Optional[int] = None,
+                        chunk_size: int = PARSE_CHUNK_SIZE,
+                        min_messages: int = PARSE_POOL_MIN_MESSAGES,
+                        parse: Optional[Callable] = None) -> Iterator[Dict]:
+    """
+    parse_message() over a (possibly endless) stream, in input order.
+
+    parse_message is pure-Python CPU work, so threads don't help; this spreads
+    chunks of `chunk_size` messages over a process pool of `workers`
+    (default PARSE_WORKERS, 0 = one per CPU), keeping only a couple of chunks
+    per process in flight so memory stays flat. Streams that end before
+    `min_messages`, and workers=1, are parsed inline. `parse` replaces
+    parse_message (e.g. to parse raw archive messages); it must be a
+    module-level function so it can be sent to the worker processes.
+    """
+    workers = workers if workers is not None else PARSE_WORKERS
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(messages, max(1, chunk_size))
+
+    # Buffer up to min_messages first: a short batch never pays for starting processes
+    head: List[List[Dict]] = []
+    buffered = 0
+    if workers > 1:
+        for chunk in chunks:
+            head.append(chunk)
+            buffered += len(chunk)
+            if buffered >= min_messages:
+                break
+    if workers <= 1 or buffered < min_messages:
+        for chunk in itertools.chain(head, chunks):
+            yield from _parse_chunk(chunk, parse)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = deque()
+        for chunk in itertools.chain(head, chunks):
+            in_flight.append(pool.submit(_parse_chunk, chunk, parse))
+            if len(in_flight) >= workers * 2:
+                yield from in_flight.popleft().result()
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+def parse_messages(messages: Iterable[Dict], workers: Optional[int] = None,
+                   chunk_size: int = PARSE_CHUNK_SIZE,
+                   min_messages: int = PARSE_POOL_MIN_MESSAGES) -> List[Dict]:
+    """parse_message() for many messages (backfills, imports), results in input order; see iter_parse_messages."""
+    return list(iter_parse_messages(messages, workers, chunk_size, min_messages))
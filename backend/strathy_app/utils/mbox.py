@@ -0,0 +1,164 @@
+# backend/strathy_app/utils/mbox.py
+import base64
+import email
+import hashlib
+import re
+from email.header import decode_header, make_header
+from email.utils import getaddresses, parsedate_to_datetime
+from typing import BinaryIO, Dict, Iterator, List, Tuple
+
+from .email_parser import get_header, parse_message
+
+_MBOXRD_ESCAPE_RE = re.compile(rb"^>+From ")
+_MESSAGE_ID_RE = re.compile(r"<([^>]+)>")
+
+# Takeout's X-Gmail-Labels names -> Gmail API system label ids
+_SYSTEM_LABELS = {
+    "inbox": "INBOX", "sent": "SENT", "unread": "UNREAD", "important": "IMPORTANT", "starred": "STARRED",
+    "spam": "SPAM", "trash": "TRASH", "draft": "DRAFT", "drafts": "DRAFT", "chat": "CHAT",
+}
+
+
+def iter_mbox(fh: BinaryIO, start: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """
+    Stream (offset, raw RFC 822 bytes) from an mbox file, one message at a time.
+
+    Messages start at "From " lines; ">From " lines in bodies are unescaped
+    (mboxrd). `offset` is where the message's From_ line starts, so calling
+    again with start=<offset of the first unprocessed message> resumes there.
+    Streams that can't seek (zip/tar members) are read forward to `start`.
+    """
+    pos = 0
+    if start:
+        try:
+            fh.seek(start)
+            pos = start
+        except (OSError, AttributeError, ValueError):
+            while pos < start:
+                chunk = fh.read(min(1 << 20, start - pos))
+                if not chunk:
+                    return
+                pos += len(chunk)
+
+    offset = None
+    lines: List[bytes] = []
+    for line in fh:
+        size = len(line)
+        if line.startswith(b"From "):
+            if offset is not None:
+                yield offset, b"".join(lines)
+            offset, lines = pos, []
+        elif offset is not None:
+            lines.append(line[1:] if _MBOXRD_ESCAPE_RE.match(line) else line)
+        pos += size
+    if offset is not None:
+        yield offset, b"".join(lines)
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode("ascii")
+
+
+def _header_value(value) -> str:
+    """A header as text, with =?charset?...?= encoded words decoded (as the Gmail API returns them)."""
+    value = str(value)
+    if "=?" not in value:
+        return value
+    try:
+        return str(make_header(decode_header(value)))
+    except (LookupError, ValueError, UnicodeDecodeError):
+        return value
+
+
+def _gmail_part(part) -> Dict:
+    """One MIME part in the Gmail API's payload shape (text re-encoded as UTF-8, attachments without data)."""
+    shaped = {
+        "mimeType": part.get_content_type(),
+        "filename": part.get_filename() or "",
+        "headers": [{"name": k, "value": _header_value(v)} for k, v in part.items()],
+    }
+    if part.is_multipart():
+        shaped["body"] = {"size": 0}
+        shaped["parts"] = [_gmail_part(p) for p in part.get_payload()]
+        return shaped
+
+    data = part.get_payload(decode=True) or b""
+    if shaped["filename"] or part.get_content_maintype() != "text":
+        shaped["body"] = {"size": len(data)}
+        return shaped
+    charset = part.get_content_charset() or "utf-8"
+    try:
+        text = data.decode(charset, errors="replace")
+    except LookupError:
+        text = data.decode("utf-8", errors="replace")
+    data = text.encode("utf-8")
+    shaped["body"] = {"size": len(data), "data": _b64(data)}
+    return shaped
+
+
+def _message_id(msg, raw: bytes) -> str:
+    match = _MESSAGE_ID_RE.search(str(msg.get("Message-ID") or ""))
+    return match.group(1).strip() if match else "sha1-" + hashlib.sha1(raw).hexdigest()
+
+
+def _thread_id(msg, message_id: str) -> str:
+    """Gmail's own thread id (X-GM-THRID, hex as in the API) when present, else the root of References."""
+    gm_thread = str(msg.get("X-GM-THRID") or "").strip()
+    if gm_thread.isdigit():
+        return format(int(gm_thread), "x")
+    references = _MESSAGE_ID_RE.findall(str(msg.get("References") or "")) or \
+        _MESSAGE_ID_RE.findall(str(msg.get("In-Reply-To") or ""))
+    root = references[0] if references else message_id
+    return "mbox-" + hashlib.sha1(root.encode("utf-8")).hexdigest()[:16]
+
+
+def rfc822_to_gmail(raw: bytes) -> Dict:
+    """
+    A raw archived message in the shape of a Gmail API messages.get (format
+    "full") response, so email_parser.parse_message handles it unchanged.
+    Google Takeout's X-GM-THRID and X-Gmail-Labels headers become threadId
+    and labelIds; the Date header becomes internalDate.
+    """
+    # compat32 parsing: the default policy's structured headers cost ~10x more and we only need text
+    msg = email.message_from_bytes(raw)
+    message_id = _message_id(msg, raw)
+    labels = [
+        _SYSTEM_LABELS.get(name.strip().lower(), name.strip())
+        for name in str(msg.get("X-Gmail-Labels") or "").split(",") if name.strip()
+    ]
+    internal_date = None
+    try:
+        internal_date = str(int(parsedate_to_datetime(str(msg.get("Date"))).timestamp() * 1000))
+    except (TypeError, ValueError, IndexError):
+        pass
+    return {
+        "id": message_id,
+        "threadId": _thread_id(msg, message_id),
+        "labelIds": labels,
+        "internalDate": internal_date,
+        "payload": _gmail_part(msg),
+    }
+
+
+def parse_archive_message(entry: Tuple[int, bytes]) -> Dict:
+    """
+    parse_message() for one (offset, raw) mbox entry, plus the offset, labels,
+    recipients and internalDate the importer needs. Never raises: a message
+    that can't be read comes back with an "error" key (this runs in worker
+    processes, where an exception would end the whole stream).
+    """
+    offset, raw = entry
+    try:
+        gmail = rfc822_to_gmail(raw)
+        parsed = parse_message(gmail)
+    except Exception as e:
+        return {"offset": offset, "error": f"{type(e).__name__}: {e}"}
+    to_header = get_header(gmail["payload"]["headers"], "To") or ""
+    parsed.update(
+        offset=offset,
+        labels=gmail["labelIds"],
+        to=[addr.lower() for _name, addr in getaddresses([to_header]) if addr],
+        internal_date=gmail["internalDate"],
+        size=len(raw),
+    )
+    return parsed
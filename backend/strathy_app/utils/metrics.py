@@ -0,0 +1,223 @@
+# backend/strathy_app/utils/metrics.py
+import contextvars
+import functools
+import time
+from contextlib import ContextDecorator
+from typing import Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from sqlalchemy import event
+
+from .tracing import span
+
+# ========================
+# Metric definitions
+# ========================
+STAGE_SECONDS = Histogram(
+    "strathy_stage_duration_seconds",
+    "Latency of a pipeline stage (Gmail call, model call, parse, job).",
+    ["stage"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+STAGE_ERRORS = Counter(
+    "strathy_stage_errors_total",
+    "Exceptions raised inside a timed stage.",
+    ["stage"],
+)
+
+LLM_TOKENS = Counter(
+    "strathy_llm_tokens_total",
+    "Tokens reported by the model API.",
+    ["operation", "model", "kind"],
+)
+
+LLM_COMPACTION_TOKENS_SAVED = Counter(
+    "strathy_llm_compaction_tokens_saved_total",
+    "Estimated input tokens removed before model calls, by compaction step (dedupe, lists, truncate).",
+    ["operation", "step"],
+)
+
+LLM_FALLBACKS = Counter(
+    "strathy_llm_fallbacks_total",
+    "Model calls abandoned for the next model in the task's route.",
+    ["task", "model", "reason"],
+)
+
+CIRCUIT_STATE = Gauge(
+    "strathy_circuit_state",
+    "Circuit breaker state per upstream: 0 closed, 1 half-open, 2 open.",
+    ["upstream"],
+)
+
+CIRCUIT_TRANSITIONS = Counter(
+    "strathy_circuit_transitions_total",
+    "Circuit breaker state changes, by the state entered.",
+    ["upstream", "state"],
+)
+
+CIRCUIT_REJECTIONS = Counter(
+    "strathy_circuit_rejections_total",
+    "Calls failed fast without being attempted because the circuit was open.",
+    ["upstream"],
+)
+
+HEDGED_REQUESTS = Counter(
+    "strathy_hedged_requests_total",
+    "Hedged (duplicated) calls, by which copy answered first (none = both failed).",
+    ["upstream", "winner"],
+)
+
+STUDENT_LOOKUPS = Counter(
+    "strathy_student_lookups_total",
+    "Sender lookups in the student index before extraction (complete = extraction skipped).",
+    ["result"],
+)
+
+ANSWER_CACHE_LOOKUPS = Counter(
+    "strathy_answer_cache_lookups_total",
+    "Reply generations answered from the answer cache (hit) or sent to the model (miss).",
+    ["result"],
+)
+
+ANSWER_CACHE_SIMILARITY = Histogram(
+    "strathy_answer_cache_similarity",
+    "Best cosine similarity found per answer cache lookup.",
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 1.0),
+)
+
+DB_QUERIES_PER_REQUEST = Histogram(
+    "strathy_db_queries_per_request",
+    "SQL statements executed while serving one HTTP request.",
+    ["route"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 250),
+)
+
+REQUEST_SECONDS = Histogram(
+    "strathy_http_request_duration_seconds",
+    "HTTP handler latency.",
+    ["route", "method", "status"],
+)
+
+SCHEDULER_BACKLOG = Gauge(
+    "strathy_scheduler_backlog_messages",
+    "Unread messages seen by the last scheduler tick.",
+)
+
+WORKER_LANES_OWNED = Gauge(
+    "strathy_worker_lanes_owned",
+    "Thread lanes this worker process currently holds.",
+)
+
+LANE_BACKLOG = Gauge(
+    "strathy_lane_backlog_messages",
+    "Messages waiting in a thread lane in the current tick.",
+    ["lane"],
+)
+
+LANE_LAG = Gauge(
+    "strathy_lane_lag_seconds",
+    "How long the message a lane last started had waited since the tick listed it (0 when the lane is idle).",
+    ["lane"],
+)
+
+LANE_WAIT = Histogram(
+    "strathy_lane_wait_seconds",
+    "Time from a message being listed to its lane starting on it.",
+    ["lane"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+
+RATE_LIMIT_WAIT_SECONDS = Histogram(
+    "strathy_rate_limit_wait_seconds",
+    "Time spent waiting for API budget.",
+    ["api", "lane"],
+    buckets=(0, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+
+# ========================
+# timed()
+# ========================
+class timed(ContextDecorator):
+    """
+    Observe the duration of a block or function in STAGE_SECONDS
+    and wrap it in a tracing span of the same name.
+
+        with timed("gmail.messages.get"):
+            ...
+
+        @timed("email_parser.parse_message")
+        def parse_message(...):
+            ...
+    """
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._started: list = []
+        self._spans: list = []
+
+    def __enter__(self):
+        span_cm = span(self.stage)
+        span_cm.__enter__()
+        self._spans.append(span_cm)
+        self._started.append(time.perf_counter())
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._spans.pop().__exit__(exc_type, exc, tb)
+        started = self._started.pop()
+        STAGE_SECONDS.labels(stage=self.stage).observe(time.perf_counter() - started)
+        if exc_type is not None:
+            STAGE_ERRORS.labels(stage=self.stage).inc()
+        return False
+
+    def __call__(self, func):
+        # A fresh instance per call keeps the decorator safe across threads
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(self.stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+
+def record_llm_usage(operation: str, response) -> None:
+    """Count input/output tokens from an LLMResponse."""
+    model = getattr(response, "model", None) or "unknown"
+    LLM_TOKENS.labels(operation=operation, model=model, kind="input").inc(getattr(response, "input_tokens", 0) or 0)
+    LLM_TOKENS.labels(operation=operation, model=model, kind="output").inc(getattr(response, "output_tokens", 0) or 0)
+
+
+# ========================
+# DB query counting
+# ========================
+_query_counter: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("db_query_counter", default=None)
+
+
+def instrument_engine(engine) -> None:
+    """Count SQL statements per request on `engine` (idempotent)."""
+    if getattr(engine, "_strathy_instrumented", False):
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _count_query(conn, cursor, statement, parameters, context, executemany):
+        counter = _query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+    engine._strathy_instrumented = True
+
+
+def start_query_count():
+    """Begin counting queries in the current context; returns (token, counter)."""
+    counter = [0]
+    return _query_counter.set(counter), counter
+
+
+def stop_query_count(token) -> None:
+    _query_counter.reset(token)
+
+
+def render_metrics():
+    """Return (body, content_type) for the /metrics endpoint."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,67 @@
+# backend/strathy_app/utils/responses.py
+import json
+import logging
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.middleware.gzip import GZipMiddleware
+
+from ..config import RESPONSE_COMPRESSION_LEVEL, RESPONSE_COMPRESSION_MIN_BYTES
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the deployment
+    orjson = None
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:  # pragma: no cover - optional, gzip is used without it
+    BrotliMiddleware = None
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Serialize a response payload: orjson when installed, stdlib json otherwise
+    (same compact output as Starlette's JSONResponse). Types neither handles
+    natively go through FastAPI's jsonable_encoder.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":"), default=jsonable_encoder,
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps(); the app's default response class."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def add_compression(app, stream_paths=()):
+    """
+    Compress responses above RESPONSE_COMPRESSION_MIN_BYTES: brotli (with gzip
+    fallback) if brotli-asgi is installed, else gzip. Server-Sent Event
+    endpoints are left alone so tokens aren't held back in a compressor buffer.
+    """
+    if RESPONSE_COMPRESSION_MIN_BYTES < 0:
+        return
+    if BrotliMiddleware is not None:
+        app.add_middleware(
+            BrotliMiddleware,
+            minimum_size=RESPONSE_COMPRESSION_MIN_BYTES,
+            gzip_fallback=True,
+            excluded_handlers=[f"^{p}$" for p in stream_paths],
+        )
+        logger.info("Response compression: brotli (gzip fallback)")
+    else:
+        # GZipMiddleware already skips text/event-stream responses
+        app.add_middleware(
+            GZipMiddleware,
+            minimum_size=RESPONSE_COMPRESSION_MIN_BYTES,
+            compresslevel=RESPONSE_COMPRESSION_LEVEL,
+        )
@@ -0,0 +1,92 @@
+# backend/strathy_app/utils/tracing.py
+import logging
+from contextlib import contextmanager
+
+from ..config import OTEL_EXPORTER_OTLP_ENDPOINT, OTEL_SERVICE_NAME
+
+logger = logging.getLogger(__name__)
+
+# OpenTelemetry is optional: without the SDK installed every helper here is a no-op.
+try:
+    from opentelemetry import trace
+except ImportError:  # pragma: no cover - depends on the deployment
+    trace = None
+
+_configured = False
+
+
+def _tracer():
+    return trace.get_tracer("strathy_app") if trace else None
+
+
+@contextmanager
+def span(name: str, **attributes):
+    """Start a child span (no-op without OpenTelemetry). None-valued attributes are skipped."""
+    tracer = _tracer()
+    if tracer is None:
+        yield None
+        return
+    with tracer.start_as_current_span(name) as current:
+        for key, value in attributes.items():
+            if value is not None:
+                current.set_attribute(key, value)
+        yield current
+
+
+def set_span_attributes(**attributes):
+    """Tag the active span, e.g. with thread_id / message_id once they are known."""
+    if trace is None:
+        return
+    current = trace.get_current_span()
+    for key, value in attributes.items():
+        if value is not None:
+            current.set_attribute(key, value)
+
+
+def setup_tracing(app=None, engine=None, engines=()) -> bool:
+    """
+    Configure the tracer provider and auto-instrumentation.
+
+    Enabled when OTEL_EXPORTER_OTLP_ENDPOINT is set (e.g. http://localhost:4318
+    for a local collector). FastAPI handlers and SQLAlchemy get spans from the
+    contrib instrumentors; Gmail and Anthropic calls get spans from timed()
+    and the rate-limited call wrappers. `engines` are further SQLAlchemy
+    engines to instrument (e.g. the async engine's sync_engine).
+    """
+    global _configured
+    if _configured or trace is None or not OTEL_EXPORTER_OTLP_ENDPOINT:
+        return False
+
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError as e:
+        logger.warning("OpenTelemetry SDK/exporter not installed, tracing disabled: %s", e)
+        return False
+
+    provider = TracerProvider(resource=Resource.create({"service.name": OTEL_SERVICE_NAME}))
+    provider.add_span_processor(
+        BatchSpanProcessor(OTLPSpanExporter(endpoint=OTEL_EXPORTER_OTLP_ENDPOINT.rstrip("/") + "/v1/traces"))
+    )
+    trace.set_tracer_provider(provider)
+
+    if app is not None:
+        try:
+            from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
+            FastAPIInstrumentor.instrument_app(app, excluded_urls="metrics")
+        except ImportError:
+            logger.warning("opentelemetry-instrumentation-fastapi not installed; no handler spans")
+
+    engines = [e for e in [engine, *engines] if e is not None]
+    if engines:
+        try:
+            from opentelemetry.instrumentation.sqlalchemy import SQLAlchemyInstrumentor
+            SQLAlchemyInstrumentor().instrument(engines=engines)
+        except ImportError:
+            logger.warning("opentelemetry-instrumentation-sqlalchemy not installed; no DB spans")
+
+    _configured = True
+    logger.info("🔭 Tracing enabled, exporting to %s", OTEL_EXPORTER_OTLP_ENDPOINT)
+    return True
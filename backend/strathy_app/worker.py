@@ -0,0 +1,169 @@
+# backend/strathy_app/worker.py
+"""
+Standalone background worker: owns Gmail polling and message processing.
+
+    python -m backend.strathy_app.worker
+
+Any number of worker processes may run. Gmail thread ids hash into
+WORKER_LANES lanes, leased out evenly between the live workers through the
+database; each worker only processes mail from its own lanes, several lanes
+at once but one lane's messages strictly in order, so no two messages of a
+thread are ever processed concurrently. A crashed worker's lanes are taken
+over when their lease runs out.
+
+With WORKER_LANES=1 a leader lock (Postgres advisory lock, or a file lock on
+SQLite) lets one worker poll at a time instead; the others stay on standby
+and take over if the leader dies.
+"""
+import logging
+from datetime import datetime
+from typing import Iterable, Optional
+
+from apscheduler.schedulers.blocking import BlockingScheduler
+from dotenv import load_dotenv
+
+from backend.strathy_app.models.models import engine
+from .config import (
+    WORKER_LANES,
+    WORKER_LOCK_FILE,
+    WORKER_LOCK_KEY,
+    WORKER_MESSAGES_PER_TICK,
+    WORKER_METRICS_PORT,
+    WORKER_POLL_MINUTES,
+)
+from .services.gmail_service import (
+    build_gmail_service,
+    list_unread_page,
+    load_credentials,
+    process_incoming_email,
+)
+from .services.label_service import LabelBuffer, processed_query
+from .services.leader_lock import LeaderLock
+from .services.rate_limiter import BACKGROUND, priority
+from .services.sender_policy import get_sender_policy
+from .services.thread_lanes import LaneLeases, LaneScheduler, lane_for
+from .utils.metrics import SCHEDULER_BACKLOG, instrument_engine, timed
+from .utils.tracing import setup_tracing
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+leader_lock = LeaderLock(engine, WORKER_LOCK_KEY, WORKER_LOCK_FILE)
+lane_leases = LaneLeases(WORKER_LANES)
+lanes = LaneScheduler(WORKER_LANES)
+
+
+# ===== Auto Reply Job =====
+def auto_reply_job(owned_lanes: Optional[Iterable[int]] = None):
+    """
+    Poll once and process what was found. With `owned_lanes` only messages
+    whose thread hashes into those lanes are processed (the rest belong to
+    other workers); by default, all of them.
+    """
+    creds = load_credentials()
+    if not creds:
+        logging.info("No creds available yet. Skipping auto-reply job.")
+        return
+
+    try:
+        # ⏬ Background lane: interactive dashboard calls get API budget first
+        with priority(BACKGROUND), timed("scheduler.auto_reply_job"):
+            service = build_gmail_service(creds)
+            # Blocked/non-whitelisted senders are filtered by Gmail itself, and handled mail
+            # carries the processed label, so neither is listed or fetched here
+            owned = None if owned_lanes is None else set(owned_lanes)
+            page_size = WORKER_MESSAGES_PER_TICK
+            if owned is not None:
+                # Other workers' threads share the listing; look further to find a tick's worth of ours
+                page_size = min(500, WORKER_MESSAGES_PER_TICK * lanes.lanes // max(1, len(owned)))
+            unread, backlog = list_unread_page(service, q=poll_query(), max_results=page_size)
+            SCHEDULER_BACKLOG.set(backlog)
+            if owned is not None:
+                unread = [m for m in unread if lane_for(m.get("threadId") or m.get("id"), lanes.lanes) in owned]
+            unread = unread[:WORKER_MESSAGES_PER_TICK]
+            if not unread:
+                logging.info("No unread messages found.")
+                return
+
+            def handle(msg):
+                # process_incoming_email still re-checks the sender (and labels blocked mail)
+                result = process_incoming_email(service, msg, labels=labels)
+                if result:
+                    logging.info(f"✅ Auto-replied to {result.get('from')} | Subject: {result.get('subject')}")
+                return result
+
+            # 🏷️ Label changes for the whole tick go out in one batchModify per label set.
+            # Gmail lists newest first; each thread's messages are handled oldest first
+            with LabelBuffer(service) as labels:
+                lanes.run(
+                    reversed(unread),
+                    lambda m: m.get("threadId") or m.get("id"),
+                    handle,
+                    holds=lane_leases.holds if owned is not None else None,
+                    done=handled,
+                )
+
+    except Exception as e:
+        logging.error(f"Auto-reply job failed: {e}")
+
+
+def handled(result: Optional[dict]) -> bool:
+    """
+    Whether process_incoming_email finished with a message. Anything else
+    (failed, left unread for a retry, claimed by another worker) holds back
+    the rest of its thread until the next tick.
+    """
+    return bool(result) and result.get("status") in ("replied", "blocked")
+
+
+def poll_query() -> str:
+    """Gmail search for mail the poller should handle, built from the current sender policy."""
+    return processed_query(get_sender_policy().gmail_query())
+
+
+def run_worker_tick():
+    """One scheduler tick: process the lanes this worker holds (or, with one lane, poll only as leader)."""
+    if WORKER_LANES <= 1:
+        if not leader_lock.try_acquire():
+            logger.info("Standby: another worker holds the poller lock.")
+            return
+        auto_reply_job()
+        return
+
+    owned = lane_leases.renew()
+    if not owned:
+        logger.info("Standby: every lane is held by another worker.")
+        return
+    auto_reply_job(owned)
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    instrument_engine(engine)
+    setup_tracing(engine=engine)
+    if WORKER_METRICS_PORT:
+        from prometheus_client import start_http_server
+        start_http_server(WORKER_METRICS_PORT)
+        logger.info("📈 Worker metrics on :%s/metrics", WORKER_METRICS_PORT)
+
+    scheduler = BlockingScheduler()
+    scheduler.add_job(
+        run_worker_tick,
+        "interval",
+        minutes=WORKER_POLL_MINUTES,
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.now(),
+    )
+    logger.info("🛠️ Worker started (poll every %s min)", WORKER_POLL_MINUTES)
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        leader_lock.release()
+        lane_leases.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+# benchmarks/fakes.py
+"""
+In-process stand-ins for googleapiclient's Gmail service and the Anthropic client.
+
+Both replay payloads from a `FakeMailbox` (synthetic or recorded), sleep for a
+configurable latency per call and count every call, so the real service code
+can be driven without network access.
+"""
+import base64
+import copy
+import json
+import re
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+
+class CallLog:
+    """Thread-safe counter of API calls by name (e.g. 'gmail.messages.get')."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.bytes = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, name: str, payload=None):
+        with self._lock:
+            self.counts[name] += 1
+            if payload is not None:
+                self.bytes[name] += len(json.dumps(payload, default=str))
+
+    def add(self, name: str, amount: int):
+        with self._lock:
+            self.counts[name] += amount
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {"calls": dict(self.counts), "response_bytes": dict(self.bytes)}
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+            self.bytes.clear()
+
+
+# ========================
+# Gmail
+# ========================
+class FakeMailbox:
+    """Gmail-shaped storage: message id -> message JSON (format=full)."""
+
+    def __init__(self, messages: List[Dict]):
+        self.messages: Dict[str, Dict] = {}
+        self.threads: Dict[str, List[str]] = {}
+        self.labels: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._next_id = 0
+        for msg in messages:
+            self.add(msg)
+
+    def add(self, msg: Dict):
+        with self._lock:
+            msg = copy.deepcopy(msg)
+            msg.setdefault("labelIds", [])
+            self.messages[msg["id"]] = msg
+            self.threads.setdefault(msg["threadId"], []).append(msg["id"])
+
+    def new_id(self, prefix: str = "sent") -> str:
+        with self._lock:
+            self._next_id += 1
+            return f"{prefix}{self._next_id:08x}"
+
+
+def _header(msg: Dict, name: str) -> str:
+    for h in (msg.get("payload") or {}).get("headers") or []:
+        if h.get("name", "").lower() == name.lower():
+            return h.get("value") or ""
+    return ""
+
+
+def _matches_query(msg: Dict, q: str, label_names: Dict[str, str]) -> bool:
+    """
+    Tiny subset of Gmail search: is:unread, label:/-label:, from:/-from:
+    and OR-groups in parentheses or braces. Unknown terms are ignored.
+    """
+    labels = set(msg.get("labelIds") or [])
+    sender = _header(msg, "From").lower()
+
+    def term_matches(term: str) -> bool:
+        term = term.strip()
+        if not term:
+            return True
+        if term.startswith("-"):
+            return not term_matches(term[1:])
+        if term == "is:unread":
+            return "UNREAD" in labels
+        if term.startswith("label:"):
+            name = term[len("label:"):].lower()
+            return any(label_names.get(lid, lid).lower().replace("/", "-") == name for lid in labels)
+        if term.startswith("from:"):
+            return term[len("from:"):].lower() in sender
+        return True
+
+    tokens = re.findall(r"-?[({][^)}]*[)}]|\S+", q or "")
+    for token in tokens:
+        negate = token.startswith("-")
+        body = token[1:] if negate else token
+        if body[:1] in "({":
+            alternatives = [t for t in re.split(r"\s+OR\s+|\s+", body[1:-1]) if t and t != "OR"]
+            ok = any(term_matches(t) for t in alternatives)
+        else:
+            ok = term_matches(body)
+        if ok == negate:
+            return False
+    return True
+
+
+class _Request:
+    def __init__(self, fn, latency: float, method: str):
+        self._fn = fn
+        self._latency = latency
+        self.method = method
+
+    def execute(self, num_retries: int = 0):
+        if self._latency:
+            time.sleep(self._latency)
+        return self._fn()
+
+
+class FakeGmailService:
+    """Mimics `build("gmail", "v1", ...)`: service.users().messages().get(...).execute()."""
+
+    def __init__(self, mailbox: FakeMailbox, latency_s: float = 0.0, calls: Optional[CallLog] = None):
+        self.mailbox = mailbox
+        self.latency_s = latency_s
+        self.calls = calls or CallLog()
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return _Messages(self)
+
+    def threads(self):
+        return _Threads(self)
+
+    def labels(self):
+        return _Labels(self)
+
+    def _req(self, name: str, fn, http_method: str = "GET"):
+        def run():
+            result = fn()
+            self.calls.record(f"gmail.{name}", result)
+            return result
+        return _Request(run, self.latency_s, http_method)
+
+
+def _shape(msg: Dict, fmt: str) -> Dict:
+    if fmt == "minimal":
+        return {k: msg[k] for k in ("id", "threadId", "labelIds", "internalDate", "snippet") if k in msg}
+    if fmt == "metadata":
+        shaped = {k: msg[k] for k in ("id", "threadId", "labelIds", "internalDate", "snippet") if k in msg}
+        shaped["payload"] = {"headers": (msg.get("payload") or {}).get("headers", [])}
+        return shaped
+    return copy.deepcopy(msg)
+
+
+class _Messages:
+    def __init__(self, svc: FakeGmailService):
+        self.svc = svc
+
+    def list(self, userId="me", q=None, labelIds=None, maxResults=100, pageToken=None, **_):
+        def run():
+            box = self.svc.mailbox
+            label_names = {lid: lab["name"] for lid, lab in box.labels.items()}
+            hits = []
+            for msg in sorted(box.messages.values(), key=lambda m: int(m.get("internalDate", 0)), reverse=True):
+                if labelIds and not set(labelIds) <= set(msg.get("labelIds") or []):
+                    continue
+                if q and not _matches_query(msg, q, label_names):
+                    continue
+                hits.append({"id": msg["id"], "threadId": msg["threadId"]})
+            start = int(pageToken or 0)
+            page = hits[start:start + maxResults]
+            resp = {"messages": page, "resultSizeEstimate": len(hits)}
+            if start + maxResults < len(hits):
+                resp["nextPageToken"] = str(start + maxResults)
+            return resp
+        return self.svc._req("messages.list", run)
+
+    def get(self, userId="me", id=None, format="full", **_):
+        def run():
+            msg = self.svc.mailbox.messages.get(id)
+            if msg is None:
+                raise KeyError(f"message {id} not found")
+            return _shape(msg, format)
+        return self.svc._req("messages.get", run)
+
+    def modify(self, userId="me", id=None, body=None, **_):
+        def run():
+            self._apply(id, body or {})
+            return {"id": id}
+        return self.svc._req("messages.modify", run, "POST")
+
+    def batchModify(self, userId="me", body=None, **_):
+        def run():
+            body_ = body or {}
+            for mid in body_.get("ids", []):
+                self._apply(mid, body_)
+            return {}
+        return self.svc._req("messages.batchModify", run, "POST")
+
+    def send(self, userId="me", body=None, **_):
+        def run():
+            box = self.svc.mailbox
+            raw = base64.urlsafe_b64decode((body or {}).get("raw", "") + "==")
+            mid = box.new_id()
+            thread_id = (body or {}).get("threadId") or mid
+            box.add({
+                "id": mid,
+                "threadId": thread_id,
+                "labelIds": ["SENT"],
+                "internalDate": str(int(time.time() * 1000)),
+                "payload": {
+                    "mimeType": "text/plain",
+                    "headers": [{"name": "From", "value": "strathy@strathmore.edu"}],
+                    "body": {"data": base64.urlsafe_b64encode(raw).decode()},
+                },
+            })
+            return {"id": mid, "threadId": thread_id, "labelIds": ["SENT"]}
+        return self.svc._req("messages.send", run, "POST")
+
+    def _apply(self, mid: str, body: Dict):
+        msg = self.svc.mailbox.messages.get(mid)
+        if msg is None:
+            return
+        labels = [l for l in msg.get("labelIds") or [] if l not in set(body.get("removeLabelIds") or [])]
+        for l in body.get("addLabelIds") or []:
+            if l not in labels:
+                labels.append(l)
+        msg["labelIds"] = labels
+
+
+class _Threads:
+    def __init__(self, svc: FakeGmailService):
+        self.svc = svc
+
+    def get(self, userId="me", id=None, format="full", **_):
+        def run():
+            box = self.svc.mailbox
+            ids = box.threads.get(id)
+            if ids is None:
+                raise KeyError(f"thread {id} not found")
+            return {"id": id, "messages": [_shape(box.messages[mid], format) for mid in ids]}
+        return self.svc._req("threads.get", run)
+
+
+class _Labels:
+    def __init__(self, svc: FakeGmailService):
+        self.svc = svc
+
+    def list(self, userId="me", **_):
+        def run():
+            return {"labels": [dict(l) for l in self.svc.mailbox.labels.values()]}
+        return self.svc._req("labels.list", run)
+
+    def create(self, userId="me", body=None, **_):
+        def run():
+            box = self.svc.mailbox
+            lid = f"Label_{len(box.labels) + 1}"
+            box.labels[lid] = {"id": lid, "name": (body or {}).get("name"), "type": "user"}
+            return dict(box.labels[lid])
+        return self.svc._req("labels.create", run, "POST")
+
+
+# ========================
+# Anthropic
+# ========================
+def fake_extraction(text: str) -> Dict:
+    """Same deterministic extraction as the offline "stub" LLM provider."""
+    # Imported lazily: backend config must not load before bootstrap() sets the environment
+    from backend.strathy_app.services.llm_provider import stub_extraction
+    return stub_extraction(text)
+
+
+class _FakeMessages:
+    def __init__(self, client: "FakeAnthropic"):
+        self.client = client
+
+    def create(self, model=None, system=None, messages=None, max_tokens=300, **_):
+        prompt = (system or "") + "".join(
+            m.get("content", "") if isinstance(m.get("content"), str) else "" for m in messages or []
+        )
+        if self.client.latency_s:
+            time.sleep(self.client.latency_s)
+
+        user_text = (messages or [{}])[-1].get("content", "")
+        reply = "Dear student,\n\nThank you for your email. We will look into it and revert shortly.\n\nRegards,\nAdam"
+        if system and "extraction" in system.lower():
+            details = fake_extraction(user_text)
+            if '"reply"' in system:
+                details["reply"] = reply
+            text = json.dumps(details)
+        else:
+            text = reply
+
+        self.client.calls.record("anthropic.messages.create")
+        input_tokens = max(1, len(prompt) // 4)
+        self.client.calls.add("anthropic.input_tokens", input_tokens)
+        return SimpleNamespace(
+            content=[SimpleNamespace(type="text", text=text)],
+            usage=SimpleNamespace(input_tokens=input_tokens, output_tokens=max(1, len(text) // 4)),
+            model=model,
+            stop_reason="end_turn",
+        )
+
+    def stream(self, **kwargs):
+        """`client.messages.stream(...)`: the create() reply, yielded word by word."""
+        message = self.create(**kwargs)
+        return _FakeStream(message)
+
+
+class _FakeStream:
+    def __init__(self, message):
+        self._message = message
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    @property
+    def text_stream(self):
+        text = self._message.content[0].text
+        return iter(re.findall(r"\S+\s*", text))
+
+    def get_final_message(self):
+        return self._message
+
+
+class FakeAnthropic:
+    """Mimics `anthropic.Anthropic()` for `client.messages.create(...)` and `.stream(...)`."""
+
+    def __init__(self, latency_s: float = 0.0, calls: Optional[CallLog] = None):
+        self.latency_s = latency_s
+        self.calls = calls or CallLog()
+        self.messages = _FakeMessages(self)
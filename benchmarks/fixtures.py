@@ -0,0 +1,167 @@
+# benchmarks/fixtures.py
+"""
+Synthetic and recorded Gmail payloads for the benchmark fakes.
+
+`synthetic_mailbox()` builds a realistic inbox mix: students from
+@strathmore.edu, blocked list senders, external senders, threads of varied
+length with ADAM replies interleaved, and several MIME shapes (plain,
+HTML-only, multipart/alternative, nested multipart with attachments,
+quoted reply chains and disclaimer footers).
+"""
+import base64
+import glob
+import json
+import os
+import random
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+MIME_SHAPES = ("plain", "html", "alternative", "nested", "quoted")
+
+_COURSES = ("BBIT", "BCOM", "BICS", "LLB", "BSCF")
+_FIRST = ("Achieng", "Brian", "Cynthia", "Dennis", "Esther", "Felix", "Grace", "Hassan", "Irene", "Joseph")
+_LAST = ("Mwangi", "Otieno", "Wanjiru", "Kiptoo", "Njeri", "Ochieng", "Mutua", "Chebet")
+_TOPICS = (
+    "I have not been able to see my exam timetable for this semester.",
+    "Kindly assist with unit registration, the portal shows an error.",
+    "I would like to request a fee statement for the current semester.",
+    "My marks for the CAT are missing on the student portal.",
+    "Could you confirm the deadline for the supplementary exam registration?",
+    "I need a letter confirming that I am a student for my internship.",
+)
+_BLOCKED = ("allstudents@strathmore.edu", "ictservices@strathmore.edu", "strathmorecommunication@gmail.com")
+_EXTERNAL = ("promo@shop.example.com", "newsletter@events.example.org", "someone@gmail.com")
+_DISCLAIMER = (
+    "\n\nNote: All emails sent from Strathmore University are subject to the email policy "
+    "http://www.strathmore.edu/en/email-policy\n\"Visit our Facebook page\""
+)
+
+
+def _b64(text: str) -> str:
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode().rstrip("=")
+
+
+def _headers(sender: str, subject: str, when: datetime, msg_num: int) -> List[Dict]:
+    return [
+        {"name": "From", "value": sender},
+        {"name": "To", "value": "strathy@strathmore.edu"},
+        {"name": "Subject", "value": subject},
+        {"name": "Date", "value": format_datetime(when)},
+        {"name": "Message-ID", "value": f"<bench-{msg_num}@mail.example.com>"},
+    ]
+
+
+def _payload(shape: str, text: str, rng: random.Random) -> Dict:
+    html = "<html><body>" + "".join(f"<p>{line}</p>" for line in text.split("\n")) + "</body></html>"
+    if shape == "plain":
+        return {"mimeType": "text/plain", "body": {"data": _b64(text)}}
+    if shape == "html":
+        return {"mimeType": "text/html", "body": {"data": _b64(html)}}
+    if shape == "alternative":
+        return {"mimeType": "multipart/alternative", "body": {}, "parts": [
+            {"mimeType": "text/plain", "body": {"data": _b64(text)}},
+            {"mimeType": "text/html", "body": {"data": _b64(html)}},
+        ]}
+    if shape == "nested":
+        attachment = {"mimeType": "application/pdf", "filename": "slip.pdf",
+                      "body": {"attachmentId": f"att{rng.randint(0, 10**9)}", "size": rng.randint(10_000, 900_000)}}
+        return {"mimeType": "multipart/mixed", "body": {}, "parts": [
+            {"mimeType": "multipart/alternative", "body": {}, "parts": [
+                {"mimeType": "text/plain", "body": {"data": _b64(text)}},
+                {"mimeType": "text/html", "body": {"data": _b64(html)}},
+            ]},
+            attachment,
+        ]}
+    # quoted: reply chain + footer that clean_reply_text has to strip
+    quoted = "\n".join("> " + line for line in (text * 3).split("\n"))
+    body = f"{text}\n\nOn Mon, 3 Mar 2025 at 10:00, Strathy <strathy@strathmore.edu> wrote:\n{quoted}{_DISCLAIMER}"
+    return {"mimeType": "text/plain", "body": {"data": _b64(body)}}
+
+
+def _student_text(rng: random.Random, name: str, with_details: bool, long_body: bool) -> str:
+    parts = ["Good morning,", rng.choice(_TOPICS)]
+    if long_body:
+        parts.append(" ".join(rng.choice(_TOPICS) for _ in range(rng.randint(20, 80))))
+    if with_details:
+        parts.append(
+            f"Admission number {rng.randint(100000, 199999)}, {rng.choice(_COURSES)} "
+            f"{rng.randint(1, 4)}.{rng.randint(1, 2)} group {rng.choice('ABCDE')}."
+        )
+    parts.append(f"Regards,\n{name}")
+    return "\n".join(parts)
+
+
+def synthetic_mailbox(
+    n_messages: int,
+    seed: int = 7,
+    max_thread_length: int = 8,
+    blocked_ratio: float = 0.15,
+    external_ratio: float = 0.10,
+) -> List[Dict]:
+    """Return `n_messages` Gmail message dicts (format=full) grouped into threads."""
+    rng = random.Random(seed)
+    start = datetime(2025, 3, 1, 8, 0, tzinfo=timezone.utc)
+    messages: List[Dict] = []
+    msg_num = 0
+    thread_num = 0
+
+    while msg_num < n_messages:
+        thread_num += 1
+        thread_id = f"t{thread_num:07x}"
+        roll = rng.random()
+        if roll < blocked_ratio:
+            sender_email = rng.choice(_BLOCKED)
+            name = "Strathmore Communications"
+        elif roll < blocked_ratio + external_ratio:
+            sender_email = rng.choice(_EXTERNAL)
+            name = "Newsletter"
+        else:
+            name = f"{rng.choice(_FIRST)} {rng.choice(_LAST)}"
+            sender_email = f"{name.lower().replace(' ', '.')}{rng.randint(1, 99)}@strathmore.edu"
+        subject = rng.choice(_TOPICS)[:40]
+        length = max(1, min(max_thread_length, int(rng.expovariate(1 / 2.5)) + 1))
+        when = start + timedelta(minutes=thread_num * 7)
+
+        for i in range(length):
+            if msg_num >= n_messages:
+                break
+            msg_num += 1
+            from_adam = i % 2 == 1
+            shape = rng.choice(MIME_SHAPES)
+            if from_adam:
+                text = f"Dear {name.split()[0]},\n\nThank you for reaching out. We are looking into it.\n\nRegards,\nAdam"
+                sender = "Strathy <strathy@strathmore.edu>"
+                labels = ["SENT"]
+            else:
+                text = _student_text(rng, name, with_details=rng.random() < 0.6, long_body=rng.random() < 0.1)
+                sender = f"{name} <{sender_email}>"
+                labels = ["INBOX"] + (["UNREAD"] if i >= length - 2 else [])
+            when = when + timedelta(minutes=rng.randint(5, 600))
+            messages.append({
+                "id": f"m{msg_num:08x}",
+                "threadId": thread_id,
+                "labelIds": labels,
+                "snippet": text[:100],
+                "internalDate": str(int(when.timestamp() * 1000)),
+                "payload": dict(_payload(shape, text, rng),
+                                headers=_headers(sender, ("Re: " if i else "") + subject, when, msg_num)),
+            })
+    return messages
+
+
+def load_recorded(path: str) -> List[Dict]:
+    """
+    Load recorded Gmail messages (format=full) from a JSON file or a directory of
+    JSON files. Each file may hold one message, a list of messages, or a
+    threads.get response ({"messages": [...]}).
+    """
+    files = sorted(glob.glob(os.path.join(path, "*.json"))) if os.path.isdir(path) else [path]
+    messages: List[Dict] = []
+    for file in files:
+        with open(file, encoding="utf-8") as fh:
+            data = json.load(fh)
+        if isinstance(data, dict) and "messages" in data and "payload" not in data:
+            data = data["messages"]
+        messages.extend(data if isinstance(data, list) else [data])
+    return messages
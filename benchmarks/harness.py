@@ -0,0 +1,188 @@
+# benchmarks/harness.py
+"""
+Environment bootstrap, fake wiring and measurement helpers for the benchmarks.
+
+`bootstrap()` must run before anything under `backend.` is imported: the app
+reads DATABASE_URL and the rate budgets from the environment at import time.
+"""
+import asyncio
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from .fakes import CallLog, FakeAnthropic, FakeGmailService, FakeMailbox
+
+_BOOTSTRAPPED = False
+
+
+def bootstrap(database_url: Optional[str] = None, respect_rate_limits: bool = False,
+              stub_llm_latency_ms: Optional[float] = None) -> str:
+    """
+    Point the app at a throwaway SQLite DB and (by default) lift API rate budgets.
+    With `stub_llm_latency_ms`, every model route uses the offline "stub" LLM provider
+    instead of the Anthropic provider backed by FakeAnthropic.
+    """
+    global _BOOTSTRAPPED
+    if _BOOTSTRAPPED:
+        return os.environ["DATABASE_URL"]
+
+    if not database_url:
+        db_file = os.path.join(tempfile.mkdtemp(prefix="strathy-bench-"), "bench.db")
+        database_url = f"sqlite:///{db_file}"
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("ANTHROPIC_API_KEY", "bench-not-a-key")
+    if not respect_rate_limits:
+        os.environ["ANTHROPIC_REQUESTS_PER_MINUTE"] = "1000000000"
+        os.environ["ANTHROPIC_TOKENS_PER_MINUTE"] = "1000000000000"
+        os.environ["GMAIL_QUOTA_UNITS_PER_SECOND"] = "1000000000"
+        os.environ["ENRICHMENT_RATE_PER_MINUTE"] = "0"
+    if stub_llm_latency_ms is not None:
+        os.environ["LLM_REPLY_MODEL"] = "stub:reply"
+        os.environ["LLM_EXTRACTION_MODEL"] = "stub:extraction"
+        os.environ["LLM_DRAFT_MODEL"] = "stub:draft"
+        os.environ["LLM_REPLY_FALLBACKS"] = os.environ["LLM_EXTRACTION_FALLBACKS"] = ""
+        os.environ["LLM_DRAFT_FALLBACKS"] = ""
+        os.environ["LLM_STUB_LATENCY_MS"] = str(stub_llm_latency_ms)
+
+    from backend.strathy_app.models.models import init_db
+    init_db()
+    _BOOTSTRAPPED = True
+    return database_url
+
+
+def load_app(keep_scheduler: bool = False):
+    """Import the FastAPI app module, by default without leaving its background scheduler running."""
+    from backend.strathy_app import app as app_module
+    scheduler = getattr(app_module, "scheduler", None)
+    if not keep_scheduler and scheduler is not None and getattr(scheduler, "running", False):
+        scheduler.shutdown(wait=False)
+    return app_module
+
+
+class Wiring:
+    """Install Gmail/Anthropic fakes into the service modules and the app."""
+
+    def __init__(self, mailbox: FakeMailbox, gmail_latency_s: float = 0.0, llm_latency_s: float = 0.0):
+        self.calls = CallLog()
+        self.gmail = FakeGmailService(mailbox, gmail_latency_s, self.calls)
+        self.llm = FakeAnthropic(llm_latency_s, self.calls)
+
+    def install(self, keep_scheduler: bool = False):
+        from backend.strathy_app.services.llm_provider import AnthropicProvider, set_provider
+        set_provider("anthropic", AnthropicProvider(client=self.llm))
+        # Label ids belong to a mailbox; a fresh fake mailbox starts without them
+        from backend.strathy_app.services import label_service
+        label_service._label_ids.clear()
+
+        app_module = load_app(keep_scheduler)
+        app_module._load_creds = lambda: object()
+        app_module.build_gmail_service = lambda creds: self.gmail
+
+        from backend.strathy_app import worker
+        worker.load_credentials = lambda: object()
+        worker.build_gmail_service = lambda creds: self.gmail
+        return self
+
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def run_async(coro):
+    """
+    Run a coroutine to completion on one long-lived event loop: pooled async
+    DB connections belong to the loop that opened them, so every scenario
+    (and every iteration) must share it.
+    """
+    global _loop
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+    return _loop.run_until_complete(coro)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def _peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+class Measurement:
+    """Collects per-operation latencies plus API-call and memory deltas for one scenario."""
+
+    def __init__(self, name: str, calls: Optional[CallLog] = None, trace_memory: bool = False):
+        self.name = name
+        self.calls = calls
+        self.trace_memory = trace_memory
+        self.latencies: List[float] = []
+        self.extra: Dict = {}
+
+    @contextmanager
+    def run(self):
+        if self.calls is not None:
+            self.calls.reset()
+        if self.trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.wall_s = time.perf_counter() - started
+            self.tracemalloc_peak_mb = None
+            if self.trace_memory:
+                _current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                self.tracemalloc_peak_mb = peak / (1024 * 1024)
+
+    def time(self, fn: Callable, *args, **kwargs):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        self.latencies.append(time.perf_counter() - t0)
+        return result
+
+    def report(self) -> Dict:
+        lat = sorted(self.latencies)
+        ms = lambda s: round(s * 1000, 3)
+        report = {
+            "scenario": self.name,
+            "operations": len(lat),
+            "wall_s": round(self.wall_s, 3),
+            "throughput_per_s": round(len(lat) / self.wall_s, 2) if self.wall_s else None,
+            "p50_ms": ms(percentile(lat, 50)),
+            "p95_ms": ms(percentile(lat, 95)),
+            "p99_ms": ms(percentile(lat, 99)),
+            "mean_ms": ms(statistics.fmean(lat)) if lat else 0.0,
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+        }
+        if self.tracemalloc_peak_mb is not None:
+            report["tracemalloc_peak_mb"] = round(self.tracemalloc_peak_mb, 2)
+        if self.calls is not None:
+            report.update(self.calls.snapshot())
+        report.update(self.extra)
+        return report
+
+
+def print_report(reports: List[Dict]):
+    cols = ("scenario", "operations", "throughput_per_s", "p50_ms", "p95_ms", "p99_ms", "peak_rss_mb")
+    widths = [max(len(c), *(len(str(r.get(c, ""))) for r in reports)) for c in cols]
+    print("  ".join(c.ljust(w) for c, w in zip(cols, widths)))
+    for r in reports:
+        print("  ".join(str(r.get(c, "")).ljust(w) for c, w in zip(cols, widths)))
+    for r in reports:
+        calls = r.get("calls") or {}
+        if calls:
+            print(f"\n[{r['scenario']}] API calls: " + ", ".join(f"{k}={v}" for k, v in sorted(calls.items())))
+        extra = {k: v for k, v in r.items() if k not in cols and k not in ("calls", "response_bytes", "wall_s", "mean_ms")}
+        if extra:
+            print(f"[{r['scenario']}] " + ", ".join(f"{k}={v}" for k, v in extra.items()))
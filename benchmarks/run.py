@@ -0,0 +1,399 @@
+# benchmarks/run.py
+"""
+Offline replay benchmarks for the email pipeline.
+
+    python -m benchmarks.run --messages 1000
+    python -m benchmarks.run --scenarios parse,process --messages 10000 --llm-latency-ms 800
+    python -m benchmarks.run --fixtures recorded/ --json bench.json
+    python -m benchmarks.run --scenarios db_reads --concurrency 1,16,64
+    python -m benchmarks.run --scenarios parse_scaling --messages 10000 --parse-workers 1,2,4,8
+
+Gmail and Anthropic are replaced by in-process fakes (see benchmarks/fakes.py);
+the database is a throwaway SQLite file unless --database-url is given.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import sys
+import time
+from typing import Dict, List
+
+from .fixtures import load_recorded, synthetic_mailbox
+from .fakes import FakeMailbox
+from .harness import Measurement, Wiring, bootstrap, load_app, percentile, print_report, run_async
+
+SCENARIOS = ("parse", "inbox", "inbox_payload", "process", "auto_reply", "sender_filter", "db_reads", "parse_scaling")
+
+
+def _unread_ids(mailbox: FakeMailbox) -> List[str]:
+    unread = [m for m in mailbox.messages.values() if {"UNREAD", "INBOX"} <= set(m.get("labelIds") or [])]
+    unread.sort(key=lambda m: int(m.get("internalDate", 0)), reverse=True)
+    return [m["id"] for m in unread]
+
+
+def bench_parse(messages: List[Dict], args) -> Dict:
+    from backend.strathy_app.utils.email_parser import parse_message
+
+    m = Measurement("parse_message", trace_memory=args.trace_memory)
+    with m.run():
+        for msg in messages:
+            m.time(parse_message, msg)
+    return m.report()
+
+
+def _call_unread(app_module, view: str = "slim"):
+    from backend.strathy_app.models.async_db import AsyncSessionLocal
+
+    async def call():
+        async with AsyncSessionLocal() as db:
+            return await app_module.gmail_unread(db=db, view=view)
+    return run_async(call())
+
+
+def bench_parse_scaling(messages: List[Dict], args) -> Dict:
+    """parse_messages() throughput across process counts (1 = inline), with the speed-up over inline."""
+    import os
+    from backend.strathy_app.utils.email_parser import parse_messages
+
+    m = Measurement("parse_messages", trace_memory=args.trace_memory)
+    levels = [int(w) for w in args.parse_workers.split(",") if w.strip()]
+    results = {}
+    with m.run():
+        for workers in levels:
+            started = time.perf_counter()
+            parsed = m.time(parse_messages, messages, workers=workers, min_messages=0)
+            elapsed = time.perf_counter() - started
+            assert [p["message_id"] for p in parsed] == [msg["id"] for msg in messages]
+            results[workers] = elapsed
+    base = results.get(1) or results[levels[0]]
+    for workers, elapsed in results.items():
+        m.extra[f"w{workers}"] = {
+            "msgs_per_s": round(len(messages) / elapsed, 1),
+            "speedup": round(base / elapsed, 2),
+        }
+    m.extra["cpus"] = os.cpu_count()
+    return m.report()
+
+
+def bench_inbox(messages: List[Dict], args) -> Dict:
+    wiring = Wiring(FakeMailbox(messages), args.gmail_latency_ms / 1000, args.llm_latency_ms / 1000).install()
+    app_module = load_app()
+    m = Measurement("gmail_unread", wiring.calls, trace_memory=args.trace_memory)
+    payload_bytes = 0
+    with m.run():
+        for _ in range(args.iterations):
+            response = m.time(_call_unread, app_module)
+            payload_bytes = len(response.body)
+    m.extra["payload_bytes"] = payload_bytes
+    return m.report()
+
+
+def bench_inbox_payload(messages: List[Dict], args) -> Dict:
+    """
+    /gmail/unread payload before and after the slim schema: response size
+    (raw and gzip) and serialization time with stdlib json vs the app's encoder.
+    """
+    from fastapi.responses import JSONResponse
+    from backend.strathy_app.utils.responses import FastJSONResponse, orjson
+
+    wiring = Wiring(FakeMailbox(messages), args.gmail_latency_ms / 1000, args.llm_latency_ms / 1000).install()
+    app_module = load_app()
+
+    def serialize_ms(cls, payload) -> float:
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            cls(payload).body
+        return round((time.perf_counter() - started) * 1000 / args.iterations, 3)
+
+    m = Measurement("inbox payload", wiring.calls, trace_memory=args.trace_memory)
+    sizes = {}
+    with m.run():
+        for view in ("full", "slim"):
+            response = m.time(_call_unread, app_module, view)
+            payload = json.loads(response.body)
+            stdlib = JSONResponse(payload).body
+            sizes[view] = {
+                "threads": len(payload),
+                "handler_ms": round(m.latencies[-1] * 1000, 3),
+                "bytes": len(stdlib),
+                "gzip_bytes": len(gzip.compress(stdlib, compresslevel=6)),
+                "json_ms": serialize_ms(JSONResponse, payload),
+                "fast_json_ms": serialize_ms(FastJSONResponse, payload),
+            }
+    m.extra["encoder"] = "orjson" if orjson is not None else "json"
+    m.extra["full"] = sizes["full"]
+    m.extra["slim"] = sizes["slim"]
+    m.extra["wire_bytes_before_after"] = (sizes["full"]["bytes"], sizes["slim"]["gzip_bytes"])
+    return m.report()
+
+
+def bench_process(messages: List[Dict], args) -> Dict:
+    from backend.strathy_app.services.gmail_service import process_incoming_email
+
+    mailbox = FakeMailbox(messages)
+    wiring = Wiring(mailbox, args.gmail_latency_ms / 1000, args.llm_latency_ms / 1000).install()
+    m = Measurement("process_incoming_email", wiring.calls, trace_memory=args.trace_memory)
+    statuses: Dict[str, int] = {}
+    with m.run():
+        for mid in _unread_ids(mailbox):
+            result = m.time(process_incoming_email, wiring.gmail, {"id": mid})
+            status = (result or {}).get("status", "failed")
+            statuses[status] = statuses.get(status, 0) + 1
+    m.extra["statuses"] = statuses
+    return m.report()
+
+
+def bench_auto_reply(messages: List[Dict], args) -> Dict:
+    from backend.strathy_app import worker
+
+    mailbox = FakeMailbox(messages)
+    wiring = Wiring(mailbox, args.gmail_latency_ms / 1000, args.llm_latency_ms / 1000).install()
+    m = Measurement("auto_reply_job", wiring.calls, trace_memory=args.trace_memory)
+    with m.run():
+        for _ in range(min(args.iterations, len(_unread_ids(mailbox)))):
+            m.time(worker.auto_reply_job)
+    return m.report()
+
+
+def _drain(messages: List[Dict], args, name: str, query_fn, max_ticks: int = 10000) -> Dict:
+    """Run worker ticks with the given poll query until nothing it selects is left."""
+    from backend.strathy_app import worker
+    from backend.strathy_app.models.models import ReplyLedger, SessionLocal
+    from .fakes import _matches_query
+
+    # Each drain starts from a clean ledger so both runs do the same reply work
+    db = SessionLocal()
+    try:
+        db.query(ReplyLedger).delete()
+        db.commit()
+    finally:
+        db.close()
+
+    mailbox = FakeMailbox(messages)
+    wiring = Wiring(mailbox, args.gmail_latency_ms / 1000, args.llm_latency_ms / 1000).install()
+
+    def remaining() -> int:
+        names = {lid: lab["name"] for lid, lab in mailbox.labels.items()}
+        q = query_fn()
+        return sum(
+            1 for msg in mailbox.messages.values()
+            if "INBOX" in (msg.get("labelIds") or []) and _matches_query(msg, q, names)
+        )
+
+    original = worker.poll_query
+    worker.poll_query = query_fn
+    m = Measurement(name, wiring.calls, trace_memory=args.trace_memory)
+    try:
+        with m.run():
+            for _ in range(max_ticks):
+                if not remaining():
+                    break
+                m.time(worker.auto_reply_job)
+    finally:
+        worker.poll_query = original
+    return m.report()
+
+
+def bench_sender_filter(messages: List[Dict], args) -> Dict:
+    """Drain the inbox with and without the sender-policy Gmail query; report the fetches saved."""
+    from backend.strathy_app import worker
+    from backend.strathy_app.services.label_service import processed_query
+
+    unfiltered = _drain(messages, args, "drain (is:unread only)", lambda: processed_query("is:unread"))
+    filtered = _drain(messages, args, "drain (sender query)", worker.poll_query)
+
+    saved = {}
+    for call in ("gmail.messages.list", "gmail.messages.get", "gmail.threads.get", "gmail.messages.batchModify"):
+        saved[call] = unfiltered["calls"].get(call, 0) - filtered["calls"].get(call, 0)
+    filtered["unfiltered_calls"] = unfiltered["calls"]
+    filtered["unfiltered_ticks"] = unfiltered["operations"]
+    filtered["calls_saved"] = saved
+    filtered["query"] = worker.poll_query()
+    return filtered
+
+
+def _seed_students(count: int, threads_per_student: int = 5):
+    """Students with finished conversations (nothing left to enrich), as (emails, thread ids)."""
+    from backend.strathy_app.models.models import Conversation, SessionLocal, Student
+
+    db = SessionLocal()
+    try:
+        db.query(Conversation).filter(Conversation.thread_id.like("dbread-%")).delete(synchronize_session=False)
+        db.query(Student).filter(Student.email.like("dbread-%")).delete(synchronize_session=False)
+        emails, thread_ids = [], []
+        for i in range(count):
+            student = Student(full_name=f"Reader {i}", admission_number=f"DBREAD/{i}", course="BSc",
+                              email=f"dbread-{i}@strathmore.edu")
+            db.add(student)
+            db.flush()
+            for j in range(threads_per_student):
+                thread_id = f"dbread-{i}-{j}"
+                db.add(Conversation(thread_id=thread_id, student_id=student.id, subject=f"Question {j}",
+                                    message_body="Hello, when is the exam?", details_status="complete",
+                                    missing_fields=[], draft_reply="Dear Reader, next week.",
+                                    draft_message_id=f"m-{thread_id}"))
+                thread_ids.append(thread_id)
+            emails.append(student.email)
+        db.commit()
+    finally:
+        db.close()
+    return emails, thread_ids
+
+
+def _sync_routes(app_module, prefix: str):
+    """The same two views on the synchronous SessionLocal path (threadpool handlers), for comparison."""
+    from sqlalchemy import func
+    from backend.strathy_app.models.models import Conversation, SessionLocal, Student
+
+    def student(email: str):
+        normalized_email = email.strip().lower()
+        db = SessionLocal()
+        try:
+            row = db.query(Student).filter(func.lower(Student.email) == normalized_email).first()
+            if not row:
+                return app_module.FastJSONResponse({"ok": False}, status_code=404)
+            conversations = (
+                db.query(Conversation).filter(Conversation.student_id == row.id)
+                .order_by(Conversation.last_updated.desc()).all()
+            )
+            status, payload, _ = app_module._student_view(normalized_email, row, conversations)
+            return app_module.FastJSONResponse(payload, status_code=status)
+        finally:
+            db.close()
+
+    def draft(thread_id: str, message_id: str = None):
+        db = SessionLocal()
+        try:
+            conversation = db.query(Conversation).filter(Conversation.thread_id == thread_id).first()
+            return app_module._draft_response(thread_id, conversation, message_id)
+        finally:
+            db.close()
+
+    app_module.app.add_api_route(prefix + "/students/{email}", student)
+    app_module.app.add_api_route(prefix + "/threads/{thread_id}/draft", draft)
+
+
+async def _drive(app, paths: List[str], concurrency: int):
+    """Issue every path through the ASGI app with `concurrency` requests in flight; (latencies, wall seconds)."""
+    import httpx
+
+    latencies: List[float] = []
+    todo = iter(paths)
+
+    async def client_loop(client):
+        for path in todo:
+            t0 = time.perf_counter()
+            response = await client.get(path)
+            latencies.append(time.perf_counter() - t0)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path}: HTTP {response.status_code}")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        return latencies, time.perf_counter() - started
+
+
+def bench_db_reads(messages: List[Dict], args) -> Dict:
+    """
+    Concurrent read throughput of the DB-backed API views (/students/{email}
+    and /threads/{id}/draft) served from AsyncSession, against the same
+    queries in sync handlers on SessionLocal. The response cache is off so
+    every request reaches the database.
+    """
+    from backend.strathy_app.services.cache_service import get_response_cache
+
+    wiring = Wiring(FakeMailbox(messages), args.gmail_latency_ms / 1000, args.llm_latency_ms / 1000).install()
+    app_module = load_app()
+    get_response_cache().max_entries = 0
+    emails, thread_ids = _seed_students(args.db_students)
+    _sync_routes(app_module, "/_bench/sync")
+
+    paths = []
+    for i in range(args.db_requests):
+        if i % 2:
+            paths.append(f"/threads/{thread_ids[i % len(thread_ids)]}/draft")
+        else:
+            paths.append(f"/students/{emails[i % len(emails)]}")
+    levels = [int(c) for c in args.concurrency.split(",") if c.strip()]
+
+    m = Measurement("db reads (async)", wiring.calls, trace_memory=args.trace_memory)
+    results = {}
+    with m.run():
+        for mode, prefix in (("sync", "/_bench/sync"), ("async", "")):
+            run_async(_drive(app_module.app, [prefix + p for p in paths[:20]], 1))  # warm pools
+            for level in levels:
+                latencies, wall = run_async(_drive(app_module.app, [prefix + p for p in paths], level))
+                if mode == "async":
+                    m.latencies.extend(latencies)
+                lat = sorted(latencies)
+                results.setdefault(f"c{level}", {})[mode] = {
+                    "rps": round(len(lat) / wall, 1),
+                    "p50_ms": round(percentile(lat, 50) * 1000, 2),
+                    "p95_ms": round(percentile(lat, 95) * 1000, 2),
+                }
+    m.extra["database"] = app_module.get_async_engine().url.render_as_string()
+    m.extra.update(results)
+    return m.report()
+
+
+RUNNERS = {
+    "parse": bench_parse,
+    "inbox": bench_inbox,
+    "inbox_payload": bench_inbox_payload,
+    "process": bench_process,
+    "auto_reply": bench_auto_reply,
+    "sender_filter": bench_sender_filter,
+    "db_reads": bench_db_reads,
+    "parse_scaling": bench_parse_scaling,
+}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated: " + ", ".join(SCENARIOS))
+    parser.add_argument("--messages", type=int, default=1000, help="synthetic mailbox size (100-10000)")
+    parser.add_argument("--max-thread-length", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--fixtures", help="recorded Gmail JSON file or directory (replaces synthetic data)")
+    parser.add_argument("--iterations", type=int, default=20, help="repetitions for inbox/auto_reply")
+    parser.add_argument("--concurrency", default="1,8,32", help="db_reads: comma-separated in-flight request counts")
+    parser.add_argument("--db-requests", type=int, default=1000, help="db_reads: requests per mode and level")
+    parser.add_argument("--db-students", type=int, default=200, help="db_reads: seeded students (5 threads each)")
+    parser.add_argument("--parse-workers", default="1,2,4", help="parse_scaling: comma-separated process counts")
+    parser.add_argument("--gmail-latency-ms", type=float, default=0.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0)
+    parser.add_argument("--respect-rate-limits", action="store_true", help="keep the configured API budgets")
+    parser.add_argument("--llm-provider", choices=("fake-anthropic", "stub"), default="fake-anthropic",
+                        help="stub: route all model calls to the offline stub provider (no rate limiter)")
+    parser.add_argument("--database-url", help="defaults to a throwaway SQLite file")
+    parser.add_argument("--trace-memory", action="store_true", help="report tracemalloc peak (slower)")
+    parser.add_argument("--json", help="write the reports to this file")
+    args = parser.parse_args(argv)
+
+    bootstrap(args.database_url, args.respect_rate_limits,
+              stub_llm_latency_ms=args.llm_latency_ms if args.llm_provider == "stub" else None)
+
+    messages = (
+        load_recorded(args.fixtures)
+        if args.fixtures
+        else synthetic_mailbox(args.messages, seed=args.seed, max_thread_length=args.max_thread_length)
+    )
+
+    reports = []
+    for name in [s.strip() for s in args.scenarios.split(",") if s.strip()]:
+        if name not in RUNNERS:
+            parser.error(f"unknown scenario {name!r}")
+        reports.append(RUNNERS[name](messages, args))
+
+    print_report(reports)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(reports, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
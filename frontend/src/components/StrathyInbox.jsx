@@ -15,6 +15,7 @@ import {
   ShieldAlert,
   Hourglass,
   Copy,
+  Sparkles,
 } from "lucide-react";
 
 const BRAND = {
@@ -137,7 +138,11 @@ const [selected, setSelected] = useState(null);
 
   const [reply, setReply] = useState("");
   const [sending, setSending] = useState(false);
+  const [generating, setGenerating] = useState(false);
+  const [threadLoading, setThreadLoading] = useState(false);
+  const draftStream = useRef(null);
   const [sent, setSent] = useState(false);
+  const [reusable, setReusable] = useState(false);
   const [filter, setFilter] = useState("");
   const [currentPage, setCurrentPage] = useState(1);
   const messagesRef = useRef([]);
@@ -273,8 +278,16 @@ const [selected, setSelected] = useState(null);
           received_at: m.received_at || m.date || new Date().toISOString(),
 
           thread_messages,
+          // Inbox rows are slim (no message_count): the conversation is fetched from /threads/{id} when opened
+          message_count: m.message_count ?? null,
+          unread_count: m.unread_count || 1,
           raw: m,
           details_status: m.details_status || "empty",
+
+          // ✅ Reply drafted in the background for the latest message (empty if stale/not ready)
+          draft_reply: m.draft_reply || "",
+          draft_message_id: m.draft_message_id || null,
+          enrichment_pending: !!m.enrichment_pending,
         };
       });
 
@@ -459,7 +472,7 @@ useEffect(() => {
       const res = await fetch("/gmail/reply", {
         method: "POST",
         headers: { "Content-Type": "application/json" },
-        body: JSON.stringify({ message_id: selected.gmail_message_id, body_text: reply }),
+        body: JSON.stringify({ message_id: selected.gmail_message_id, body_text: reply, reusable }),
       });
 
       const data = await res.json().catch(() => ({}));
@@ -477,6 +490,7 @@ useEffect(() => {
 
       setSent(true);
       setReply("");
+      setReusable(false);
 
       // Refresh so thread messages update from backend
       fetchUnread();
@@ -487,6 +501,121 @@ useEffect(() => {
     }
   };
 
+  // Stream an AI draft into the reply box; staff still review it and press Send
+  const onGenerate = () => {
+    if (!selected?.gmail_message_id) {
+      alert("Cannot draft: missing Gmail message id for this thread.");
+      return;
+    }
+    if (draftStream.current) draftStream.current.close();
+
+    setReply("");
+    setSent(false);
+    setGenerating(true);
+    const source = new EventSource(
+      "/gmail/reply/stream?message_id=" + encodeURIComponent(selected.gmail_message_id)
+    );
+    draftStream.current = source;
+
+    const finish = () => {
+      source.close();
+      if (draftStream.current === source) draftStream.current = null;
+      setGenerating(false);
+    };
+
+    source.addEventListener("token", (e) => {
+      const { text } = JSON.parse(e.data);
+      setReply((prev) => prev + text);
+    });
+    source.addEventListener("done", (e) => {
+      const { text } = JSON.parse(e.data);
+      setReply(text);
+      finish();
+    });
+    source.addEventListener("error", (e) => {
+      // Either a server `error` event (with data) or the connection dropping
+      let message = "Failed to generate a reply";
+      try {
+        message = JSON.parse(e.data).error || message;
+      } catch {}
+      finish();
+      alert(message);
+    });
+  };
+
+  useEffect(() => () => draftStream.current?.close(), []);
+
+  const selectedThreadId = selected?.threadId;
+  const selectedMessageId = selected?.gmail_message_id;
+
+  // Load the conversation when a thread is opened (or grew since it was last loaded)
+  useEffect(() => {
+    if (!selectedThreadId) return;
+    const cur = messagesRef.current.find((m) => m.threadId === selectedThreadId) || selected;
+    const loaded = cur?.thread_messages || [];
+    const upToDate =
+      loaded.length > 0 &&
+      (cur.message_count == null || loaded.length >= cur.message_count) &&
+      (!selectedMessageId || loaded.some((tm) => tm.id === selectedMessageId));
+    if (upToDate) return;
+
+    let cancelled = false;
+    setThreadLoading(true);
+    (async () => {
+      try {
+        const res = await fetch(`/threads/${encodeURIComponent(selectedThreadId)}`);
+        const data = await res.json().catch(() => ({}));
+        if (cancelled || !res.ok || !Array.isArray(data.messages)) return;
+        const withThread = (m) =>
+          m && m.threadId === selectedThreadId ? { ...m, thread_messages: data.messages } : m;
+        setMessages((prev) => prev.map(withThread));
+        setSelected(withThread);
+      } catch {
+      } finally {
+        if (!cancelled) setThreadLoading(false);
+      }
+    })();
+    return () => {
+      cancelled = true;
+      setThreadLoading(false);
+    };
+  }, [selectedThreadId, selectedMessageId]);
+
+  // Opening a thread shows its precomputed draft; if it's still being drafted, ask once more shortly
+  useEffect(() => {
+    if (!selectedThreadId) return;
+    if (draftStream.current) {
+      draftStream.current.close();
+      draftStream.current = null;
+      setGenerating(false);
+    }
+    const cur = messagesRef.current.find((m) => m.threadId === selectedThreadId) || selected;
+    if (cur?.draft_reply && cur.draft_message_id === selectedMessageId) {
+      setReply(cur.draft_reply);
+      return;
+    }
+    setReply("");
+    if (!cur?.enrichment_pending || !selectedMessageId) return;
+
+    let cancelled = false;
+    const timer = setTimeout(async () => {
+      try {
+        const res = await fetch(
+          `/threads/${encodeURIComponent(selectedThreadId)}/draft?message_id=` +
+            encodeURIComponent(selectedMessageId)
+        );
+        const data = await res.json().catch(() => ({}));
+        if (!cancelled && data.draft_reply) {
+          setReply((prev) => prev || data.draft_reply);
+        }
+      } catch {}
+    }, 3000);
+    return () => {
+      cancelled = true;
+      clearTimeout(timer);
+    };
+  }, [selectedThreadId, selectedMessageId]);
+
   const onEscalate = (msgId) => {
     setMessages((prev) =>
       prev.map((m) => (m.id === msgId ? { ...m, status: "escalated" } : m))
@@ -778,7 +907,9 @@ useEffect(() => {
 
                 <div className="mt-3 space-y-3">
                   {(selected.thread_messages || []).length === 0 ? (
-                    <div className="text-sm text-slate-500">No thread messages found.</div>
+                    <div className="text-sm text-slate-500">
+                      {threadLoading ? "Loading conversation…" : "No thread messages found."}
+                    </div>
                   ) : (
                     (selected.thread_messages || []).map((tm) => {
                       const isAI = (tm.role || "").toUpperCase() === "ADAM";
@@ -837,9 +968,19 @@ useEffect(() => {
                   />
 
                   <div className="mt-3 flex items-center gap-3">
+                    <button
+                      onClick={onGenerate}
+                      disabled={generating || sending}
+                      className="px-4 py-2 rounded-xl flex items-center gap-2 border disabled:opacity-60"
+                      style={{ color: BRAND.blue, borderColor: BRAND.blue }}
+                    >
+                      {generating ? <Loader2 className="w-4 h-4 animate-spin" /> : <Sparkles className="w-4 h-4" />}
+                      {generating ? " Drafting…" : " Generate with AI"}
+                    </button>
+
                     <button
                       onClick={onSend}
-                      disabled={sending || !reply.trim()}
+                      disabled={sending || generating || !reply.trim()}
                       className="px-4 py-2 rounded-xl text-white shadow-sm disabled:opacity-60 flex items-center gap-2"
                       style={{ background: BRAND.red }}
                     >
@@ -847,6 +988,18 @@ useEffect(() => {
                       {sending ? " Sending…" : " Send reply"}
                     </button>
 
+                    <label
+                      className="inline-flex items-center gap-1 text-sm"
+                      title="Offer this reply as the draft when another student asks the same question"
+                    >
+                      <input
+                        type="checkbox"
+                        checked={reusable}
+                        onChange={(e) => setReusable(e.target.checked)}
+                      />
+                      Save as reusable answer
+                    </label>
+
                     <button
                       onClick={() => onEscalate(selected.id)}
                       className="px-4 py-2 rounded-xl flex items-center gap-2 text-red-600 border border-red-600"
@@ -0,0 +1,83 @@
+# loadtest/fake_app.py
+"""
+The real FastAPI app wired to local fakes, for load testing:
+
+    uvicorn loadtest.fake_app:app --port 8100
+
+Gmail and Anthropic are replaced by the benchmark fakes, the DB defaults to a
+throwaway SQLite file (set LOADTEST_DATABASE_URL for Postgres) and is seeded
+with students/conversations for the synthetic mailbox.
+
+Environment knobs: LOADTEST_MESSAGES, LOADTEST_GMAIL_LATENCY_MS,
+LOADTEST_LLM_LATENCY_MS, LOADTEST_SCHEDULER=1 (poll Gmail inside the API process).
+"""
+import os
+
+from benchmarks.fakes import FakeMailbox
+from benchmarks.fixtures import synthetic_mailbox
+from benchmarks.harness import Wiring, bootstrap
+
+if os.getenv("LOADTEST_SCHEDULER") == "1":
+    os.environ["RUN_SCHEDULER_IN_API"] = "1"
+# One process and no separate worker: the in-process response cache sees every invalidation
+os.environ.setdefault("RESPONSE_CACHE_URL", "memory")
+bootstrap(os.getenv("LOADTEST_DATABASE_URL"))
+
+from backend.strathy_app.models.models import Conversation, SessionLocal, Student  # noqa: E402
+from backend.strathy_app.services.gmail_service import _extract_email, is_sender_allowed  # noqa: E402
+from backend.strathy_app.utils.email_parser import parse_messages  # noqa: E402
+
+_messages = synthetic_mailbox(int(os.getenv("LOADTEST_MESSAGES", "2000")))
+mailbox = FakeMailbox(_messages)
+wiring = Wiring(
+    mailbox,
+    gmail_latency_s=float(os.getenv("LOADTEST_GMAIL_LATENCY_MS", "30")) / 1000,
+    llm_latency_s=float(os.getenv("LOADTEST_LLM_LATENCY_MS", "800")) / 1000,
+).install(keep_scheduler=os.getenv("LOADTEST_SCHEDULER") == "1")
+
+
+def _seed() -> dict:
+    """Create a Student + Conversation per allowed thread; return ids the driver can target."""
+    targets = {"thread_ids": [], "student_emails": [], "reply_message_ids": []}
+    db = SessionLocal()
+    try:
+        seen = set()
+        for msg, parsed in zip(_messages, parse_messages(_messages)):
+            if "SENT" in (msg.get("labelIds") or []) or msg["threadId"] in seen:
+                continue
+            email = (_extract_email(parsed.get("sender")) or "").lower()
+            if not is_sender_allowed(email):
+                continue
+            seen.add(msg["threadId"])
+
+            student = db.query(Student).filter(Student.email == email).first()
+            if not student:
+                student = Student(email=email, full_name=(parsed.get("sender") or "").split("<")[0].strip())
+                db.add(student)
+                db.flush()
+            db.add(Conversation(
+                thread_id=msg["threadId"],
+                student_id=student.id,
+                subject=parsed.get("subject"),
+                message_body=parsed.get("body") or "",
+                details_status="partial",
+                missing_fields=["admission_number"],
+            ))
+            targets["thread_ids"].append(msg["threadId"])
+            targets["student_emails"].append(email)
+            targets["reply_message_ids"].append(msg["id"])
+        db.commit()
+    finally:
+        db.close()
+    targets["student_emails"] = sorted(set(targets["student_emails"]))
+    return targets
+
+
+TARGETS = _seed()
+
+from backend.strathy_app.app import app  # noqa: E402
+
+
+@app.get("/_loadtest/targets")
+def loadtest_targets():
+    return TARGETS
@@ -0,0 +1,221 @@
+# loadtest/run.py
+"""
+Capacity test for the API with several concurrent staff dashboards.
+
+    python -m loadtest.run                                # spawns uvicorn loadtest.fake_app:app
+    python -m loadtest.run --steps 1,4,8,16,32 --target-p95-ms 300
+    python -m loadtest.run --base-url http://localhost:8000 --mix inbox=1   # existing server
+
+Each virtual user is a dashboard running a weighted mix of scenarios:
+inbox polling (GET /gmail/unread), opening a thread (GET /threads/{id}),
+viewing a student (GET /students/{email}) and sending a reply
+(POST /gmail/reply). Browsers revalidate with If-None-Match, so users keep
+ETags per URL. Concurrency is stepped up; the report gives the highest RPS
+whose p95 stays under the target with <1% errors.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import httpx
+
+from benchmarks.harness import percentile
+
+DEFAULT_MIX = "inbox=4,thread=3,student=3,reply=1"
+
+
+def _parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for item in mix.split(","):
+        name, _, weight = item.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    return weights
+
+
+class Dashboard:
+    """One simulated staff dashboard."""
+
+    def __init__(self, client: httpx.AsyncClient, targets: Dict, rng: random.Random):
+        self.client = client
+        self.targets = targets
+        self.rng = rng
+        self.etags: Dict[str, str] = {}
+
+    async def _get(self, url: str) -> httpx.Response:
+        headers = {"If-None-Match": self.etags[url]} if url in self.etags else {}
+        resp = await self.client.get(url, headers=headers)
+        if resp.headers.get("etag"):
+            self.etags[url] = resp.headers["etag"]
+        return resp
+
+    async def inbox(self):
+        return await self._get("/gmail/unread")
+
+    async def thread(self):
+        return await self._get(f"/threads/{self.rng.choice(self.targets['thread_ids'])}")
+
+    async def student(self):
+        return await self._get(f"/students/{self.rng.choice(self.targets['student_emails'])}")
+
+    async def reply(self):
+        return await self.client.post("/gmail/reply", json={
+            "message_id": self.rng.choice(self.targets["reply_message_ids"]),
+            "body_text": "Thank you, we have received your request and will get back to you shortly.",
+        })
+
+
+async def _user(dashboard: Dashboard, mix: Dict[str, float], deadline: float, think_s: float, samples: List):
+    names, weights = list(mix), list(mix.values())
+    while time.monotonic() < deadline:
+        name = dashboard.rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            resp = await getattr(dashboard, name)()
+            ok = resp.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        samples.append((name, time.perf_counter() - started, ok))
+        if think_s:
+            await asyncio.sleep(think_s)
+
+
+async def run_step(base_url: str, users: int, seconds: float, mix: Dict[str, float], think_s: float,
+                   targets: Dict, seed: int) -> Dict:
+    samples: List = []
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        deadline = time.monotonic() + seconds
+        started = time.perf_counter()
+        await asyncio.gather(*[
+            _user(Dashboard(client, targets, random.Random(seed + i)), mix, deadline, think_s, samples)
+            for i in range(users)
+        ])
+        elapsed = time.perf_counter() - started
+
+    by_scenario = defaultdict(list)
+    errors = 0
+    for name, latency, ok in samples:
+        by_scenario[name].append(latency)
+        errors += 0 if ok else 1
+    all_lat = sorted(l for _, l, _ in samples)
+    ms = lambda s: round(s * 1000, 1)
+    return {
+        "users": users,
+        "requests": len(samples),
+        "rps": round(len(samples) / elapsed, 2) if elapsed else 0,
+        "p50_ms": ms(percentile(all_lat, 50)),
+        "p95_ms": ms(percentile(all_lat, 95)),
+        "p99_ms": ms(percentile(all_lat, 99)),
+        "error_rate": round(errors / len(samples), 4) if samples else 0,
+        "scenarios": {
+            name: {"requests": len(lat), "p95_ms": ms(percentile(sorted(lat), 95))}
+            for name, lat in by_scenario.items()
+        },
+    }
+
+
+def _spawn_server(port: int, workers: int, env_overrides: Dict[str, str]) -> subprocess.Popen:
+    env = dict(os.environ, **env_overrides)
+    cmd = [sys.executable, "-m", "uvicorn", "loadtest.fake_app:app", "--port", str(port),
+           "--workers", str(workers), "--log-level", "warning"]
+    return subprocess.Popen(cmd, env=env)
+
+
+def _wait_ready(base_url: str, timeout: float = 120) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(base_url + "/", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"server at {base_url} did not become ready")
+
+
+def _fetch_targets(base_url: str) -> Dict:
+    try:
+        resp = httpx.get(base_url + "/_loadtest/targets", timeout=10)
+        if resp.status_code == 200:
+            return resp.json()
+    except httpx.HTTPError:
+        pass
+    raise RuntimeError("no /_loadtest/targets on the server; run against loadtest.fake_app")
+
+
+def capacity(steps: List[Dict], target_p95_ms: float) -> Optional[Dict]:
+    ok = [s for s in steps if s["p95_ms"] <= target_p95_ms and s["error_rate"] < 0.01]
+    return max(ok, key=lambda s: s["rps"]) if ok else None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", help="test an already running server instead of spawning one")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the spawned server")
+    parser.add_argument("--steps", default="1,2,4,8,16,32", help="concurrent dashboards per step")
+    parser.add_argument("--step-seconds", type=float, default=15)
+    parser.add_argument("--think-ms", type=float, default=0, help="pause between a user's requests")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--target-p95-ms", type=float, default=500)
+    parser.add_argument("--messages", type=int, default=2000, help="fake mailbox size")
+    parser.add_argument("--gmail-latency-ms", type=float, default=30)
+    parser.add_argument("--llm-latency-ms", type=float, default=800)
+    parser.add_argument("--scheduler", action="store_true", help="keep APScheduler running in the API process")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="write the capacity report to this file")
+    args = parser.parse_args(argv)
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        base_url = f"http://127.0.0.1:{args.port}"
+        server = _spawn_server(args.port, args.workers, {
+            "LOADTEST_MESSAGES": str(args.messages),
+            "LOADTEST_GMAIL_LATENCY_MS": str(args.gmail_latency_ms),
+            "LOADTEST_LLM_LATENCY_MS": str(args.llm_latency_ms),
+            "LOADTEST_SCHEDULER": "1" if args.scheduler else "0",
+        })
+    try:
+        _wait_ready(base_url)
+        targets = _fetch_targets(base_url)
+        mix = _parse_mix(args.mix)
+
+        steps = []
+        for users in [int(x) for x in args.steps.split(",") if x.strip()]:
+            step = asyncio.run(run_step(base_url, users, args.step_seconds, mix, args.think_ms / 1000,
+                                        targets, args.seed))
+            steps.append(step)
+            print(f"users={step['users']:<4} rps={step['rps']:<8} p50={step['p50_ms']:<8} "
+                  f"p95={step['p95_ms']:<8} p99={step['p99_ms']:<8} errors={step['error_rate']:.2%}")
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    best = capacity(steps, args.target_p95_ms)
+    report = {
+        "target_p95_ms": args.target_p95_ms,
+        "mix": mix,
+        "workers": args.workers,
+        "sustainable_rps": best["rps"] if best else 0,
+        "sustainable_users": best["users"] if best else 0,
+        "steps": steps,
+    }
+    print(f"\nCapacity at p95 <= {args.target_p95_ms:g} ms: "
+          + (f"{best['rps']} RPS with {best['users']} dashboards" if best else "not reached at any step"))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
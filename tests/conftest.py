@@ -0,0 +1,24 @@
+# tests/conftest.py
+# Run from the repo root: python -m pytest -q tests
+# Same throwaway SQLite DB and offline stub LLM as the benchmarks; must run before backend imports.
+from benchmarks.harness import bootstrap
+
+bootstrap(stub_llm_latency_ms=0)
+
+import pytest
+
+from benchmarks.fakes import FakeMailbox
+from benchmarks.fixtures import synthetic_mailbox
+from benchmarks.harness import Wiring
+
+
+@pytest.fixture
+def wiring():
+    """Fake Gmail (20 messages, every student sender allowed) wired into the app and worker."""
+    return Wiring(FakeMailbox(synthetic_mailbox(20, blocked_ratio=0, external_ratio=0))).install()
+
+
+@pytest.fixture
+def student_message(wiring):
+    """A message a student sent (not one of Adam's replies)."""
+    return next(m for m in wiring.gmail.mailbox.messages.values() if "SENT" not in m["labelIds"])
@@ -0,0 +1,62 @@
+# tests/test_answer_cache.py
+import pytest
+
+from backend.strathy_app.models.models import Conversation, SessionLocal
+from backend.strathy_app.services import ai_reply_service
+from backend.strathy_app.services.answer_cache import AnswerCache, get_answer_cache, question_text
+from backend.strathy_app.services.draft_service import CACHED_SOURCE, fresh_draft, save_draft
+
+SUBJECT = "Fee payment"
+PAID = "Dear Adam, I paid my fees for this semester yesterday. Has my balance been cleared?"
+REPLY = "Hi Jane, payment received, your balance is cleared."
+
+
+@pytest.fixture
+def cache():
+    cache = get_answer_cache()
+    cache.invalidate()
+    cache.refresh_seconds = 0
+    assert cache.remember(question_text(SUBJECT, PAID), REPLY, sender_name="Jane")
+    yield cache
+    cache.invalidate()
+
+
+def test_near_identical_question_hits(cache):
+    hit = cache.lookup(question_text(SUBJECT, PAID.replace("Dear Adam", "Hello")))
+    assert hit is not None and hit.reply == REPLY
+
+
+def test_negated_question_misses(cache):
+    negated = "Dear Adam, I have NOT paid my fees for this semester yet. Has my balance been cleared?"
+    assert cache.lookup(question_text(SUBJECT, negated)) is None
+    assert cache.lookup(question_text(SUBJECT, negated.replace("have NOT paid", "haven't paid"))) is None
+
+
+def test_different_figures_or_question_miss(cache):
+    assert cache.lookup(question_text(SUBJECT, PAID.replace("this semester", "semester 2"))) is None
+    assert cache.lookup(question_text(SUBJECT, "Dear Adam, when does exam registration for this semester close?")) is None
+
+
+def test_auto_send_reply_never_uses_cache(cache):
+    reply = ai_reply_service.generate_ai_reply("Tom", "tom@strathmore.edu", SUBJECT, PAID)
+    assert reply != "Hi Tom, payment received, your balance is cleared."
+    assert not isinstance(reply, ai_reply_service.CachedReply)
+
+
+def test_cached_draft_is_not_auto_sent(cache):
+    reply, _ = ai_reply_service.draft_reply("Tom", "tom@strathmore.edu", SUBJECT, PAID)
+    assert isinstance(reply, ai_reply_service.CachedReply)
+    assert reply == "Hi Tom, payment received, your balance is cleared."
+
+    save_draft("thread-cached", "msg-1", reply, source=CACHED_SOURCE, subject=SUBJECT, body=PAID)
+    try:
+        assert fresh_draft("thread-cached", "msg-1") is None
+    finally:
+        db = SessionLocal()
+        db.query(Conversation).filter(Conversation.thread_id == "thread-cached").delete()
+        db.commit()
+        db.close()
+
+
+def test_disabled_cache_stores_nothing():
+    assert AnswerCache(enabled=False).remember(question_text(SUBJECT, PAID), REPLY) is None
@@ -0,0 +1,43 @@
+# tests/test_auto_reply.py
+import httplib2
+from googleapiclient.errors import HttpError
+
+from benchmarks import fakes
+from backend.strathy_app import worker
+from backend.strathy_app.services.reply_ledger_service import SENT, reply_state
+
+
+def _unanswered(wiring):
+    """Student messages the poller should pick up: unread, and the latest of their thread."""
+    box = wiring.gmail.mailbox
+    return [
+        m for m in box.messages.values()
+        if "UNREAD" in m["labelIds"] and "SENT" not in m["labelIds"] and box.threads[m["threadId"]][-1] == m["id"]
+    ]
+
+
+def test_failed_send_stays_unread_and_is_sent_next_poll(wiring, monkeypatch):
+    box = wiring.gmail.mailbox
+    target = _unanswered(wiring)[0]
+    real_send = fakes._Messages.send
+
+    def failing_send(self, userId="me", body=None, **kwargs):
+        def run():
+            raise HttpError(httplib2.Response({"status": 503}), b"backend error")
+        return fakes._Request(run, 0, "POST")
+
+    monkeypatch.setattr(fakes._Messages, "send", failing_send)
+    worker.auto_reply_job()
+
+    assert "UNREAD" in box.messages[target["id"]]["labelIds"]
+    assert len(box.messages[target["id"]]["labelIds"]) == len(target["labelIds"])  # no processed label either
+    assert reply_state(target["id"]) != SENT
+    assert not any("SENT" in m["labelIds"] and m["threadId"] == target["threadId"] and m["id"].startswith("sent")
+                   for m in box.messages.values())
+
+    monkeypatch.setattr(fakes._Messages, "send", real_send)
+    worker.auto_reply_job()
+
+    assert reply_state(target["id"]) == SENT
+    assert "UNREAD" not in box.messages[target["id"]]["labelIds"]
+    assert any(m["id"].startswith("sent") and m["threadId"] == target["threadId"] for m in box.messages.values())
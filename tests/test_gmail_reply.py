@@ -0,0 +1,45 @@
+# tests/test_gmail_reply.py
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.harness import load_app
+from backend.strathy_app.services.answer_cache import get_answer_cache
+
+REPLY = "Dear student, the fee statement is available on the student portal under Finance."
+
+
+@pytest.fixture
+def answer_cache():
+    cache = get_answer_cache()
+    cache.invalidate()
+    yield cache
+    cache.invalidate()
+
+
+def _reply(message_id, **extra):
+    with TestClient(load_app().app) as client:
+        return client.post("/gmail/reply", json={"message_id": message_id, "body_text": REPLY, **extra})
+
+
+def test_failed_send_is_a_502(wiring, student_message, answer_cache, monkeypatch):
+    app_module = load_app()
+    invalidated = []
+    monkeypatch.setattr(app_module, "send_mime", lambda *args, **kwargs: None)
+    monkeypatch.setattr(app_module, "invalidate_ingestion", lambda **kwargs: invalidated.append(kwargs))
+
+    response = _reply(student_message["id"], reusable=True)
+
+    assert response.status_code == 502
+    assert response.json()["ok"] is False
+    assert not invalidated
+    assert answer_cache.stats()["entries"] == 0
+
+
+def test_reply_is_only_cached_when_marked_reusable(wiring, student_message, answer_cache):
+    response = _reply(student_message["id"])
+    assert response.status_code == 200 and response.json()["ok"] is True
+    assert answer_cache.stats()["entries"] == 0
+
+    response = _reply(student_message["id"], reusable=True)
+    assert response.status_code == 200 and response.json()["sent_id"]
+    assert answer_cache.stats()["entries"] == 1
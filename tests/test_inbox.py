@@ -0,0 +1,21 @@
+# tests/test_inbox.py
+from fastapi.testclient import TestClient
+
+from benchmarks.harness import load_app
+
+
+def test_slim_inbox_makes_no_per_thread_gmail_calls(wiring):
+    with TestClient(load_app().app) as client:
+        response = client.get("/gmail/unread")
+
+    assert response.status_code == 200
+    previews = response.json()
+    assert previews and all("message_count" not in row for row in previews)
+    assert "gmail.threads.get" not in wiring.calls.snapshot()["calls"]
+
+
+def test_full_inbox_embeds_threads(wiring):
+    with TestClient(load_app().app) as client:
+        previews = client.get("/gmail/unread", params={"view": "full"}).json()
+
+    assert previews and all(row["message_count"] == len(row["thread_messages"]) for row in previews)
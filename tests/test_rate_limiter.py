@@ -0,0 +1,66 @@
+# tests/test_rate_limiter.py
+import threading
+
+import pytest
+
+from backend.strathy_app.services.rate_limiter import (
+    BACKGROUND,
+    INTERACTIVE,
+    ApiGovernor,
+    TokenBucket,
+    priority,
+)
+from backend.strathy_app.services.resilience import UpstreamTimeoutError, deadline
+
+
+def _governor(capacity=100.0, rate=0.0, reserve=0.2):
+    return ApiGovernor("test", {"tokens": TokenBucket(capacity, rate)}, interactive_reserve=reserve)
+
+
+def _acquire_within(governor, seconds=2.0, **kwargs):
+    """acquire() on another thread; True if it returned within `seconds` (a hang fails instead of blocking)."""
+    done = threading.Event()
+    thread = threading.Thread(target=lambda: (governor.acquire(**kwargs), done.set()), daemon=True)
+    thread.start()
+    thread.join(seconds)
+    return done.is_set()
+
+
+def test_background_cannot_use_interactive_reserve():
+    governor = _governor()
+    governor.acquire(lane=BACKGROUND, tokens=50)
+
+    bucket = governor.buckets["tokens"]
+    assert bucket.wait_for(40, reserve=0.2) == float("inf")  # 40 + 20 reserved > 50 left, no refill
+    assert bucket.wait_for(40) == 0.0  # an interactive caller still gets it
+    assert _acquire_within(governor, lane=INTERACTIVE, tokens=40)
+
+
+def test_large_background_request_proceeds_on_a_full_bucket():
+    # 90 + a 20 reserve is more than the bucket can ever hold; it used to wait forever
+    governor = _governor()
+    assert governor.buckets["tokens"].wait_for(90, reserve=0.2) == 0.0
+    assert _acquire_within(governor, lane=BACKGROUND, tokens=90)
+
+
+def test_background_waits_for_a_full_bucket_when_oversized():
+    governor = _governor(rate=1000.0)
+    governor.buckets["tokens"].level = 50
+    assert governor.buckets["tokens"].wait_for(500, reserve=0.2) == pytest.approx(0.05)
+
+
+def test_lane_comes_from_priority_context():
+    governor = _governor()
+    governor.buckets["tokens"].level = 30
+    with priority(BACKGROUND), deadline(0.2), pytest.raises(UpstreamTimeoutError):
+        governor.acquire(tokens=20)  # 20 + 20 reserved > 30, and nothing refills
+    assert _acquire_within(governor, tokens=20)  # interactive by default
+
+
+def test_waiting_interactive_caller_goes_first():
+    governor = _governor(rate=1000.0)
+    governor._waiting[INTERACTIVE] = 1  # an interactive caller is queued
+    with deadline(0.2), pytest.raises(UpstreamTimeoutError):
+        governor.acquire(lane=BACKGROUND, tokens=1)
+    governor._waiting[INTERACTIVE] = 0
+    assert _acquire_within(governor, lane=BACKGROUND, tokens=1)
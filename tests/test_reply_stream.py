@@ -0,0 +1,22 @@
+# tests/test_reply_stream.py
+from fastapi.testclient import TestClient
+
+from benchmarks.harness import load_app
+
+
+def test_stream_failure_sends_error_event(wiring, student_message, monkeypatch):
+    app_module = load_app()
+
+    def failing_stream(*args, **kwargs):
+        yield "Dear "
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(app_module, "stream_ai_reply", failing_stream)
+    with TestClient(app_module.app) as client:
+        response = client.get("/gmail/reply/stream", params={"message_id": student_message["id"]})
+
+    assert response.status_code == 200
+    assert "event: token" in response.text
+    assert "event: error" in response.text
+    assert "model unavailable" in response.text
+    assert "event: done" not in response.text
@@ -0,0 +1,35 @@
+# tests/test_response_cache.py
+import logging
+
+import pytest
+
+from backend.strathy_app.services import cache_service
+
+
+@pytest.fixture
+def resolve(monkeypatch):
+    """get_response_cache() resolved afresh for a given RESPONSE_CACHE_URL / RUN_SCHEDULER_IN_API."""
+    def resolve(url: str, scheduler_in_api: bool):
+        monkeypatch.setattr(cache_service, "RESPONSE_CACHE_URL", url)
+        monkeypatch.setattr(cache_service, "RUN_SCHEDULER_IN_API", scheduler_in_api)
+        monkeypatch.setattr(cache_service, "_cache", None)
+        return cache_service.get_response_cache()
+    return resolve
+
+
+def test_separate_worker_without_redis_caches_nothing(resolve):
+    cache = resolve("", scheduler_in_api=False)
+    assert isinstance(cache, cache_service.NullResponseCache)
+    cache.set("student:a@strathmore.edu", cache_service.CachedResponse(b"{}", '"x"'), ["student:a@strathmore.edu"])
+    assert cache.get("student:a@strathmore.edu") is None
+
+
+def test_single_process_defaults_to_memory(resolve):
+    assert isinstance(resolve("", scheduler_in_api=True), cache_service.LocalResponseCache)
+
+
+def test_explicit_memory_with_separate_worker_warns(resolve, caplog):
+    with caplog.at_level(logging.WARNING, logger=cache_service.__name__):
+        cache = resolve("memory", scheduler_in_api=False)
+    assert isinstance(cache, cache_service.LocalResponseCache)
+    assert "redis://" in caplog.text
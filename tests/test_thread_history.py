@@ -0,0 +1,49 @@
+# tests/test_thread_history.py
+import pytest
+
+from backend.strathy_app.services import gmail_service
+
+
+@pytest.fixture
+def thread(wiring):
+    """The id and message ids of a thread with at least three messages, with nothing parsed yet."""
+    gmail_service._parsed_messages.clear()
+    box = wiring.gmail.mailbox
+    thread_id = next(tid for tid, ids in box.threads.items() if len(ids) >= 3)
+    wiring.calls.reset()
+    return thread_id, box.threads[thread_id]
+
+
+def _calls(wiring):
+    return wiring.calls.snapshot()["calls"]
+
+
+def test_uncached_thread_is_one_full_fetch(wiring, thread):
+    thread_id, ids = thread
+    history = gmail_service.extract_thread_messages(wiring.gmail, thread_id)
+
+    assert [m["id"] for m in history] == ids
+    assert _calls(wiring) == {"gmail.threads.get": 2}  # minimal listing + full thread, no per-message gets
+
+
+def test_one_new_message_is_fetched_alone(wiring, thread):
+    thread_id, ids = thread
+    for mid in ids[:-1]:
+        gmail_service.remember_message(wiring.gmail.mailbox.messages[mid])
+
+    history = gmail_service.extract_thread_messages(wiring.gmail, thread_id)
+
+    assert [m["id"] for m in history] == ids
+    assert _calls(wiring) == {"gmail.threads.get": 1, "gmail.messages.get": 1}
+
+
+def test_failed_get_falls_back_to_full_fetch(wiring, thread, monkeypatch):
+    thread_id, ids = thread
+    for mid in ids[:-1]:
+        gmail_service.remember_message(wiring.gmail.mailbox.messages[mid])
+    monkeypatch.setattr(gmail_service, "get_message", lambda *args, **kwargs: None)
+
+    history = gmail_service.extract_thread_messages(wiring.gmail, thread_id)
+
+    assert [m["id"] for m in history] == ids
+    assert _calls(wiring) == {"gmail.threads.get": 2}
@@ -0,0 +1,54 @@
+# tests/test_thread_lanes.py
+from backend.strathy_app.services.thread_lanes import LaneScheduler, lane_for
+from backend.strathy_app.worker import handled
+
+
+def _messages(*pairs):
+    return [{"id": msg_id, "threadId": thread_id} for thread_id, msg_id in pairs]
+
+
+def _run(scheduler, messages, fn, done=None):
+    calls = []
+
+    def record(msg):
+        calls.append(msg["id"])
+        return fn(msg)
+
+    results = scheduler.run(messages, lambda m: m["threadId"], record, done=done)
+    return calls, results
+
+
+def test_failed_message_holds_back_rest_of_its_thread():
+    # Two threads sharing one lane: only the failing one is held back
+    other = next(f"t{i}" for i in range(1, 100) if lane_for(f"t{i}", 4) == lane_for("t0", 4))
+    messages = _messages(("t0", "first"), (other, "unrelated"), ("t0", "second"))
+
+    def fn(msg):
+        if msg["id"] == "first":
+            raise RuntimeError("Gmail unavailable")
+        return {"status": "replied"}
+
+    calls, results = _run(LaneScheduler(lanes=4, threads=1), messages, fn)
+    assert calls == ["first", "unrelated"]
+    assert results == [None, {"status": "replied"}, None]
+
+
+def test_unfinished_result_holds_back_rest_of_its_thread():
+    messages = _messages(("t0", "first"), ("t0", "second"), ("t1", "third"))
+    statuses = {"first": "pending", "second": "replied", "third": "replied"}
+
+    calls, _ = _run(LaneScheduler(lanes=1, threads=1), messages, lambda m: {"status": statuses[m["id"]]}, done=handled)
+    assert calls == ["first", "third"]
+
+
+def test_handled_thread_keeps_going():
+    messages = _messages(("t0", "first"), ("t0", "second"))
+
+    calls, _ = _run(LaneScheduler(lanes=2, threads=2), messages, lambda m: {"status": "replied"}, done=handled)
+    assert calls == ["first", "second"]
+
+
+def test_handled_statuses():
+    assert handled({"status": "replied"}) and handled({"status": "blocked"})
+    assert not handled(None)
+    assert not handled({"status": "pending"}) and not handled({"status": "in_progress"})